@@ -0,0 +1,77 @@
+"""
+Benchmark do pós-processamento (divisão por energia do backend Demucs).
+
+Compara o loop Python original (lista de janelas + RMS por janela) com a
+versão vetorizada (sliding_window_view + overlap-add Hann) em áudio de
+max_duration. Rodar no Orange Pi 5 para os números de referência.
+
+Uso:
+    python benchmarks/bench_postprocessing.py --duration 10 --repeats 50
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.backends import DemucsBackend
+from src.config import DemucsConfig
+
+
+def legacy_split(vocals: np.ndarray, sample_rate: int, num_speakers: int) -> np.ndarray:
+    """Implementação original com loop Python (referência)."""
+    window_size = int(0.5 * sample_rate)
+    hop_size = int(0.25 * sample_rate)
+    
+    segments = []
+    energies = []
+    for i in range(0, len(vocals) - window_size, hop_size):
+        segment = vocals[i:i + window_size]
+        segments.append((i, segment))
+        energies.append(np.sqrt(np.mean(segment ** 2)))
+    
+    threshold = np.median(np.sort(np.array(energies)))
+    speaker_audios = [np.zeros_like(vocals) for _ in range(num_speakers)]
+    for (start_idx, segment), energy in zip(segments, energies):
+        speaker_idx = 0 if energy > threshold else 1
+        speaker_audios[speaker_idx][start_idx:start_idx + len(segment)] += segment
+    
+    return np.stack(speaker_audios)
+
+
+def bench(func, repeats: int) -> float:
+    """Mediana do tempo de execução em ms."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark energy split post-processing")
+    parser.add_argument("--duration", type=float, default=10.0, help="Audio duration (s)")
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+    
+    vocals = np.random.default_rng(0).standard_normal(
+        int(args.duration * args.sample_rate)
+    ).astype(np.float32) * 0.1
+    backend = DemucsBackend(DemucsConfig())
+    
+    legacy_ms = bench(lambda: legacy_split(vocals, args.sample_rate, 2), args.repeats)
+    vectorized_ms = bench(lambda: backend._split_by_energy(vocals, args.sample_rate, 2), args.repeats)
+    
+    print(f"Áudio: {args.duration:.1f}s @ {args.sample_rate} Hz, 2 falantes, {args.repeats} repetições")
+    print(f"  loop Python:  {legacy_ms:8.2f} ms")
+    print(f"  vetorizado:   {vectorized_ms:8.2f} ms ({legacy_ms / vectorized_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Benchmark de separação: qualidade e custo de cada backend em misturas sintéticas.
+
+Gera misturas reprodutíveis de 2 e 3 falantes (benchmarks/mixtures.py) em
+uma grade de SNR x razão de overlap x duração, roda cada backend e reporta:
+
+- SI-SDRi (melhora de SI-SDR sobre a mistura, melhor permutação das saídas)
+- Fator de tempo real (latência / duração do áudio)
+- Latência p50/p95 por bucket de duração
+- Pico de RSS (cada backend roda em um processo próprio)
+
+Os resultados vão para um JSON com o commit, para comparar regressões entre
+commits. Rodar no Orange Pi 5 para os números de referência.
+
+Uso:
+    python benchmarks/bench_separation.py --corpus /data/LibriSpeech/test-clean
+    python benchmarks/bench_separation.py --backends onnx \\
+        --onnx-model 2=models/convtasnet_2spk.onnx --onnx-model 3=models/convtasnet_3spk.onnx
+    python benchmarks/bench_separation.py --speakers 2 --durations 2 4 --per-condition 1  # rápido
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.mixtures import SAMPLE_RATE, Mixture, load_corpus, mixture_grid
+from src.backends import create_backend
+from src.config import load_config
+from src.quality import si_sdr
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def best_permutation_si_sdr(estimates: np.ndarray, references: np.ndarray, mixture: np.ndarray) -> np.ndarray:
+    """
+    SI-SDR por fonte na melhor atribuição saída -> referência.
+
+    Referências sem saída correspondente (modelo com menos saídas que
+    falantes) recebem a própria mistura como estimativa, ou seja SI-SDRi 0.
+    """
+    num_sources = len(references)
+    if len(estimates) < num_sources:
+        padding = np.repeat(mixture[np.newaxis], num_sources - len(estimates), axis=0)
+        estimates = np.concatenate([estimates, padding])
+
+    best = None
+    for perm in itertools.permutations(range(len(estimates)), num_sources):
+        scores = si_sdr(estimates[list(perm)], references)
+        if best is None or scores.mean() > best.mean():
+            best = scores
+    return best
+
+
+def run_backend(backend_name: str, config_path: str, onnx_models: Dict[int, str], mixtures: List[Mixture]) -> dict:
+    """Roda um backend em todas as misturas (executado em um processo próprio)."""
+    config = load_config(Path(config_path))
+    separation_config = config.separation.model_copy(update={
+        "backend": backend_name,
+        "models": {**config.separation.models, **onnx_models},
+    })
+
+    backend = create_backend(separation_config, config.demucs)
+
+    start = time.perf_counter()
+    try:
+        backend.load()
+    except (ImportError, FileNotFoundError, OSError) as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    load_seconds = time.perf_counter() - start
+
+    # Warm-up fora das medições
+    backend.separate(mixtures[0].mixture, SAMPLE_RATE, mixtures[0].num_speakers)
+
+    records = []
+    for mix in mixtures:
+        start = time.perf_counter()
+        estimates = backend.separate(mix.mixture, SAMPLE_RATE, mix.num_speakers)
+        latency = time.perf_counter() - start
+
+        estimated = best_permutation_si_sdr(estimates, mix.sources, mix.mixture)
+        baseline = si_sdr(np.repeat(mix.mixture[np.newaxis], mix.num_speakers, axis=0), mix.sources)
+        records.append({
+            "seed": mix.seed,
+            "num_speakers": mix.num_speakers,
+            "duration": mix.duration,
+            "snr_db": mix.snr_db,
+            "overlap": mix.overlap,
+            "num_outputs": len(estimates),
+            "latency": latency,
+            "rtf": latency / (len(mix.mixture) / SAMPLE_RATE),
+            "si_sdr": float(estimated.mean()),
+            "si_sdri": float((estimated - baseline).mean()),
+        })
+
+    return {
+        "load_seconds": load_seconds,
+        # ru_maxrss é em KB no Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "records": records,
+    }
+
+
+def summarize(records: List[dict]) -> dict:
+    """Agregados de um grupo de medições."""
+    latency = np.array([r["latency"] for r in records])
+    return {
+        "count": len(records),
+        "latency_p50": float(np.percentile(latency, 50)),
+        "latency_p95": float(np.percentile(latency, 95)),
+        "rtf_mean": float(np.mean([r["rtf"] for r in records])),
+        "si_sdri_mean": float(np.mean([r["si_sdri"] for r in records])),
+    }
+
+
+def group_by(records: List[dict], key: str) -> dict:
+    """summarize() por valor de um campo."""
+    groups: Dict[str, List[dict]] = {}
+    for record in records:
+        groups.setdefault(str(record[key]), []).append(record)
+    return {value: summarize(group) for value, group in groups.items()}
+
+
+def finite_or_none(value):
+    """inf/nan (SNR sem ruído) não são JSON válido: viram null."""
+    if isinstance(value, dict):
+        return {key: finite_or_none(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [finite_or_none(item) for item in value]
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+
+def git_commit() -> str:
+    """Commit atual (com sufixo -dirty se houver mudanças), ou 'unknown'."""
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=Path(__file__).parent, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def parse_onnx_models(values: List[str]) -> Dict[int, str]:
+    """'N=caminho' -> {N: caminho}."""
+    models = {}
+    for value in values:
+        num_sources, path = value.split("=", 1)
+        models[int(num_sources)] = path
+    return models
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark separation backends on synthetic mixtures")
+    parser.add_argument("--corpus", help="Speech corpus dir (one subdir per speaker); synthetic voices if omitted")
+    parser.add_argument("--backends", nargs="+", default=["onnx", "demucs"])
+    parser.add_argument("--config", default=str(Path(__file__).parent.parent / "config" / "config.yaml"))
+    parser.add_argument("--onnx-model", action="append", default=[], help="N=path, overrides separation.models")
+    parser.add_argument("--speakers", type=int, nargs="+", default=[2, 3])
+    parser.add_argument("--durations", type=float, nargs="+", default=[2.0, 4.0, 8.0], help="Duration buckets (s)")
+    parser.add_argument("--snr", type=float, nargs="+", default=[float("inf"), 10.0], help="dB, inf = no noise")
+    parser.add_argument("--overlap", type=float, nargs="+", default=[0.25, 0.5, 1.0], help="Overlap ratios")
+    parser.add_argument("--per-condition", type=int, default=2, help="Mixtures per condition")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON path (default: benchmarks/results/separation_<commit>.json)")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    mixtures = list(mixture_grid(
+        corpus, args.speakers, args.durations, args.snr, args.overlap, args.per_condition, args.seed
+    ))
+    onnx_models = parse_onnx_models(args.onnx_model)
+
+    commit = git_commit()
+    print(f"Corpus: {args.corpus or 'sintético'} ({len(corpus.speakers)} falantes), {len(mixtures)} misturas")
+
+    results = {}
+    for backend_name in args.backends:
+        # Processo novo por backend: pico de RSS isolado e sem threads herdadas
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            outcome = pool.submit(run_backend, backend_name, args.config, onnx_models, mixtures).result()
+
+        if "error" in outcome:
+            print(f"\n[{backend_name}] ignorado: {outcome['error']}")
+            results[backend_name] = {"error": outcome["error"]}
+            continue
+
+        records = outcome["records"]
+        results[backend_name] = {
+            "load_seconds": outcome["load_seconds"],
+            "peak_rss_mb": outcome["peak_rss_mb"],
+            "overall": summarize(records),
+            "by_duration": group_by(records, "duration"),
+            "by_speakers": group_by(records, "num_speakers"),
+            "by_snr": group_by(records, "snr_db"),
+            "by_overlap": group_by(records, "overlap"),
+            "records": records,
+        }
+
+        print(f"\n[{backend_name}] load {outcome['load_seconds']:.2f}s, pico RSS {outcome['peak_rss_mb']:.0f} MB")
+        print("  duração   n    p50 (ms)   p95 (ms)    RTF    SI-SDRi (dB)")
+        for duration, stats in results[backend_name]["by_duration"].items():
+            print(
+                f"  {float(duration):6.1f}s {stats['count']:3d} {stats['latency_p50'] * 1000:10.1f} "
+                f"{stats['latency_p95'] * 1000:10.1f} {stats['rtf_mean']:7.3f} {stats['si_sdri_mean']:12.2f}"
+            )
+
+    report = {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "host": {"machine": platform.machine(), "python": platform.python_version(), "numpy": np.__version__},
+        "corpus": args.corpus or "synthetic",
+        "conditions": {
+            "speakers": args.speakers,
+            "durations": args.durations,
+            "snr_db": args.snr,
+            "overlap": args.overlap,
+            "per_condition": args.per_condition,
+            "seed": args.seed,
+        },
+        "backends": results,
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"separation_{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(finite_or_none(report), indent=2))
+    print(f"\nResultados: {output}")
+
+
+if __name__ == "__main__":
+    main()
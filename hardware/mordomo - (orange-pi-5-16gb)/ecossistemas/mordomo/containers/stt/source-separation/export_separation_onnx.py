@@ -0,0 +1,115 @@
+"""
+Exporta modelos de separação de fala (ConvTasNet) para ONNX.
+
+Contrato dos modelos usados pelo backend "onnx":
+    entrada "mixture": (1, 1, samples) na taxa do modelo
+    saída   "sources": (1, N, samples), um stream por falante
+
+Uso:
+    python export_separation_onnx.py                      # 2 falantes (torchaudio, 8 kHz)
+    python export_separation_onnx.py --asteroid JorisCos/ConvTasNet_Libri3Mix_sepnoisy_16k \\
+        --output models/convtasnet_3spk.onnx              # 3 falantes (asteroid, 16 kHz)
+"""
+
+import argparse
+import inspect
+from pathlib import Path
+
+import torch
+
+OPSET_VERSION = 17
+
+
+class _MixtureToSources(torch.nn.Module):
+    """Normaliza a interface do modelo para (1, 1, samples) -> (1, N, samples)."""
+
+    def __init__(self, model: torch.nn.Module, squeeze_input: bool = False):
+        super().__init__()
+        self.model = model
+        self.squeeze_input = squeeze_input
+
+    def forward(self, mixture: torch.Tensor) -> torch.Tensor:
+        if self.squeeze_input:
+            mixture = mixture[:, 0, :]
+        return self.model(mixture)
+
+
+def export_model(model: torch.nn.Module, output_path: str, sample_rate: int, squeeze_input: bool = False) -> str:
+    """
+    Exporta um modelo de separação com eixo de tempo dinâmico.
+
+    Args:
+        model: Modelo PyTorch (mixture -> sources)
+        output_path: Caminho do arquivo .onnx
+        sample_rate: Taxa de amostragem do modelo (só para o dummy de 1 s)
+        squeeze_input: Modelo recebe (batch, samples) em vez de (batch, 1, samples)
+
+    Returns:
+        Caminho do modelo exportado
+    """
+    wrapper = _MixtureToSources(model, squeeze_input).eval()
+
+    output_file = Path(output_path)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    # Exportador TorchScript (versões novas do torch usam dynamo por padrão)
+    export_kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        export_kwargs["dynamo"] = False
+
+    with torch.no_grad():
+        torch.onnx.export(
+            wrapper,
+            (torch.zeros(1, 1, sample_rate),),
+            str(output_file),
+            input_names=["mixture"],
+            output_names=["sources"],
+            dynamic_axes={"mixture": {2: "samples"}, "sources": {2: "samples"}},
+            opset_version=OPSET_VERSION,
+            **export_kwargs
+        )
+
+    # Taxa do modelo nos metadados (lida pelo OnnxSpeechBackend)
+    import onnx
+
+    exported = onnx.load(str(output_file))
+    onnx.helper.set_model_props(exported, {"sample_rate": str(sample_rate)})
+    onnx.save(exported, str(output_file))
+
+    print(f"✅ Modelo exportado: {output_file} ({output_file.stat().st_size / 1e6:.1f} MB)")
+    return str(output_file)
+
+
+def load_torchaudio_convtasnet() -> tuple:
+    """ConvTasNet pré-treinado do torchaudio (Libri2Mix, 2 falantes, 8 kHz)."""
+    import torchaudio
+
+    bundle = torchaudio.pipelines.CONVTASNET_BASE_LIBRI2MIX
+    return bundle.get_model(), bundle.sample_rate
+
+
+def load_asteroid_model(model_id: str) -> tuple:
+    """Modelo pré-treinado do asteroid (ConvTasNet/DPRNN/SepFormer, 2 ou 3 falantes)."""
+    from asteroid.models import BaseModel
+
+    model = BaseModel.from_pretrained(model_id)
+    return model, int(model.sample_rate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export speech separation model to ONNX")
+    parser.add_argument("--asteroid", help="Asteroid model id (default: torchaudio ConvTasNet Libri2Mix)")
+    parser.add_argument("--output", default="models/convtasnet_2spk.onnx", help="Output .onnx path")
+
+    args = parser.parse_args()
+
+    if args.asteroid:
+        model, sample_rate = load_asteroid_model(args.asteroid)
+        export_model(model, args.output, sample_rate, squeeze_input=True)
+    else:
+        model, sample_rate = load_torchaudio_convtasnet()
+        export_model(model, args.output, sample_rate)
+
+
+if __name__ == "__main__":
+    main()
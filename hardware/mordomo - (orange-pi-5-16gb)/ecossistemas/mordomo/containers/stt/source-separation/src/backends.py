@@ -0,0 +1,345 @@
+"""Pluggable separation backends for the Source Separation service."""
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from math import gcd
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import resample_poly
+from scipy.signal.windows import hann
+
+from .config import DemucsConfig, SeparationConfig
+
+logger = logging.getLogger(__name__)
+
+VOCALS_SOURCE = "vocals"
+
+# Energy split windows span this many hops (50% overlap, Hann is COLA)
+ENERGY_WINDOW_HOPS = 2
+
+
+class SeparationBackend(ABC):
+    """Turns a mono mixture into one audio stream per speaker."""
+
+    name: str = ""
+
+    def __init__(self):
+        self.loaded = False
+
+    @abstractmethod
+    def load(self):
+        """Load model weights (called once, before the first separation)."""
+
+    @abstractmethod
+    def separate(self, audio: np.ndarray, sample_rate: int, num_speakers: int) -> np.ndarray:
+        """
+        Separate a mono mixture into speaker streams.
+
+        Args:
+            audio: Mono float32 mixture, shape (samples,)
+            sample_rate: Mixture sample rate (Hz)
+            num_speakers: Number of speakers expected in the mixture
+
+        Returns:
+            Float32 array with shape (streams, samples), streams <= num_speakers
+        """
+
+
+class OnnxSpeechBackend(SeparationBackend):
+    """
+    Speech separation model (ConvTasNet/SepFormer class) exported to ONNX.
+
+    Models follow the contract of export_separation_onnx.py: input
+    (1, 1, samples) mixture at ``sample_rate``, output (1, N, samples).
+    One model per speaker count is configured in ``separation.models``; the
+    model sample rate comes from its metadata, else ``separation.sample_rate``.
+    """
+
+    name = "onnx"
+
+    def __init__(self, config: SeparationConfig):
+        super().__init__()
+        self.config = config
+        self.sessions: Dict[int, "ort.InferenceSession"] = {}
+        self.sample_rates: Dict[int, int] = {}
+
+    def load(self):
+        if self.loaded:
+            return
+
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.config.num_threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        for num_sources, model_path in sorted(self.config.models.items()):
+            if not Path(model_path).exists():
+                logger.warning(f"Separation model for {num_sources} speakers not found: {model_path}")
+                continue
+
+            start_time = time.time()
+            session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+            metadata = session.get_modelmeta().custom_metadata_map
+            self.sessions[num_sources] = session
+            self.sample_rates[num_sources] = int(metadata.get("sample_rate", self.config.sample_rate))
+            logger.info(
+                f"Loaded {num_sources}-speaker separation model {model_path} "
+                f"in {time.time() - start_time:.2f}s"
+            )
+
+        if not self.sessions:
+            raise FileNotFoundError(
+                f"No separation model available, expected one of: {list(self.config.models.values())}"
+            )
+
+        self.loaded = True
+
+    def _model_for(self, num_speakers: int) -> int:
+        """Smallest model with enough outputs, or the largest one available."""
+        for num_sources in sorted(self.sessions):
+            if num_sources >= num_speakers:
+                return num_sources
+        return max(self.sessions)
+
+    def separate(self, audio: np.ndarray, sample_rate: int, num_speakers: int) -> np.ndarray:
+        if num_speakers <= 1:
+            # Nothing to separate
+            return audio[np.newaxis, :].astype(np.float32, copy=False)
+
+        num_sources = self._model_for(num_speakers)
+        session = self.sessions[num_sources]
+        model_rate = self.sample_rates[num_sources]
+
+        mixture = _resample(audio, sample_rate, model_rate)
+
+        estimates = session.run(
+            None,
+            {session.get_inputs()[0].name: mixture[np.newaxis, np.newaxis, :].astype(np.float32)}
+        )[0][0]
+
+        estimates = _fit_length(estimates, len(mixture))
+
+        # Keep the loudest streams when the model has more outputs than speakers
+        if estimates.shape[0] > num_speakers:
+            energy = np.einsum("ij,ij->i", estimates, estimates)
+            estimates = estimates[np.sort(np.argsort(energy)[::-1][:num_speakers])]
+
+        # Mixture consistency: streams sum back to the input mixture
+        estimates += (mixture - estimates.sum(axis=0)) / estimates.shape[0]
+
+        streams = _resample(estimates, model_rate, sample_rate)
+        return _fit_length(streams, len(audio)).astype(np.float32, copy=False)
+
+
+class DemucsBackend(SeparationBackend):
+    """
+    Demucs music source separation, kept as an alternative backend.
+
+    Demucs only isolates the "vocals" stem; speakers are then split by
+    window energy, which is a heuristic and not real speaker separation.
+    Bags of per-source models (htdemucs_ft) are reduced to the vocals
+    model at load time, and the mono input is fed as a broadcast view.
+    """
+
+    name = "demucs"
+
+    def __init__(self, config: DemucsConfig):
+        super().__init__()
+        self.config = config
+        self.model = None
+        self.vocals_idx = 0
+
+    def load(self):
+        if self.loaded:
+            return
+
+        import torch
+        from demucs.pretrained import get_model
+
+        if self.config.cache_dir:
+            # Weights are looked up (and downloaded, if missing) under <cache_dir>/checkpoints
+            torch.hub.set_dir(self.config.cache_dir)
+
+        logger.info(f"Loading Demucs model: {self.config.model}")
+        start_time = time.time()
+
+        self.model = _restrict_to_source(get_model(self.config.model), VOCALS_SOURCE)
+        self.model.to(torch.device(self.config.device))
+        self.vocals_idx = self.model.sources.index(VOCALS_SOURCE)
+        self.model.eval()
+
+        self.loaded = True
+        logger.info(f"Demucs model loaded successfully in {time.time() - start_time:.2f}s")
+
+    def separate(self, audio: np.ndarray, sample_rate: int, num_speakers: int) -> np.ndarray:
+        mixture = _resample(audio, sample_rate, self.model.samplerate)
+        separated = self._apply_demucs(mixture)
+
+        # Vocals stem, back to mono at the input rate
+        vocals = separated[self.vocals_idx].mean(dim=0).cpu().numpy()
+        vocals = _fit_length(_resample(vocals, self.model.samplerate, sample_rate), len(audio))
+
+        if num_speakers <= 1:
+            return vocals[np.newaxis, :].astype(np.float32, copy=False)
+
+        return self._split_by_energy(vocals, sample_rate, num_speakers)
+
+    def _apply_demucs(self, audio: np.ndarray):
+        """
+        Apply Demucs separation model to audio.
+
+        Args:
+            audio: Mono audio array at the model sample rate
+
+        Returns:
+            Separated sources tensor with shape (sources, channels, samples)
+        """
+        import torch
+        from demucs.apply import apply_model
+
+        # Demucs expects stereo: broadcast the mono channel instead of copying it
+        wav = torch.from_numpy(np.ascontiguousarray(audio, dtype=np.float32))
+        wav = wav.expand(1, self.model.audio_channels, -1)  # (1, channels, samples)
+
+        device = torch.device(self.config.device)
+        wav = wav.to(device)
+
+        with torch.no_grad():
+            sources = apply_model(
+                self.model,
+                wav,
+                shifts=self.config.shifts,
+                overlap=self.config.overlap,
+                split=True,
+                device=device
+            )
+
+        # (1, sources, channels, samples) -> (sources, channels, samples)
+        return sources[0]
+
+    def _split_by_energy(self, vocals: np.ndarray, sample_rate: int, num_speakers: int) -> np.ndarray:
+        """
+        Assign 500 ms windows (250 ms hop) to speakers by RMS rank.
+
+        Framing is a strided view of the signal. Since every frame is the
+        same signal under a window, the Hann-weighted overlap-add is done on
+        the per-speaker gains (normalized by the summed window) and applied
+        to the vocals once, so the streams sum back to the vocals.
+        """
+        hop_size = int(0.25 * sample_rate)
+        window_size = ENERGY_WINDOW_HOPS * hop_size
+        num_samples = len(vocals)
+
+        # Pad both ends so every sample is covered by a full set of windows
+        offset = (ENERGY_WINDOW_HOPS - 1) * hop_size
+        num_blocks = -(-(offset + num_samples) // hop_size) + ENERGY_WINDOW_HOPS - 1
+        num_frames = num_blocks - ENERGY_WINDOW_HOPS + 1
+        padded = np.zeros(num_blocks * hop_size, dtype=np.float32)
+        padded[offset:offset + num_samples] = vocals
+
+        frames = sliding_window_view(padded, window_size)[::hop_size]
+        rms = np.sqrt(np.einsum("ij,ij->i", frames, frames) / window_size)
+
+        sorted_rms = np.sort(rms)
+        if num_speakers == 2:
+            labels = np.where(rms > np.median(sorted_rms), 0, 1)
+        else:
+            labels = np.where(
+                rms > sorted_rms[int(num_frames * 0.67)], 0,
+                np.where(rms > sorted_rms[int(num_frames * 0.33)], 1, 2)
+            )
+
+        window_blocks = hann(window_size, sym=False).astype(np.float32).reshape(
+            ENERGY_WINDOW_HOPS, hop_size
+        )
+        gain_blocks = np.zeros((num_speakers, num_blocks, hop_size), dtype=np.float32)
+        frame_idx = np.arange(num_frames)
+
+        # (label, block) pairs are unique within each hop offset, so fancy += is exact
+        for k in range(ENERGY_WINDOW_HOPS):
+            gain_blocks[labels, frame_idx + k] += window_blocks[k]
+
+        gains = gain_blocks.reshape(num_speakers, -1)[:, offset:offset + num_samples]
+        norm = gains.sum(axis=0)
+        np.divide(gains, norm, out=gains, where=norm > 0)
+        gains *= vocals
+        return gains
+
+
+def _restrict_to_source(model, source: str):
+    """
+    Keep only the bag members that contribute to ``source``.
+
+    htdemucs_ft is a bag of four models, one fine-tuned per source with
+    one-hot weights, so this runs a single model instead of four. Dropped
+    sources keep finite (unused) estimates from the remaining models.
+    """
+    from demucs.apply import BagOfModels
+
+    if not isinstance(model, BagOfModels):
+        return model
+
+    source_idx = model.sources.index(source)
+    kept = [
+        (sub_model, weights[source_idx])
+        for sub_model, weights in zip(model.models, model.weights)
+        if weights[source_idx] != 0
+    ]
+    if len(kept) == len(model.models):
+        return model
+
+    logger.info(f"Demucs bag restricted to {len(kept)}/{len(model.models)} models for '{source}'")
+    return BagOfModels(
+        [sub_model for sub_model, _ in kept],
+        [[weight] * len(model.sources) for _, weight in kept]
+    )
+
+
+def create_backend(separation_config: SeparationConfig, demucs_config: DemucsConfig) -> SeparationBackend:
+    """
+    Build the backend selected in ``separation.backend``.
+
+    Args:
+        separation_config: Separation backend configuration
+        demucs_config: Demucs configuration (used by the demucs backend)
+
+    The ONNX models are not shipped in the image (see export_separation_onnx.py):
+    when none of the configured files exists, Demucs is used instead of failing
+    at startup.
+    
+    Returns:
+        Unloaded SeparationBackend instance
+    """
+    if separation_config.backend == OnnxSpeechBackend.name:
+        if any(Path(model_path).exists() for model_path in separation_config.models.values()):
+            return OnnxSpeechBackend(separation_config)
+        logger.warning(
+            f"No ONNX separation model found ({list(separation_config.models.values())}), "
+            f"falling back to Demucs. Export one with export_separation_onnx.py"
+        )
+        return DemucsBackend(demucs_config)
+    if separation_config.backend == DemucsBackend.name:
+        return DemucsBackend(demucs_config)
+    raise ValueError(f"Unknown separation backend: {separation_config.backend}")
+
+
+def _resample(audio: np.ndarray, from_rate: int, to_rate: int) -> np.ndarray:
+    """Polyphase resampling along the last axis (no-op for equal rates)."""
+    if from_rate == to_rate:
+        return audio
+    factor = gcd(from_rate, to_rate)
+    return resample_poly(audio, to_rate // factor, from_rate // factor, axis=-1)
+
+
+def _fit_length(audio: np.ndarray, length: int) -> np.ndarray:
+    """Trim or zero-pad the last axis to ``length`` samples."""
+    if audio.shape[-1] >= length:
+        return audio[..., :length]
+    padding = [(0, 0)] * (audio.ndim - 1) + [(0, length - audio.shape[-1])]
+    return np.pad(audio, padding)
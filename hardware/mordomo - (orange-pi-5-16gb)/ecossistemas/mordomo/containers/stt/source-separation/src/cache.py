@@ -0,0 +1,111 @@
+"""LRU cache of separation results keyed by audio fingerprint."""
+
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from .metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+
+def config_fingerprint(*configs: BaseModel) -> str:
+    """Short hash of the configs that change separation output."""
+    digest = hashlib.blake2b(digest_size=8)
+    for config in configs:
+        digest.update(config.model_dump_json().encode())
+    return digest.hexdigest()
+
+
+class SeparationCache:
+    """
+    LRU cache bounded by total bytes held, with a per-entry TTL.
+
+    Duplicate overlap triggers (the same audio re-sent by each diarization
+    pass) return the cached channels instead of re-running the model.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float, metrics: Metrics):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Maximum audio bytes held across all entries
+            ttl: Entry lifetime in seconds
+            metrics: Metrics collector
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.metrics = metrics
+        self.bytes_held = 0
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+
+    @staticmethod
+    def make_key(audio: bytes, speakers: List[str], fingerprint: str) -> str:
+        """
+        Cache key from the PCM bytes, the speaker list and the model config.
+
+        Args:
+            audio: Raw PCM bytes
+            speakers: Speaker IDs (order matters: it drives channel assignment)
+            fingerprint: Model/processing config fingerprint
+
+        Returns:
+            Hex digest
+        """
+        digest = hashlib.blake2b(audio, digest_size=16)
+        digest.update("\x1f".join(speakers).encode())
+        digest.update(fingerprint.encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value, or None on miss or expiry."""
+        entry = self._entries.get(key)
+
+        if entry is not None and entry[0] < time.monotonic():
+            self._remove(key)
+            entry = None
+
+        if entry is None:
+            self.metrics.record_cache_request('miss')
+            return None
+
+        self._entries.move_to_end(key)
+        self.metrics.record_cache_request('hit')
+        return entry[2]
+
+    def put(self, key: str, value: Any, size: int):
+        """
+        Store a value, evicting least recently used entries over max_bytes.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            size: Bytes accounted for the value
+        """
+        if size > self.max_bytes:
+            logger.debug(f"Not caching {size} bytes (limit {self.max_bytes})")
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (time.monotonic() + self.ttl, size, value)
+        self.bytes_held += size
+
+        while self.bytes_held > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+        self.metrics.set_cache_bytes(self.bytes_held)
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self.bytes_held -= size
+        self.metrics.set_cache_bytes(self.bytes_held)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,9 +1,9 @@
 """Configuration module for Source Separation service."""
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pathlib import Path
 import yaml
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class DemucsConfig(BaseModel):
@@ -12,13 +12,53 @@ class DemucsConfig(BaseModel):
     device: str = "cpu"
     shifts: int = 1
     overlap: float = 0.25
+    cache_dir: Optional[str] = "/app/models/torch"  # torch hub dir with pre-downloaded weights
+
+
+class SeparationConfig(BaseModel):
+    """Separation backend configuration."""
+    backend: str = "onnx"  # onnx (speech model) or demucs
+    models: Dict[int, str] = Field(default_factory=lambda: {
+        2: "/app/models/convtasnet_2spk.onnx",
+        3: "/app/models/convtasnet_3spk.onnx",
+    })
+    sample_rate: int = 8000  # fallback when the model has no sample_rate metadata
+    num_threads: int = 2
+    eager_load: bool = True  # load + warm up before subscribing to NATS
 
 
 class ProcessingConfig(BaseModel):
     """Audio processing configuration."""
-    max_duration: float = 5.0
+    max_duration: float = 5.0  # whole-clip limit when streaming is disabled
+    streaming: bool = True  # chunked separation, one message per chunk
+    chunk_duration: float = 4.0
+    chunk_overlap: float = 0.5  # crossfade between consecutive chunks
     batch_size: int = 1
     num_workers: int = 2
+    max_queue_depth: int = 4  # reject new requests beyond this backlog
+    stale_after: float = 10.0  # drop requests older than this (seconds)
+    
+    @model_validator(mode="after")
+    def check_chunking(self) -> "ProcessingConfig":
+        """Chunks must advance: 0 <= chunk_overlap < chunk_duration."""
+        if not 0 <= self.chunk_overlap < self.chunk_duration:
+            raise ValueError(
+                f"chunk_overlap ({self.chunk_overlap}) must be >= 0 and "
+                f"< chunk_duration ({self.chunk_duration})"
+            )
+        return self
+
+
+class CacheConfig(BaseModel):
+    """Separation result cache configuration."""
+    enabled: bool = True
+    max_bytes: int = 64 * 1024 * 1024  # separated audio held in memory
+    ttl: float = 300.0  # seconds
+
+
+class QualityConfig(BaseModel):
+    """Separated channel quality configuration."""
+    min_confidence: float = 0.2  # channels below this are not published (0 = publish all)
 
 
 class TriggerConfig(BaseModel):
@@ -39,11 +79,26 @@ class NATSConnectionConfig(BaseModel):
     reconnect_time_wait: int = 2
 
 
+class NATSJetStreamConfig(BaseModel):
+    """JetStream durable work queue configuration."""
+    enabled: bool = False
+    stream: str = "AUDIO_OVERLAP"
+    durable: str = "source-separation"
+    max_in_flight: int = 2
+    ack_wait: float = 60.0  # seconds before an unacked message is redelivered
+    max_deliver: int = 3
+    nak_delay: float = 5.0  # redelivery delay after a failed separation
+    max_age: float = 300.0  # stream retention (seconds)
+    duplicate_window: float = 120.0  # Nats-Msg-Id dedup window (seconds)
+    fetch_timeout: float = 1.0
+
+
 class NATSConfig(BaseModel):
     """NATS messaging configuration."""
     servers: List[str] = Field(default_factory=lambda: ["nats://localhost:4222"])
     subjects: NATSSubjectsConfig = Field(default_factory=NATSSubjectsConfig)
     connection: NATSConnectionConfig = Field(default_factory=NATSConnectionConfig)
+    jetstream: NATSJetStreamConfig = Field(default_factory=NATSJetStreamConfig)
 
 
 class MetricsConfig(BaseModel):
@@ -54,8 +109,11 @@ class MetricsConfig(BaseModel):
 
 class Config(BaseModel):
     """Main configuration for Source Separation service."""
+    separation: SeparationConfig = Field(default_factory=SeparationConfig)
     demucs: DemucsConfig = Field(default_factory=DemucsConfig)
     processing: ProcessingConfig = Field(default_factory=ProcessingConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    quality: QualityConfig = Field(default_factory=QualityConfig)
     trigger: TriggerConfig = Field(default_factory=TriggerConfig)
     nats: NATSConfig = Field(default_factory=NATSConfig)
     metrics: MetricsConfig = Field(default_factory=MetricsConfig)
@@ -5,6 +5,8 @@ import logging
 import signal
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Optional
 
 import structlog
@@ -13,6 +15,8 @@ from .config import get_config
 from .separator import SourceSeparationService
 from .nats_client import NATSClient, OverlapDetectedMessage, SeparatedAudioMessage
 from .metrics import initialize_metrics, get_metrics
+from .work_queue import WorkQueue, is_stale
+from .cache import SeparationCache, config_fingerprint
 
 # Configure structured logging
 structlog.configure(
@@ -34,6 +38,14 @@ class SourceSeparationApp:
         self.config = get_config()
         self.separator: Optional[SourceSeparationService] = None
         self.nats_client: Optional[NATSClient] = None
+        self.work_queue: Optional[WorkQueue] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.cache: Optional[SeparationCache] = None
+        self.config_fingerprint = config_fingerprint(
+            self.config.separation,
+            self.config.demucs,
+            self.config.processing
+        )
         self.running = False
         
         # Setup signal handlers
@@ -56,24 +68,99 @@ class SourceSeparationApp:
         )
         metrics.start_server()
         
-        # Initialize separator (lazy load model)
+        # Initialize separator
         self.separator = SourceSeparationService(
             demucs_config=self.config.demucs,
-            processing_config=self.config.processing
+            processing_config=self.config.processing,
+            separation_config=self.config.separation
+        )
+        
+        # Blocking separation runs in an executor
+        processing = self.config.processing
+        self.executor = ThreadPoolExecutor(
+            max_workers=processing.num_workers,
+            thread_name_prefix="separation"
         )
         
+        # Result cache for duplicate triggers
+        if self.config.cache.enabled:
+            self.cache = SeparationCache(
+                max_bytes=self.config.cache.max_bytes,
+                ttl=self.config.cache.ttl,
+                metrics=metrics
+            )
+        
+        # Eager mode: load + warm up before subscribing (work is rejected until ready)
+        if self.config.separation.eager_load:
+            await self.load_models(metrics)
+        
+        # Core NATS: bounded in-memory queue (JetStream paces itself)
+        if not self.config.nats.jetstream.enabled:
+            self.work_queue = WorkQueue(
+                handler=self.handle_overlap_detection,
+                num_workers=processing.num_workers,
+                max_depth=processing.max_queue_depth,
+                stale_after=processing.stale_after,
+                metrics=metrics
+            )
+            await self.work_queue.start()
+        
         # Initialize NATS client
         self.nats_client = NATSClient(self.config.nats)
         await self.nats_client.connect()
         
         logger.info("application_initialized")
     
-    async def handle_overlap_detection(self, message: OverlapDetectedMessage):
+    async def load_models(self, metrics):
+        """Load and warm up the separation backend off the event loop."""
+        loop = asyncio.get_running_loop()
+        
+        start_time = time.time()
+        await loop.run_in_executor(self.executor, self.separator.initialize)
+        load_seconds = time.time() - start_time
+        metrics.record_model_load('load', load_seconds)
+        
+        warm_up_seconds = await loop.run_in_executor(self.executor, self.separator.warm_up)
+        metrics.record_model_load('warm_up', warm_up_seconds)
+        metrics.set_ready(True)
+        
+        logger.info(
+            "models_ready",
+            backend=self.separator.backend.name,
+            load_seconds=round(load_seconds, 3),
+            warm_up_seconds=round(warm_up_seconds, 3)
+        )
+    
+    async def handle_jetstream_message(self, message: OverlapDetectedMessage) -> bool:
+        """
+        JetStream mode: apply the work queue's staleness deadline, then process.
+        
+        Args:
+            message: Overlap detection message pulled from the stream
+        
+        Returns:
+            True when the message is done (stale ones are acked, not retried), False on error
+        """
+        if is_stale(message, self.config.processing.stale_after):
+            logger.warning(
+                "stale_message_dropped",
+                conversation_id=message.conversation_id,
+                age=round(time.time() - message.timestamp, 1)
+            )
+            get_metrics().record_request(status='stale')
+            return True
+        
+        return await self.handle_overlap_detection(message)
+    
+    async def handle_overlap_detection(self, message: OverlapDetectedMessage) -> bool:
         """
         Handle incoming overlap detection message.
         
         Args:
             message: Overlap detection message from NATS
+        
+        Returns:
+            True when the message is done (processed or skipped), False on error
         """
         metrics = get_metrics()
         
@@ -100,62 +187,106 @@ class SourceSeparationApp:
                     min_duration=self.config.trigger.min_overlap_duration
                 )
                 metrics.record_request(status='skipped')
-                return
+                return True
             
-            # Separate audio
-            channels = self.separator.separate_audio(
-                audio_data=message.audio,
-                sample_rate=16000,  # As per spec
-                speakers=message.speakers,
-                duration=message.duration
-            )
+            loop = asyncio.get_running_loop()
             
-            # Encode channels for transmission
-            encoded_channels = []
-            total_confidence = 0.0
+            cache_key = None
+            cached = None
+            if self.cache is not None:
+                cache_key = self.cache.make_key(message.audio, message.speakers, self.config_fingerprint)
+                cached = self.cache.get(cache_key)
             
-            for channel in channels:
-                encoded_audio = self.separator.encode_audio(
-                    channel.audio,
-                    sample_rate=16000
+            results = []
+            confidences = []
+            
+            if cached is not None:
+                # Duplicate trigger: republish the cached chunks
+                results = cached
+                for chunk_index, chunk_start, channels, final in results:
+                    confidences += await self._publish_channels(
+                        message, channels, chunk_index, chunk_start, final
+                    )
+            elif self.config.processing.streaming:
+                # Chunked: each chunk is separated off the event loop and published right away
+                chunks = self.separator.separate_stream(
+                    audio_data=message.audio,
+                    sample_rate=16000,  # As per spec
+                    speakers=message.speakers
                 )
                 
-                encoded_channels.append({
-                    "audio": encoded_audio,
-                    "speaker_id": channel.speaker_id,
-                    "confidence": channel.confidence
-                })
-                
-                total_confidence += channel.confidence
+                while True:
+                    result = await loop.run_in_executor(self.executor, next, chunks, None)
+                    if result is None:
+                        break
+                    
+                    chunk_index, chunk_start, channels, final = result
+                    confidences += await self._publish_channels(
+                        message, channels, chunk_index, chunk_start, final
+                    )
+                    results.append(result)
+                    
+                    if chunk_index == 0:
+                        metrics.record_first_chunk_latency(time.time() - start_time)
+            else:
+                # Whole clip (limited to max_duration)
+                channels = await loop.run_in_executor(
+                    self.executor,
+                    partial(
+                        self.separator.separate_audio,
+                        audio_data=message.audio,
+                        sample_rate=16000,  # As per spec
+                        speakers=message.speakers,
+                        duration=message.duration
+                    )
+                )
+                confidences = await self._publish_channels(message, channels)
+                results = [(0, 0.0, channels, True)]
             
-            # Calculate average confidence
-            avg_confidence = total_confidence / len(channels) if channels else 0.0
+            if self.cache is not None and cached is None:
+                # Channels are views of each chunk's full stream array: copy them so
+                # the cache keeps (and counts) only the committed audio
+                for _, _, channels, _ in results:
+                    for channel in channels:
+                        channel.audio = channel.audio.copy()
+                size = sum(
+                    channel.audio.nbytes
+                    for _, _, channels, _ in results
+                    for channel in channels
+                )
+                self.cache.put(cache_key, results, size)
             
-            # Create response message
-            response = SeparatedAudioMessage(
-                channels=encoded_channels,
-                conversation_id=message.conversation_id,
-                original_duration=message.duration,
-                timestamp=message.timestamp
-            )
+            num_channels = len(results[-1][2]) if results else 0
             
-            # Publish to NATS
-            await self.nats_client.publish_separated_audio(response)
+            # Calculate average confidence
+            avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
             
             # Record metrics
             elapsed = time.time() - start_time
             metrics.record_latency(elapsed)
             metrics.record_request(status='success')
-            metrics.record_success(len(channels))
+            metrics.record_success(num_channels)
             metrics.record_quality(avg_confidence)
             
             logger.info(
                 "separation_completed",
                 conversation_id=message.conversation_id,
-                num_channels=len(channels),
+                num_channels=num_channels,
                 latency=elapsed,
-                avg_confidence=avg_confidence
+                avg_confidence=avg_confidence,
+                cached=cached is not None
+            )
+            return True
+            
+        except ValueError as e:
+            # Invalid input (e.g. too long): retrying will not help
+            logger.warning(
+                "separation_rejected",
+                conversation_id=message.conversation_id,
+                error=str(e)
             )
+            metrics.record_request(status='error')
+            return True
             
         except Exception as e:
             logger.error(
@@ -165,18 +296,75 @@ class SourceSeparationApp:
                 exc_info=True
             )
             metrics.record_request(status='error')
+            return False
             
         finally:
             metrics.decrement_processing()
     
+    async def _publish_channels(
+        self,
+        message: OverlapDetectedMessage,
+        channels: list,
+        chunk_index: int = 0,
+        chunk_start: float = 0.0,
+        final: bool = True
+    ) -> list:
+        """
+        Encode and publish separated channels (a whole clip or one chunk).
+        
+        Channels below ``quality.min_confidence`` are dropped before encoding.
+        
+        Returns:
+            Confidence of each separated channel, published or not
+        """
+        min_confidence = self.config.quality.min_confidence
+        published = [channel for channel in channels if channel.confidence >= min_confidence]
+        
+        if len(published) < len(channels):
+            logger.info(
+                "channels_dropped",
+                conversation_id=message.conversation_id,
+                chunk_index=chunk_index,
+                dropped=[c.speaker_id for c in channels if c.confidence < min_confidence],
+                min_confidence=min_confidence
+            )
+            get_metrics().record_dropped_channels(len(channels) - len(published))
+        
+        encoded_channels = []
+        
+        for channel in published:
+            encoded_channels.append({
+                "audio": self.separator.encode_audio(channel.audio, sample_rate=16000),
+                "speaker_id": channel.speaker_id,
+                "confidence": channel.confidence
+            })
+        
+        response = SeparatedAudioMessage(
+            channels=encoded_channels,
+            conversation_id=message.conversation_id,
+            original_duration=message.duration,
+            timestamp=message.timestamp,
+            chunk_index=chunk_index,
+            chunk_start=chunk_start,
+            final=final
+        )
+        
+        await self.nats_client.publish_separated_audio(response)
+        return [channel.confidence for channel in channels]
+    
     async def run(self):
         """Run the application."""
         await self.initialize()
         
         # Subscribe to overlap detection
-        await self.nats_client.subscribe_overlap_detected(
-            handler=self.handle_overlap_detection
-        )
+        if self.config.nats.jetstream.enabled:
+            await self.nats_client.consume_overlap_detected(
+                handler=self.handle_jetstream_message
+            )
+        else:
+            await self.nats_client.subscribe_overlap_detected(
+                handler=self.work_queue.submit
+            )
         
         logger.info("service_started", subjects={
             "input": self.config.nats.subjects.input,
@@ -202,6 +390,12 @@ class SourceSeparationApp:
         if self.nats_client:
             await self.nats_client.disconnect()
         
+        if self.work_queue:
+            await self.work_queue.stop()
+        
+        if self.executor:
+            self.executor.shutdown(wait=False)
+        
         logger.info("shutdown_complete")
 
 
@@ -30,7 +30,7 @@ class Metrics:
         self.requests_total = Counter(
             'source_separation_requests_total',
             'Total number of source separation requests',
-            ['status']  # success, error
+            ['status']  # success, error, skipped, rejected, stale
         )
         
         # Histogram: Processing latency
@@ -53,6 +53,12 @@ class Metrics:
             'Average confidence score of separated channels'
         )
         
+        # Counter: Channels dropped below the confidence threshold
+        self.channels_dropped_total = Counter(
+            'source_separation_channels_dropped_total',
+            'Separated channels not published due to low confidence'
+        )
+        
         # Gauge: Current processing
         self.processing_current = Gauge(
             'source_separation_processing_current',
@@ -72,6 +78,52 @@ class Metrics:
             buckets=[1, 2, 3, 4, 5]
         )
         
+        # Gauge: Work queue depth
+        self.queue_depth = Gauge(
+            'source_separation_queue_depth',
+            'Number of separation requests waiting in the work queue'
+        )
+        
+        # Histogram: Time spent in the work queue
+        self.queue_wait_seconds = Histogram(
+            'source_separation_queue_wait_seconds',
+            'Time separation requests wait in the work queue',
+            buckets=[0.01, 0.1, 0.5, 1.0, 2.0, 5.0, 10.0]
+        )
+        
+        # Histogram: Time until the first chunk is published (streaming)
+        self.first_chunk_latency_seconds = Histogram(
+            'source_separation_first_chunk_latency_seconds',
+            'Time from start of processing to the first published chunk',
+            buckets=[0.25, 0.5, 1.0, 2.0, 3.0, 5.0]
+        )
+        
+        # Counter: Result cache lookups
+        self.cache_requests_total = Counter(
+            'source_separation_cache_requests_total',
+            'Separation result cache lookups',
+            ['result']  # hit, miss
+        )
+        
+        # Gauge: Result cache size
+        self.cache_bytes = Gauge(
+            'source_separation_cache_bytes',
+            'Separated audio bytes held in the result cache'
+        )
+        
+        # Gauge: Model startup time per stage
+        self.model_load_seconds = Gauge(
+            'source_separation_model_load_seconds',
+            'Time spent loading and warming up the separation model',
+            ['stage']  # load, warm_up
+        )
+        
+        # Gauge: Model loaded and warmed up
+        self.ready = Gauge(
+            'source_separation_ready',
+            'Whether the separation model is loaded and warmed up (1) or not (0)'
+        )
+        
         logger.info(f"Metrics initialized on port {port}")
     
     def start_server(self):
@@ -106,6 +158,11 @@ class Metrics:
         if self.enabled:
             self.quality_score.set(confidence)
     
+    def record_dropped_channels(self, count: int):
+        """Record channels dropped below the confidence threshold."""
+        if self.enabled and count:
+            self.channels_dropped_total.inc(count)
+    
     def increment_processing(self):
         """Increment current processing count."""
         if self.enabled:
@@ -125,6 +182,41 @@ class Metrics:
         """Record number of speakers."""
         if self.enabled:
             self.num_speakers.observe(count)
+    
+    def set_queue_depth(self, depth: int):
+        """Set current work queue depth."""
+        if self.enabled:
+            self.queue_depth.set(depth)
+    
+    def record_queue_wait(self, seconds: float):
+        """Record time a request waited in the work queue."""
+        if self.enabled:
+            self.queue_wait_seconds.observe(seconds)
+    
+    def record_first_chunk_latency(self, seconds: float):
+        """Record latency until the first chunk is published."""
+        if self.enabled:
+            self.first_chunk_latency_seconds.observe(seconds)
+    
+    def record_cache_request(self, result: str):
+        """Record a result cache hit or miss."""
+        if self.enabled:
+            self.cache_requests_total.labels(result=result).inc()
+    
+    def set_cache_bytes(self, size: int):
+        """Set bytes held in the result cache."""
+        if self.enabled:
+            self.cache_bytes.set(size)
+    
+    def record_model_load(self, stage: str, seconds: float):
+        """Record model startup stage duration."""
+        if self.enabled:
+            self.model_load_seconds.labels(stage=stage).set(seconds)
+    
+    def set_ready(self, ready: bool):
+        """Set model readiness."""
+        if self.enabled:
+            self.ready.set(1 if ready else 0)
 
 
 # Global metrics instance
@@ -138,7 +230,7 @@ def initialize_metrics(enabled: bool = True, port: int = 9090) -> Metrics:
     Args:
         enabled: Whether metrics are enabled
         port: HTTP port for Prometheus
-        
+    
     Returns:
         Metrics instance
     """
@@ -3,17 +3,25 @@
 import asyncio
 import json
 import base64
+import binascii
 import logging
+from collections import OrderedDict
 from typing import Optional, Callable, Awaitable
 from datetime import datetime
 
+import nats.errors
 from nats.aio.client import Client as NATS
 from nats.aio.errors import ErrConnectionClosed, ErrTimeout, ErrNoServers
+from nats.js.api import AckPolicy, ConsumerConfig, RetentionPolicy, StreamConfig
+from nats.js.errors import BadRequestError
 
 from .config import NATSConfig
 
 logger = logging.getLogger(__name__)
 
+# Recently completed overlap events remembered for JetStream dedup
+PROCESSED_KEYS_LIMIT = 1024
+
 
 class OverlapDetectedMessage:
     """Message received when overlap is detected."""
@@ -24,6 +32,12 @@ class OverlapDetectedMessage:
         self.speakers = data["speakers"]
         self.conversation_id = data["conversation_id"]
         self.timestamp = data["timestamp"]
+        self.start_time = data.get("start_time", 0.0)
+    
+    @property
+    def dedup_key(self) -> str:
+        """Identity of one overlap event (a conversation can have several)."""
+        return f"{self.conversation_id}:{self.start_time}"
 
 
 class SeparatedAudioMessage:
@@ -34,12 +48,18 @@ class SeparatedAudioMessage:
         channels: list,
         conversation_id: str,
         original_duration: float,
-        timestamp: Optional[float] = None
+        timestamp: Optional[float] = None,
+        chunk_index: int = 0,
+        chunk_start: float = 0.0,
+        final: bool = True
     ):
         self.channels = channels
         self.conversation_id = conversation_id
         self.original_duration = original_duration
         self.timestamp = timestamp or datetime.now().timestamp()
+        self.chunk_index = chunk_index
+        self.chunk_start = chunk_start
+        self.final = final
     
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
@@ -47,7 +67,10 @@ class SeparatedAudioMessage:
             "channels": self.channels,
             "conversation_id": self.conversation_id,
             "original_duration": self.original_duration,
-            "timestamp": self.timestamp
+            "timestamp": self.timestamp,
+            "chunk_index": self.chunk_index,
+            "chunk_start": self.chunk_start,
+            "final": self.final
         }
 
 
@@ -64,6 +87,8 @@ class NATSClient:
         self.config = config
         self.nc: Optional[NATS] = None
         self._connected = False
+        self._pull_task: Optional[asyncio.Task] = None
+        self._processed: OrderedDict = OrderedDict()
     
     async def connect(self):
         """Connect to NATS servers."""
@@ -90,6 +115,11 @@ class NATSClient:
     
     async def disconnect(self):
         """Disconnect from NATS."""
+        if self._pull_task:
+            self._pull_task.cancel()
+            await asyncio.gather(self._pull_task, return_exceptions=True)
+            self._pull_task = None
+        
         if self.nc and self._connected:
             logger.info("Disconnecting from NATS")
             await self.nc.drain()
@@ -135,6 +165,133 @@ class NATSClient:
         
         await self.nc.subscribe(subject, cb=message_handler)
     
+    async def consume_overlap_detected(
+        self,
+        handler: Callable[[OverlapDetectedMessage], Awaitable[bool]]
+    ):
+        """
+        Pull audio.overlap_detected messages from a durable JetStream consumer.
+        
+        Messages are acked when the handler returns True and nak'ed for
+        redelivery (up to max_deliver) when it returns False or raises.
+        
+        Args:
+            handler: Async function returning True once the message is done
+        """
+        if not self._connected:
+            await self.connect()
+        
+        js_config = self.config.jetstream
+        js = self.nc.jetstream()
+        await self._ensure_stream(js)
+        
+        subject = self.config.subjects.input
+        logger.info(f"Pulling {subject} from stream {js_config.stream} as {js_config.durable}")
+        
+        sub = await js.pull_subscribe(
+            subject,
+            durable=js_config.durable,
+            stream=js_config.stream,
+            config=ConsumerConfig(
+                ack_policy=AckPolicy.EXPLICIT,
+                ack_wait=js_config.ack_wait,
+                max_deliver=js_config.max_deliver,
+                max_ack_pending=js_config.max_in_flight
+            )
+        )
+        
+        self._pull_task = asyncio.create_task(self._pull_loop(sub, handler))
+    
+    async def _ensure_stream(self, js):
+        """Create the work-queue stream capturing the input subject."""
+        js_config = self.config.jetstream
+        
+        try:
+            await js.add_stream(
+                StreamConfig(
+                    name=js_config.stream,
+                    subjects=[self.config.subjects.input],
+                    retention=RetentionPolicy.WORK_QUEUE,
+                    max_age=js_config.max_age,
+                    duplicate_window=js_config.duplicate_window
+                )
+            )
+        except BadRequestError as e:
+            # Stream already exists with a different config
+            logger.warning(f"Using existing stream {js_config.stream}: {e}")
+    
+    async def _pull_loop(self, sub, handler: Callable[[OverlapDetectedMessage], Awaitable[bool]]):
+        """Fetch one message per free slot, keeping at most max_in_flight running."""
+        js_config = self.config.jetstream
+        in_flight = asyncio.Semaphore(js_config.max_in_flight)
+        tasks = set()
+        
+        def on_done(task: asyncio.Task):
+            tasks.discard(task)
+            in_flight.release()
+        
+        try:
+            while True:
+                await in_flight.acquire()
+                
+                try:
+                    msgs = await sub.fetch(batch=1, timeout=js_config.fetch_timeout)
+                except nats.errors.TimeoutError:
+                    msgs = []
+                except Exception as e:
+                    logger.error(f"JetStream fetch failed: {e}")
+                    msgs = []
+                    await asyncio.sleep(js_config.fetch_timeout)
+                
+                if not msgs:
+                    in_flight.release()
+                    continue
+                
+                task = asyncio.create_task(self._process_jetstream_msg(msgs[0], handler))
+                tasks.add(task)
+                task.add_done_callback(on_done)
+            
+        finally:
+            # Unacked in-flight messages are redelivered after ack_wait
+            for task in list(tasks):
+                task.cancel()
+    
+    async def _process_jetstream_msg(self, msg, handler: Callable[[OverlapDetectedMessage], Awaitable[bool]]):
+        """Run the handler for one JetStream message and ack/nak it."""
+        try:
+            message = OverlapDetectedMessage(json.loads(msg.data.decode()))
+        except (ValueError, TypeError, KeyError, binascii.Error) as e:
+            # Bad JSON / UTF-8, missing fields, non-object payload or invalid base64 audio
+            logger.error(f"Discarding malformed message: {e}")
+            await msg.term()
+            return
+        
+        if message.dedup_key in self._processed:
+            logger.info(f"Skipping duplicate overlap {message.dedup_key}")
+            await msg.ack()
+            return
+        
+        try:
+            done = await handler(message)
+        except Exception as e:
+            logger.error(f"Error handling message: {e}", exc_info=True)
+            done = False
+        
+        if done:
+            self._processed[message.dedup_key] = True
+            if len(self._processed) > PROCESSED_KEYS_LIMIT:
+                self._processed.popitem(last=False)
+            await msg.ack()
+            return
+        
+        delivered = msg.metadata.num_delivered
+        if delivered >= self.config.jetstream.max_deliver:
+            logger.error(f"Giving up on {message.dedup_key} after {delivered} deliveries")
+            await msg.term()
+            return
+        
+        await msg.nak(delay=self.config.jetstream.nak_delay)
+    
     async def publish_separated_audio(self, message: SeparatedAudioMessage):
         """
         Publish separated audio channels.
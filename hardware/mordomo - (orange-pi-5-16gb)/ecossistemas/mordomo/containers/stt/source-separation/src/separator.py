@@ -1,21 +1,23 @@
-"""Source separation service using Demucs."""
+"""Source separation service (speech separation backends)."""
 
 import base64
-import io
+import itertools
 import logging
-from typing import List, Dict, Tuple, Optional
+import threading
+from typing import Iterator, List, Optional, Tuple
 import time
 
 import numpy as np
-import soundfile as sf
-import torch
-from demucs.pretrained import get_model
-from demucs.apply import apply_model
 
-from .config import DemucsConfig, ProcessingConfig
+from .backends import SeparationBackend, create_backend
+from .config import DemucsConfig, ProcessingConfig, SeparationConfig
+from .quality import channel_confidence
 
 logger = logging.getLogger(__name__)
 
+MAX_SPEAKERS = 3
+WARM_UP_SECONDS = 1.0
+
 
 class SeparatedChannel:
     """Represents a separated audio channel."""
@@ -27,44 +29,53 @@ class SeparatedChannel:
 
 
 class SourceSeparationService:
-    """Service for separating overlapping voices using Demucs."""
+    """Service for separating overlapping voices with a pluggable backend."""
     
-    def __init__(self, demucs_config: DemucsConfig, processing_config: ProcessingConfig):
+    def __init__(
+        self,
+        demucs_config: DemucsConfig,
+        processing_config: ProcessingConfig,
+        separation_config: Optional[SeparationConfig] = None
+    ):
         """
         Initialize the source separation service.
         
         Args:
             demucs_config: Demucs model configuration
             processing_config: Audio processing configuration
+            separation_config: Separation backend configuration
         """
         self.demucs_config = demucs_config
         self.processing_config = processing_config
-        self.model = None
+        self.separation_config = separation_config or SeparationConfig()
+        self.backend: SeparationBackend = create_backend(self.separation_config, demucs_config)
         self._initialized = False
-        
+        self._load_lock = threading.Lock()
+        self.ready = False
+    
     def initialize(self):
-        """Load Demucs model (lazy initialization for faster startup)."""
+        """
+        Load the separation backend (at startup in eager mode, else on the first request).
+        
+        Executor workers may race here in lazy mode: the lock makes sure the
+        backend is loaded only once.
+        """
         if self._initialized:
             return
-            
-        logger.info(f"Loading Demucs model: {self.demucs_config.model}")
-        start_time = time.time()
         
-        try:
-            self.model = get_model(self.demucs_config.model)
+        with self._load_lock:
+            if self._initialized:
+                return
             
-            # Move model to specified device
-            device = torch.device(self.demucs_config.device)
-            self.model.to(device)
-            self.model.eval()
+            logger.info(f"Loading separation backend: {self.backend.name}")
             
-            self._initialized = True
-            elapsed = time.time() - start_time
-            logger.info(f"Demucs model loaded successfully in {elapsed:.2f}s")
-            
-        except Exception as e:
-            logger.error(f"Failed to load Demucs model: {e}")
-            raise
+            try:
+                self.backend.load()
+                self._initialized = True
+                
+            except Exception as e:
+                logger.error(f"Failed to load separation backend {self.backend.name}: {e}")
+                raise
     
     def separate_audio(
         self, 
@@ -81,13 +92,10 @@ class SourceSeparationService:
             sample_rate: Audio sample rate (Hz)
             speakers: List of speaker IDs detected in the audio
             duration: Audio duration in seconds
-            
+        
         Returns:
             List of SeparatedChannel objects, one per speaker
         """
-        # Ensure model is loaded
-        self.initialize()
-        
         # Validate duration
         if duration > self.processing_config.max_duration:
             logger.warning(
@@ -95,6 +103,13 @@ class SourceSeparationService:
             )
             raise ValueError(f"Audio too long: {duration}s")
         
+        # Eager mode: the app loads and warms up the backend before any work
+        if self.separation_config.eager_load and not self.ready:
+            raise RuntimeError("Separation backend not ready")
+        
+        # Lazy mode: load on the first request
+        self.initialize()
+        
         logger.info(f"Separating {duration}s audio with {len(speakers)} speakers")
         start_time = time.time()
         
@@ -102,11 +117,12 @@ class SourceSeparationService:
             # Convert bytes to numpy array
             audio_array = self._decode_audio(audio_data, sample_rate)
             
-            # Separate sources using Demucs
-            separated = self._apply_demucs(audio_array, sample_rate)
+            # One stream per speaker (max 3 speakers as per spec)
+            num_speakers = min(len(speakers), MAX_SPEAKERS)
+            streams = self.backend.separate(audio_array, sample_rate, num_speakers)
             
-            # Extract vocal tracks and assign to speakers
-            channels = self._assign_speakers(separated, speakers, sample_rate)
+            # Assign streams to speaker IDs
+            channels = self._assign_speakers(streams, speakers)
             
             elapsed = time.time() - start_time
             logger.info(f"Separation completed in {elapsed:.2f}s")
@@ -117,6 +133,103 @@ class SourceSeparationService:
             logger.error(f"Source separation failed: {e}")
             raise
     
+    def warm_up(self, sample_rate: int = 16000) -> float:
+        """
+        Run one dummy separation so the first real request is not the slowest.
+        
+        Args:
+            sample_rate: Sample rate of the dummy audio
+        
+        Returns:
+            Warm-up time in seconds
+        """
+        self.initialize()
+        
+        start_time = time.time()
+        dummy = np.random.default_rng(0).standard_normal(int(WARM_UP_SECONDS * sample_rate))
+        self.backend.separate((0.01 * dummy).astype(np.float32), sample_rate, 2)
+        elapsed = time.time() - start_time
+        
+        self.ready = True
+        logger.info(f"Separation backend warmed up in {elapsed:.2f}s")
+        return elapsed
+    
+    def separate_stream(
+        self,
+        audio_data: bytes,
+        sample_rate: int,
+        speakers: List[str]
+    ) -> Iterator[Tuple[int, float, List[SeparatedChannel], bool]]:
+        """
+        Separate audio in fixed-size overlapping chunks, yielding each as soon as it is ready.
+        
+        Chunks overlap by ``chunk_overlap`` seconds. Each chunk's streams are
+        permuted to match the previous chunk's tail (speaker identity carries
+        over) and linearly crossfaded with it. Yielded chunks are contiguous
+        and non-overlapping; there is no duration limit.
+        
+        Args:
+            audio_data: Raw audio bytes (PCM)
+            sample_rate: Audio sample rate (Hz)
+            speakers: List of speaker IDs detected in the audio
+            
+        Yields:
+            (chunk_index, chunk_start_seconds, channels, is_final); nothing for empty audio
+        """
+        if self.separation_config.eager_load and not self.ready:
+            raise RuntimeError("Separation backend not ready")
+        
+        self.initialize()
+        
+        audio = self._decode_audio(audio_data, sample_rate)
+        if len(audio) == 0:
+            logger.warning("Empty audio, nothing to separate")
+            return
+        
+        num_speakers = min(len(speakers), MAX_SPEAKERS)
+        
+        chunk_size = int(self.processing_config.chunk_duration * sample_rate)
+        overlap = int(self.processing_config.chunk_overlap * sample_rate)
+        hop = chunk_size - overlap
+        fade_in = np.linspace(0.0, 1.0, overlap, endpoint=False, dtype=np.float32)
+        fade_out = 1.0 - fade_in
+        
+        tail = None
+        order = None
+        start = 0
+        
+        for chunk_index in itertools.count():
+            end = min(start + chunk_size, len(audio))
+            is_final = end >= len(audio)
+            chunk_start = time.time()
+            
+            streams = self.backend.separate(audio[start:end], sample_rate, num_speakers)
+            
+            if tail is None:
+                # First chunk fixes the speaker order (energy rank)
+                order = self._energy_order(streams)
+                streams = streams[order]
+            else:
+                streams = streams[_best_permutation(tail, streams[:, :overlap])]
+                streams[:, :overlap] = tail * fade_out + streams[:, :overlap] * fade_in
+            
+            committed = end - start if is_final else end - start - overlap
+            channels = self._assign_speakers(
+                streams[:, :committed], speakers, order=np.arange(len(streams))
+            )
+            
+            logger.info(
+                f"Chunk {chunk_index} ({(end - start) / sample_rate:.2f}s) separated "
+                f"in {time.time() - chunk_start:.2f}s"
+            )
+            yield chunk_index, start / sample_rate, channels, is_final
+            
+            if is_final:
+                return
+            
+            tail = streams[:, committed:].copy()
+            start += hop
+    
     def _decode_audio(self, audio_data: bytes, sample_rate: int) -> np.ndarray:
         """
         Decode audio bytes to numpy array.
@@ -124,7 +237,7 @@ class SourceSeparationService:
         Args:
             audio_data: Raw PCM audio bytes
             sample_rate: Sample rate in Hz
-            
+        
         Returns:
             Numpy array with shape (samples,) or (samples, channels)
         """
@@ -136,152 +249,49 @@ class SourceSeparationService:
         
         return audio_array
     
-    def _apply_demucs(self, audio: np.ndarray, sample_rate: int) -> torch.Tensor:
-        """
-        Apply Demucs separation model to audio.
-        
-        Args:
-            audio: Audio array
-            sample_rate: Sample rate
-            
-        Returns:
-            Separated sources tensor with shape (sources, channels, samples)
-        """
-        # Convert to torch tensor
-        if len(audio.shape) == 1:
-            # Mono to stereo (Demucs expects stereo)
-            audio = np.stack([audio, audio], axis=0)
-        else:
-            audio = audio.T  # (channels, samples)
-        
-        wav = torch.from_numpy(audio).float().unsqueeze(0)  # (1, channels, samples)
-        
-        # Move to device
-        device = torch.device(self.demucs_config.device)
-        wav = wav.to(device)
-        
-        # Apply model
-        with torch.no_grad():
-            sources = apply_model(
-                self.model,
-                wav,
-                shifts=self.demucs_config.shifts,
-                overlap=self.demucs_config.overlap,
-                split=True,
-                device=device
-            )
-        
-        # sources shape: (1, sources, channels, samples)
-        # Remove batch dimension
-        sources = sources[0]  # (sources, channels, samples)
-        
-        return sources
-    
     def _assign_speakers(
         self, 
-        separated: torch.Tensor, 
+        streams: np.ndarray, 
         speakers: List[str],
-        sample_rate: int
+        order: Optional[np.ndarray] = None
     ) -> List[SeparatedChannel]:
         """
-        Assign separated sources to speaker IDs.
+        Assign separated streams to speaker IDs.
         
-        The htdemucs_ft model typically outputs 4 sources:
-        - vocals
-        - drums
-        - bass
-        - other
-        
-        We take the vocals source and separate it by energy/amplitude.
+        Separation output order is arbitrary, so streams are ranked by
+        energy and matched to the speakers in the order they were reported.
+        Confidence is the reference-free estimate from ``quality``.
         
         Args:
-            separated: Separated sources tensor (sources, channels, samples)
+            streams: Separated streams (streams, samples)
             speakers: List of speaker IDs
-            sample_rate: Sample rate
-            
+            order: Stream index per speaker (default: energy rank)
+        
         Returns:
             List of SeparatedChannel objects
         """
-        # Extract vocals (usually index 0 for htdemucs_ft)
-        vocals = separated[0].cpu().numpy()  # (channels, samples)
+        confidences = channel_confidence(streams)
         
-        # Convert stereo to mono
-        if vocals.shape[0] == 2:
-            vocals_mono = vocals.mean(axis=0)
-        else:
-            vocals_mono = vocals[0]
+        if order is None:
+            order = self._energy_order(streams)
         
-        # Simple separation: split audio in temporal chunks and assign by energy
-        num_speakers = min(len(speakers), 3)  # Max 3 speakers as per spec
         channels = []
-        
-        if num_speakers == 1:
-            # Single speaker - return all vocals
-            confidence = 0.95
+        for i, stream_idx in enumerate(order):
             channels.append(
                 SeparatedChannel(
-                    audio=vocals_mono,
-                    speaker_id=speakers[0],
-                    confidence=confidence
+                    audio=streams[stream_idx],
+                    speaker_id=speakers[i] if i < len(speakers) else f"unknown_{i}",
+                    confidence=float(confidences[stream_idx])
                 )
             )
-        else:
-            # Multiple speakers - use energy-based separation
-            # This is a simplified approach; more sophisticated methods could use:
-            # - Clustering (k-means on MFCC features)
-            # - Voice activity detection
-            # - Directional audio analysis
-            
-            # Split into overlapping windows
-            window_size = int(0.5 * sample_rate)  # 500ms windows
-            hop_size = int(0.25 * sample_rate)  # 250ms hop
-            
-            segments = []
-            energies = []
-            
-            for i in range(0, len(vocals_mono) - window_size, hop_size):
-                segment = vocals_mono[i:i + window_size]
-                energy = np.sqrt(np.mean(segment ** 2))  # RMS energy
-                segments.append((i, segment))
-                energies.append(energy)
-            
-            # Assign segments to speakers based on energy clusters
-            if len(energies) > 0:
-                energies_array = np.array(energies)
-                # Simple threshold-based separation
-                sorted_energies = np.sort(energies_array)
-                
-                # Assign top energy segments to first speaker, rest to second
-                threshold = np.median(sorted_energies)
-                
-                speaker_audios = [np.zeros_like(vocals_mono) for _ in range(num_speakers)]
-                
-                for (start_idx, segment), energy in zip(segments, energies):
-                    if num_speakers == 2:
-                        speaker_idx = 0 if energy > threshold else 1
-                    else:  # 3 speakers
-                        if energy > sorted_energies[int(len(sorted_energies) * 0.67)]:
-                            speaker_idx = 0
-                        elif energy > sorted_energies[int(len(sorted_energies) * 0.33)]:
-                            speaker_idx = 1
-                        else:
-                            speaker_idx = 2
-                    
-                    speaker_audios[speaker_idx][start_idx:start_idx + len(segment)] += segment
-                
-                # Create channels
-                for i in range(num_speakers):
-                    confidence = 0.75 - (i * 0.1)  # Decreasing confidence
-                    channels.append(
-                        SeparatedChannel(
-                            audio=speaker_audios[i],
-                            speaker_id=speakers[i] if i < len(speakers) else f"unknown_{i}",
-                            confidence=confidence
-                        )
-                    )
         
         return channels
     
+    @staticmethod
+    def _energy_order(streams: np.ndarray) -> np.ndarray:
+        """Stream indices sorted by decreasing energy."""
+        return np.argsort(np.einsum("ij,ij->i", streams, streams))[::-1]
+    
     def encode_audio(self, audio: np.ndarray, sample_rate: int = 16000) -> str:
         """
         Encode numpy audio array to base64 PCM.
@@ -289,7 +299,7 @@ class SourceSeparationService:
         Args:
             audio: Audio array
             sample_rate: Sample rate
-            
+        
         Returns:
             Base64 encoded PCM string
         """
@@ -301,3 +311,21 @@ class SourceSeparationService:
         
         # Encode to base64
         return base64.b64encode(audio_bytes).decode('utf-8')
+
+
+def _best_permutation(previous: np.ndarray, current: np.ndarray) -> List[int]:
+    """
+    Permutation of ``current`` streams that best matches ``previous`` (overlap region).
+    
+    Args:
+        previous: Previous chunk tail (streams, samples)
+        current: Current chunk head over the same samples (streams, samples)
+    
+    Returns:
+        Index list so that current[perm[i]] continues previous[i]
+    """
+    similarity = previous @ current.T
+    return list(max(
+        itertools.permutations(range(len(current))),
+        key=lambda perm: similarity[np.arange(len(perm)), perm].sum()
+    ))
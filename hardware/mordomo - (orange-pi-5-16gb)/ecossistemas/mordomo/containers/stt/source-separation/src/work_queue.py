@@ -0,0 +1,122 @@
+"""Bounded work queue with back-pressure for separation requests."""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional
+
+from .metrics import Metrics
+from .nats_client import OverlapDetectedMessage
+
+logger = logging.getLogger(__name__)
+
+
+def is_stale(message: OverlapDetectedMessage, stale_after: float, now: Optional[float] = None) -> bool:
+    """
+    Whether the message is older than stale_after seconds.
+
+    Age is measured against the producer's wall-clock ``timestamp``, so it
+    assumes the hosts' clocks are synchronized (NTP).
+    """
+    now = time.time() if now is None else now
+    return now - message.timestamp > stale_after
+
+
+class WorkQueue:
+    """
+    Admission-controlled queue drained by a fixed number of workers.
+
+    Messages are rejected when the queue is full and dropped when they are
+    older than ``stale_after`` seconds by the time a worker picks them up.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[OverlapDetectedMessage], Awaitable[bool]],
+        num_workers: int,
+        max_depth: int,
+        stale_after: float,
+        metrics: Metrics
+    ):
+        """
+        Initialize the work queue.
+
+        Args:
+            handler: Async function processing one message (True when done)
+            num_workers: Number of concurrent workers
+            max_depth: Maximum queued messages before rejecting
+            stale_after: Maximum message age (seconds) when dequeued
+            metrics: Metrics collector
+        """
+        self.handler = handler
+        self.num_workers = num_workers
+        self.stale_after = stale_after
+        self.metrics = metrics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_depth)
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self):
+        """Start the worker tasks."""
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.num_workers)
+        ]
+        logger.info(
+            f"Work queue started: {self.num_workers} workers, max depth {self.queue.maxsize}"
+        )
+
+    async def stop(self):
+        """Cancel the workers; queued messages are discarded."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, message: OverlapDetectedMessage) -> bool:
+        """
+        Enqueue a message without blocking.
+
+        Args:
+            message: Overlap detection message
+
+        Returns:
+            True if accepted, False if rejected because the queue is full
+        """
+        try:
+            self.queue.put_nowait((message, time.monotonic()))
+        except asyncio.QueueFull:
+            logger.warning(
+                f"Queue full ({self.queue.maxsize}), rejecting conversation {message.conversation_id}"
+            )
+            self.metrics.record_request(status='rejected')
+            return False
+
+        self.metrics.set_queue_depth(self.queue.qsize())
+        return True
+
+    def is_stale(self, message: OverlapDetectedMessage, now: Optional[float] = None) -> bool:
+        """Whether the message is older than the staleness deadline."""
+        return is_stale(message, self.stale_after, now)
+
+    async def _worker(self, worker_id: int):
+        """Process queued messages until cancelled."""
+        while True:
+            message, enqueued_at = await self.queue.get()
+            self.metrics.set_queue_depth(self.queue.qsize())
+            self.metrics.record_queue_wait(time.monotonic() - enqueued_at)
+
+            try:
+                if self.is_stale(message):
+                    logger.warning(
+                        f"Dropping stale conversation {message.conversation_id} "
+                        f"(age {time.time() - message.timestamp:.1f}s)"
+                    )
+                    self.metrics.record_request(status='stale')
+                    continue
+
+                await self.handler(message)
+
+            except Exception as e:
+                logger.error(f"Worker {worker_id} failed: {e}", exc_info=True)
+
+            finally:
+                self.queue.task_done()
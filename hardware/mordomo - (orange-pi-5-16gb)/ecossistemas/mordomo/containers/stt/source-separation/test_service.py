@@ -6,6 +6,7 @@ Script de teste para enviar mensagem de overlap detection via NATS.
 import asyncio
 import json
 import base64
+import time
 import numpy as np
 from nats.aio.client import Client as NATS
 
@@ -60,7 +61,7 @@ async def test_overlap_detection():
             "duration": 2.5,
             "speakers": ["user_1", "user_2"],
             "conversation_id": "test-overlap-123",
-            "timestamp": 1732723200.123
+            "timestamp": time.time()
         }
         
         print(f"📤 Enviando mensagem de overlap ({len(audio_bytes)} bytes)...")
@@ -0,0 +1,185 @@
+"""Tests for separation backends."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Export script lives at the container root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.backends import OnnxSpeechBackend, DemucsBackend, create_backend
+from src.config import DemucsConfig, SeparationConfig
+
+
+@pytest.fixture(scope="module")
+def onnx_models(tmp_path_factory):
+    """Tiny random-weight ConvTasNet models (2 and 3 speakers) exported to ONNX."""
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("onnx")
+    torchaudio = pytest.importorskip("torchaudio")
+    from export_separation_onnx import export_model
+    
+    output_dir = tmp_path_factory.mktemp("models")
+    models = {}
+    for num_sources in (2, 3):
+        model = torchaudio.models.ConvTasNet(
+            num_sources=num_sources,
+            enc_num_feats=32,
+            msk_num_feats=16,
+            msk_num_hidden_feats=32,
+            msk_num_layers=2,
+            msk_num_stacks=1
+        )
+        models[num_sources] = export_model(
+            model, str(output_dir / f"convtasnet_{num_sources}spk.onnx"), sample_rate=8000
+        )
+    return models
+
+
+@pytest.fixture
+def mixture():
+    """Two tones at 16 kHz (1.5 s)."""
+    t = np.arange(24000) / 16000
+    return (0.3 * np.sin(2 * np.pi * 220 * t) + 0.2 * np.sin(2 * np.pi * 660 * t)).astype(np.float32)
+
+
+def test_create_backend(tmp_path):
+    """Backend is selected by separation.backend."""
+    model_path = tmp_path / "convtasnet_2spk.onnx"
+    model_path.touch()
+    onnx_config = SeparationConfig(backend="onnx", models={2: str(model_path)})
+    
+    assert isinstance(create_backend(onnx_config, DemucsConfig()), OnnxSpeechBackend)
+    assert isinstance(create_backend(SeparationConfig(backend="demucs"), DemucsConfig()), DemucsBackend)
+    
+    with pytest.raises(ValueError, match="Unknown separation backend"):
+        create_backend(SeparationConfig(backend="nope"), DemucsConfig())
+
+
+def test_missing_onnx_models_fall_back_to_demucs(tmp_path, caplog):
+    """Default config without exported models starts with Demucs instead of failing."""
+    config = SeparationConfig(models={2: str(tmp_path / "missing.onnx")})
+    
+    with caplog.at_level("WARNING"):
+        backend = create_backend(config, DemucsConfig())
+    
+    assert isinstance(backend, DemucsBackend)
+    assert "export_separation_onnx.py" in caplog.text
+
+
+def test_onnx_backend_missing_models(tmp_path):
+    """Loading fails when no configured model exists."""
+    backend = OnnxSpeechBackend(SeparationConfig(models={2: str(tmp_path / "missing.onnx")}))
+    
+    with pytest.raises(FileNotFoundError):
+        backend.load()
+
+
+def test_onnx_backend_streams(onnx_models, mixture):
+    """Model outputs one stream per speaker, resampled back and mixture-consistent."""
+    backend = OnnxSpeechBackend(SeparationConfig(models=onnx_models))
+    backend.load()
+    
+    assert backend.sample_rates == {2: 8000, 3: 8000}
+    
+    for num_speakers in (2, 3):
+        streams = backend.separate(mixture, 16000, num_speakers)
+        
+        assert streams.shape == (num_speakers, len(mixture))
+        assert streams.dtype == np.float32
+        # Streams add back up to the mixture (up to resampling error)
+        assert np.abs(streams.sum(axis=0) - mixture).max() < 0.05
+
+
+def test_onnx_backend_picks_larger_model(onnx_models, mixture):
+    """Only the 3-speaker model configured: 2 speakers keep the loudest streams."""
+    backend = OnnxSpeechBackend(SeparationConfig(models={3: onnx_models[3]}))
+    backend.load()
+    
+    assert backend.separate(mixture, 16000, 2).shape == (2, len(mixture))
+
+
+def test_onnx_backend_single_speaker(mixture):
+    """A single speaker skips the model."""
+    backend = OnnxSpeechBackend(SeparationConfig())
+    streams = backend.separate(mixture, 16000, 1)
+    
+    assert streams.shape == (1, len(mixture))
+    assert np.array_equal(streams[0], mixture)
+
+
+@pytest.mark.parametrize("num_speakers", [2, 3])
+def test_demucs_energy_split_preserves_amplitude(num_speakers):
+    """Overlapping windows must not double the amplitude (edges included)."""
+    sample_rate = 16000
+    vocals = np.random.default_rng(0).standard_normal(3 * sample_rate + 1234).astype(np.float32) * 0.1
+    
+    streams = DemucsBackend(DemucsConfig())._split_by_energy(vocals, sample_rate, num_speakers)
+    
+    assert streams.shape == (num_speakers, len(vocals))
+    assert np.allclose(streams.sum(axis=0), vocals, atol=1e-5)
+
+
+def test_demucs_energy_split_assigns_loud_windows():
+    """Loud windows go to the first stream, quiet ones to the second."""
+    sample_rate = 16000
+    rng = np.random.default_rng(1)
+    vocals = np.concatenate([
+        rng.standard_normal(2 * sample_rate) * 0.5,
+        rng.standard_normal(2 * sample_rate) * 0.05
+    ]).astype(np.float32)
+    
+    streams = DemucsBackend(DemucsConfig())._split_by_energy(vocals, sample_rate, 2)
+    
+    loud, quiet = slice(0, sample_rate), slice(3 * sample_rate, 4 * sample_rate)
+    assert np.allclose(streams[0, loud], vocals[loud], atol=1e-5)
+    assert np.allclose(streams[1, quiet], vocals[quiet], atol=1e-5)
+
+
+def test_demucs_energy_split_short_audio():
+    """Audio shorter than one window is still fully covered."""
+    vocals = np.ones(3000, dtype=np.float32)
+    streams = DemucsBackend(DemucsConfig())._split_by_energy(vocals, 16000, 2)
+    
+    assert streams.shape == (2, 3000)
+    assert np.allclose(streams.sum(axis=0), 1.0)
+
+
+@pytest.fixture
+def tiny_demucs_bag(monkeypatch):
+    """htdemucs_ft-like bag: one tiny random model per source, one-hot weights."""
+    pytest.importorskip("demucs")
+    import demucs.pretrained
+    from demucs.apply import BagOfModels
+    from demucs.demucs import Demucs
+    
+    sources = ["drums", "bass", "other", "vocals"]
+    models = [Demucs(sources=sources, channels=4, depth=2) for _ in sources]
+    weights = [[1.0 if i == j else 0.0 for j in range(len(sources))] for i in range(len(sources))]
+    bag = BagOfModels(models, weights)
+    
+    monkeypatch.setattr(demucs.pretrained, "get_model", lambda name: bag)
+    return bag
+
+
+def test_demucs_bag_restricted_to_vocals(tiny_demucs_bag):
+    """Only the vocals model of the bag is kept."""
+    backend = DemucsBackend(DemucsConfig())
+    backend.load()
+    
+    assert len(backend.model.models) == 1
+    assert backend.model.models[0] is tiny_demucs_bag.models[3]
+    assert backend.vocals_idx == 3
+
+
+def test_demucs_mono_path(tiny_demucs_bag, mixture):
+    """Mono 16 kHz in, mono streams at 16 kHz out."""
+    backend = DemucsBackend(DemucsConfig())
+    backend.load()
+    
+    streams = backend.separate(mixture, 16000, 2)
+    
+    assert streams.shape == (2, len(mixture))
+    assert np.isfinite(streams).all()
@@ -0,0 +1,76 @@
+"""Tests for the separation result cache."""
+
+import time
+
+import numpy as np
+import pytest
+
+from src.cache import SeparationCache, config_fingerprint
+from src.config import DemucsConfig, SeparationConfig
+from src.metrics import Metrics
+
+
+@pytest.fixture
+def cache():
+    """Cache holding up to 100 bytes for 60 s."""
+    return SeparationCache(max_bytes=100, ttl=60.0, metrics=Metrics(enabled=False))
+
+
+def test_key_depends_on_audio_speakers_and_config():
+    """Any input that changes the output changes the key."""
+    audio = np.arange(100, dtype=np.int16).tobytes()
+    key = SeparationCache.make_key(audio, ["user_1", "user_2"], "cfg")
+    
+    assert key == SeparationCache.make_key(audio, ["user_1", "user_2"], "cfg")
+    assert key != SeparationCache.make_key(audio[:-2], ["user_1", "user_2"], "cfg")
+    assert key != SeparationCache.make_key(audio, ["user_2", "user_1"], "cfg")
+    assert key != SeparationCache.make_key(audio, ["user_1", "user_2"], "other")
+
+
+def test_config_fingerprint():
+    """Fingerprint changes with the model config."""
+    assert config_fingerprint(SeparationConfig()) == config_fingerprint(SeparationConfig())
+    assert config_fingerprint(SeparationConfig()) != config_fingerprint(SeparationConfig(backend="demucs"))
+    assert config_fingerprint(SeparationConfig(), DemucsConfig()) != config_fingerprint(SeparationConfig())
+
+
+def test_hit_and_miss(cache):
+    """Stored values are returned until evicted."""
+    assert cache.get("a") is None
+    
+    cache.put("a", "value", 10)
+    
+    assert cache.get("a") == "value"
+    assert cache.bytes_held == 10
+
+
+def test_lru_eviction_by_bytes(cache):
+    """Least recently used entries are evicted past max_bytes."""
+    cache.put("a", 1, 40)
+    cache.put("b", 2, 40)
+    cache.get("a")  # b is now least recently used
+    cache.put("c", 3, 40)
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.bytes_held == 80
+
+
+def test_oversized_value_not_cached(cache):
+    """Values larger than the whole cache are skipped."""
+    cache.put("big", 1, 200)
+    
+    assert cache.get("big") is None
+    assert cache.bytes_held == 0
+
+
+def test_ttl_expiry():
+    """Expired entries are misses and release their bytes."""
+    cache = SeparationCache(max_bytes=100, ttl=0.01, metrics=Metrics(enabled=False))
+    cache.put("a", 1, 10)
+    time.sleep(0.02)
+    
+    assert cache.get("a") is None
+    assert cache.bytes_held == 0
+    assert len(cache) == 0
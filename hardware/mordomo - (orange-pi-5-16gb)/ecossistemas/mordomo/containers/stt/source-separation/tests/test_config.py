@@ -32,6 +32,13 @@ def test_processing_config_defaults():
     assert config.num_workers == 2
 
 
+@pytest.mark.parametrize("overlap", [-0.1, 4.0, 5.0])
+def test_processing_config_rejects_invalid_chunk_overlap(overlap):
+    """Chunk overlap must be non-negative and shorter than the chunk."""
+    with pytest.raises(ValueError):
+        ProcessingConfig(chunk_duration=4.0, chunk_overlap=overlap)
+
+
 def test_trigger_config_defaults():
     """Test TriggerConfig default values."""
     config = TriggerConfig()
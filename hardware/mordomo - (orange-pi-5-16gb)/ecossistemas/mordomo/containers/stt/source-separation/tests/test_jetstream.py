@@ -0,0 +1,186 @@
+"""Tests for the JetStream pull-consumer mode."""
+
+import asyncio
+import base64
+import json
+import shutil
+import socket
+import subprocess
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.config import NATSConfig
+from src.nats_client import NATSClient
+
+
+def make_payload(conversation_id: str = "conv-1", start_time: float = 1.5) -> bytes:
+    """Serialized audio.overlap_detected payload."""
+    return json.dumps({
+        "audio": base64.b64encode(b"\x00\x00").decode(),
+        "duration": 1.0,
+        "speakers": ["user_1", "user_2"],
+        "conversation_id": conversation_id,
+        "start_time": start_time,
+        "timestamp": time.time()
+    }).encode()
+
+
+class FakeMsg:
+    """Minimal JetStream message recording ack/nak/term."""
+    
+    def __init__(self, data: bytes, num_delivered: int = 1):
+        self.data = data
+        self.metadata = SimpleNamespace(num_delivered=num_delivered)
+        self.result = None
+    
+    async def ack(self):
+        self.result = "ack"
+    
+    async def nak(self, delay=None):
+        self.result = "nak"
+    
+    async def term(self):
+        self.result = "term"
+
+
+@pytest.fixture
+def nats_client():
+    """Client with JetStream enabled (not connected)."""
+    return NATSClient(NATSConfig(jetstream={"enabled": True, "max_deliver": 3}))
+
+
+@pytest.mark.asyncio
+async def test_ack_on_success_and_dedup(nats_client):
+    """Completed overlaps are acked; redeliveries of them are acked without processing."""
+    calls = []
+    
+    async def handler(message):
+        calls.append(message.dedup_key)
+        return True
+    
+    first, duplicate = FakeMsg(make_payload()), FakeMsg(make_payload(), num_delivered=2)
+    await nats_client._process_jetstream_msg(first, handler)
+    await nats_client._process_jetstream_msg(duplicate, handler)
+    
+    assert first.result == "ack"
+    assert duplicate.result == "ack"
+    assert calls == ["conv-1:1.5"]
+
+
+@pytest.mark.asyncio
+async def test_same_conversation_different_overlaps(nats_client):
+    """Several overlaps in one conversation are not duplicates."""
+    calls = []
+    
+    async def handler(message):
+        calls.append(message.dedup_key)
+        return True
+    
+    await nats_client._process_jetstream_msg(FakeMsg(make_payload(start_time=1.0)), handler)
+    await nats_client._process_jetstream_msg(FakeMsg(make_payload(start_time=4.0)), handler)
+    
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_nak_on_failure_then_term(nats_client):
+    """Failures are redelivered until max_deliver, then terminated."""
+    async def handler(message):
+        raise RuntimeError("boom")
+    
+    retry, last = FakeMsg(make_payload(), num_delivered=1), FakeMsg(make_payload(), num_delivered=3)
+    await nats_client._process_jetstream_msg(retry, handler)
+    await nats_client._process_jetstream_msg(last, handler)
+    
+    assert retry.result == "nak"
+    assert last.result == "term"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("data", [
+    b"not json",
+    b"\xff\xfe",
+    b"[1, 2]",
+    json.dumps({"audio": "abc", "duration": 1.0}).encode(),
+    make_payload().replace(b'"audio": "AAA="', b'"audio": "A"'),
+])
+async def test_malformed_message_terminated(nats_client, data):
+    """Unparseable payloads (JSON, UTF-8, shape, base64) are not redelivered."""
+    async def handler(message):
+        return True
+    
+    msg = FakeMsg(data)
+    await nats_client._process_jetstream_msg(msg, handler)
+    
+    assert msg.result == "term"
+
+
+@pytest.fixture
+def nats_server(tmp_path):
+    """Local nats-server with JetStream (skipped when the binary is missing)."""
+    binary = shutil.which("nats-server")
+    if binary is None:
+        pytest.skip("nats-server not available")
+    
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    
+    process = subprocess.Popen(
+        [binary, "-js", "-a", "127.0.0.1", "-p", str(port), "-sd", str(tmp_path)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    time.sleep(0.5)
+    yield f"nats://127.0.0.1:{port}"
+    process.terminate()
+    process.wait()
+
+
+@pytest.mark.asyncio
+async def test_jetstream_survives_consumer_restart(nats_server):
+    """Triggers published while the service is down are processed after it starts."""
+    from nats.aio.client import Client as NATS
+    
+    config = NATSConfig(
+        servers=[nats_server],
+        jetstream={"enabled": True, "max_in_flight": 1, "ack_wait": 2.0, "nak_delay": 0.1, "fetch_timeout": 0.2}
+    )
+    
+    # Create the stream, then stop consuming (service restarting)
+    client = NATSClient(config)
+    await client.connect()
+    await client._ensure_stream(client.nc.jetstream())
+    await client.disconnect()
+    
+    publisher = NATS()
+    await publisher.connect(servers=[nats_server])
+    for start_time in (1.0, 1.0, 2.0):
+        # Same Msg-Id twice: stored once by the stream
+        await publisher.jetstream().publish(
+            config.subjects.input,
+            make_payload(start_time=start_time),
+            headers={"Nats-Msg-Id": f"conv-1:{start_time}"}
+        )
+    await publisher.close()
+    
+    attempts = {}
+    done = asyncio.Event()
+    
+    async def handler(message):
+        attempts[message.dedup_key] = attempts.get(message.dedup_key, 0) + 1
+        # First attempt of the second overlap fails and is redelivered
+        if message.start_time == 2.0 and attempts[message.dedup_key] == 1:
+            return False
+        if len(attempts) == 2 and attempts["conv-1:2.0"] == 2:
+            done.set()
+        return True
+    
+    client = NATSClient(config)
+    await client.consume_overlap_detected(handler)
+    await asyncio.wait_for(done.wait(), timeout=10.0)
+    await client.disconnect()
+    
+    assert attempts == {"conv-1:1.0": 1, "conv-1:2.0": 2}
@@ -0,0 +1,76 @@
+"""Tests for the per-channel quality estimates."""
+
+import numpy as np
+import pytest
+
+from src.quality import (
+    NOISE_FLATNESS,
+    channel_confidence,
+    cross_channel_leakage,
+    energy_ratio_db,
+    si_sdr,
+    spectral_flatness,
+)
+
+SAMPLE_RATE = 16000
+
+
+def voice(f0: float, seconds: float = 2.0) -> np.ndarray:
+    """Harmonic, amplitude-modulated stand-in for a voiced speaker."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    phase = 2 * np.pi * f0 * t
+    harmonics = sum(np.sin(k * phase) / k for k in range(1, 15))
+    envelope = np.clip(np.sin(2 * np.pi * 3 * t), 0, None)
+    return (0.3 * harmonics * envelope).astype(np.float32)
+
+
+@pytest.fixture
+def sources():
+    """Two speakers 6 dB apart."""
+    return np.stack([voice(120), 0.5 * voice(210)])
+
+
+def test_energy_ratio_db(sources):
+    """Levels are relative to the loudest stream."""
+    assert energy_ratio_db(sources) == pytest.approx([0.0, -6.02], abs=0.1)
+
+
+def test_spectral_flatness_speech_vs_noise(sources):
+    """Harmonic streams are far from flat, white noise sits at NOISE_FLATNESS, silence too."""
+    noise = np.random.default_rng(0).standard_normal((1, 2 * SAMPLE_RATE))
+    
+    assert np.all(spectral_flatness(sources) < 0.1)
+    assert spectral_flatness(noise)[0] == pytest.approx(NOISE_FLATNESS, abs=0.05)
+    assert spectral_flatness(np.zeros((1, 100)))[0] == NOISE_FLATNESS
+
+
+def test_cross_channel_leakage(sources):
+    """Independent streams do not leak, mixed streams do."""
+    a, b = sources
+    
+    assert np.all(cross_channel_leakage(sources) < 0.05)
+    assert np.all(cross_channel_leakage(np.stack([a + 0.7 * b, b + 0.7 * a])) > 0.5)
+    assert cross_channel_leakage(sources[:1]) == pytest.approx([0.0])
+
+
+def test_channel_confidence_ranks_garbage_low(sources):
+    """Clean speakers score high; residual noise and leaky copies score low."""
+    noise = 0.05 * np.random.default_rng(0).standard_normal(sources.shape[1])
+    
+    clean = channel_confidence(np.vstack([sources, noise]))
+    leaky = channel_confidence(np.stack([sources[0] + sources[1], sources[1] + 0.9 * sources[0]]))
+    
+    assert clean.shape == (3,)
+    assert np.all(clean[:2] > 0.7)
+    assert clean[2] < 0.1
+    assert np.all(leaky < 0.2)
+
+
+def test_si_sdr(sources):
+    """SI-SDR ignores scale and drops with interference."""
+    a, b = sources
+    
+    assert np.all(si_sdr(2.0 * sources, sources) > 60)
+    assert si_sdr((a + b)[np.newaxis], a[np.newaxis])[0] == pytest.approx(
+        10 * np.log10(np.dot(a, a) / np.dot(b, b)), abs=0.5
+    )
@@ -39,7 +39,7 @@ def test_separator_initialization(separator):
     """Test separator initializes correctly."""
     assert separator is not None
     assert not separator._initialized
-    assert separator.model is None
+    assert not separator.backend.loaded
 
 
 def test_decode_audio(separator):
@@ -91,6 +91,20 @@ def test_separated_channel():
     assert np.array_equal(channel.audio, audio)
 
 
+def test_assign_speakers_by_energy(separator):
+    """Louder stream goes to the first reported speaker."""
+    streams = np.stack([
+        np.full(1600, 0.1, dtype=np.float32),
+        np.full(1600, 0.5, dtype=np.float32)
+    ])
+    
+    channels = separator._assign_speakers(streams, ["user_1", "user_2"])
+    
+    assert [c.speaker_id for c in channels] == ["user_1", "user_2"]
+    assert np.array_equal(channels[0].audio, streams[1])
+    assert channels[0].confidence > channels[1].confidence
+
+
 def test_duration_validation(separator, processing_config):
     """Test that audio duration is validated."""
     # Create audio longer than max_duration
@@ -128,3 +142,141 @@ def test_single_speaker_separation(separator):
     # channels = separator.separate_audio(audio_bytes, sample_rate, speakers, duration)
     # assert len(channels) == 1
     # assert channels[0].speaker_id == "user_1"
+
+
+class FakeBackend:
+    """Backend returning the mixture split in equal halves."""
+    
+    name = "fake"
+    
+    def __init__(self):
+        self.loaded = False
+        self.calls = 0
+    
+    def load(self):
+        self.loaded = True
+    
+    def separate(self, audio, sample_rate, num_speakers):
+        self.calls += 1
+        return np.stack([audio / num_speakers] * num_speakers)
+
+
+def test_rejects_work_until_ready(separator):
+    """Eager mode: no separation before load + warm-up."""
+    audio_bytes = np.zeros(16000, dtype=np.int16).tobytes()
+    
+    with pytest.raises(RuntimeError, match="not ready"):
+        separator.separate_audio(audio_bytes, 16000, ["user_1", "user_2"], 1.0)
+
+
+def test_warm_up_marks_ready(separator):
+    """Warm-up loads the backend, runs one dummy inference and marks ready."""
+    separator.backend = FakeBackend()
+    
+    elapsed = separator.warm_up()
+    
+    assert elapsed >= 0.0
+    assert separator.ready
+    assert separator.backend.loaded
+    assert separator.backend.calls == 1
+    
+    audio_bytes = np.zeros(16000, dtype=np.int16).tobytes()
+    channels = separator.separate_audio(audio_bytes, 16000, ["user_1", "user_2"], 1.0)
+    assert len(channels) == 2
+
+
+def test_concurrent_lazy_initialize_loads_once(separator):
+    """Workers racing into initialize() load the backend a single time."""
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    
+    class SlowLoadBackend(FakeBackend):
+        loads = 0
+        
+        def load(self):
+            time.sleep(0.05)
+            SlowLoadBackend.loads += 1
+            super().load()
+    
+    separator.backend = SlowLoadBackend()
+    barrier = threading.Barrier(4)
+    
+    def worker():
+        barrier.wait()
+        separator.initialize()
+    
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        for future in [pool.submit(worker) for _ in range(4)]:
+            future.result()
+    
+    assert SlowLoadBackend.loads == 1
+    assert separator._initialized
+
+
+class OracleBackend(FakeBackend):
+    """Returns the true sources of each chunk, swapping their order on odd chunks."""
+    
+    def __init__(self, sources, hop):
+        super().__init__()
+        self.sources = sources
+        self.hop = hop
+    
+    def separate(self, audio, sample_rate, num_speakers):
+        start = self.calls * self.hop
+        streams = self.sources[:, start:start + len(audio)]
+        if self.calls % 2:
+            streams = streams[::-1]
+        self.calls += 1
+        return streams.copy()
+
+
+def test_streaming_chunks_reconstruct_sources(separator):
+    """Chunks cover the clip once, keep speaker identity across chunks, no duration limit."""
+    sample_rate = 16000
+    rng = np.random.default_rng(0)
+    duration = 12.3  # longer than max_duration
+    samples = int(duration * sample_rate)
+    sources = np.stack([
+        0.3 * rng.standard_normal(samples),   # louder -> first speaker
+        0.1 * rng.standard_normal(samples)
+    ]).astype(np.float32)
+    
+    config = separator.processing_config
+    hop = int((config.chunk_duration - config.chunk_overlap) * sample_rate)
+    separator.backend = OracleBackend(sources, hop)
+    separator._initialized = separator.ready = True
+    
+    mixture = (sources.sum(axis=0) * 32768).astype(np.int16).tobytes()
+    chunks = list(separator.separate_stream(mixture, sample_rate, ["user_1", "user_2"]))
+    
+    assert [c[0] for c in chunks] == list(range(len(chunks)))
+    assert len(chunks) > 1
+    assert [c[3] for c in chunks] == [False] * (len(chunks) - 1) + [True]
+    assert chunks[1][1] == pytest.approx(hop / sample_rate)
+    
+    for speaker_idx, speaker_id in enumerate(["user_1", "user_2"]):
+        channels = [c[2][speaker_idx] for c in chunks]
+        assert all(ch.speaker_id == speaker_id for ch in channels)
+        stream = np.concatenate([ch.audio for ch in channels])
+        assert len(stream) == samples
+        assert np.allclose(stream, sources[speaker_idx], atol=1e-5)
+
+
+def test_streaming_empty_audio(separator):
+    """Empty audio yields no chunks and never reaches the backend."""
+    separator.backend = OracleBackend(np.zeros((2, 0), dtype=np.float32), 1)
+    separator._initialized = separator.ready = True
+    
+    assert list(separator.separate_stream(b"", 16000, ["user_1", "user_2"])) == []
+    assert separator.backend.calls == 0
+
+
+def test_best_permutation():
+    """Permutation follows the most similar stream."""
+    from src.separator import _best_permutation
+    
+    previous = np.array([[1.0, 0.0, 1.0], [0.0, 1.0, 0.0]])
+    current = np.array([[0.0, 2.0, 0.0], [2.0, 0.0, 2.0]])
+    
+    assert _best_permutation(previous, current) == [1, 0]
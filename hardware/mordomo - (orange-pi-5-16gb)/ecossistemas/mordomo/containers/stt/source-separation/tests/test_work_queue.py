@@ -0,0 +1,114 @@
+"""Tests for the bounded work queue."""
+
+import asyncio
+import base64
+import time
+
+import pytest
+
+from src.metrics import Metrics
+from src.nats_client import OverlapDetectedMessage
+from src.work_queue import WorkQueue, is_stale
+
+
+def make_message(conversation_id: str, age: float = 0.0) -> OverlapDetectedMessage:
+    """Overlap message published ``age`` seconds ago."""
+    return OverlapDetectedMessage({
+        "audio": base64.b64encode(b"\x00\x00").decode(),
+        "duration": 1.0,
+        "speakers": ["user_1", "user_2"],
+        "conversation_id": conversation_id,
+        "timestamp": time.time() - age
+    })
+
+
+@pytest.fixture
+def metrics():
+    """Disabled metrics (no Prometheus registry)."""
+    return Metrics(enabled=False)
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_full(metrics):
+    """Submissions beyond max_depth are rejected."""
+    async def handler(message):
+        pass
+    
+    queue = WorkQueue(handler, num_workers=1, max_depth=2, stale_after=10.0, metrics=metrics)
+    
+    assert await queue.submit(make_message("a"))
+    assert await queue.submit(make_message("b"))
+    assert not await queue.submit(make_message("c"))
+    assert queue.queue.qsize() == 2
+
+
+@pytest.mark.asyncio
+async def test_drops_stale_messages(metrics):
+    """Messages older than stale_after never reach the handler."""
+    handled = []
+    
+    async def handler(message):
+        handled.append(message.conversation_id)
+    
+    queue = WorkQueue(handler, num_workers=1, max_depth=4, stale_after=5.0, metrics=metrics)
+    await queue.start()
+    
+    await queue.submit(make_message("old", age=30.0))
+    await queue.submit(make_message("fresh"))
+    await asyncio.wait_for(queue.queue.join(), timeout=2.0)
+    await queue.stop()
+    
+    assert handled == ["fresh"]
+
+
+@pytest.mark.asyncio
+async def test_worker_concurrency_bounded(metrics):
+    """No more than num_workers messages are processed at once."""
+    active = 0
+    peak = 0
+    
+    async def handler(message):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+    
+    queue = WorkQueue(handler, num_workers=2, max_depth=10, stale_after=10.0, metrics=metrics)
+    await queue.start()
+    
+    for i in range(6):
+        assert await queue.submit(make_message(str(i)))
+    await asyncio.wait_for(queue.queue.join(), timeout=2.0)
+    await queue.stop()
+    
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_handler_errors_keep_worker_alive(metrics):
+    """A failing message does not kill the worker."""
+    handled = []
+    
+    async def handler(message):
+        if message.conversation_id == "bad":
+            raise RuntimeError("boom")
+        handled.append(message.conversation_id)
+    
+    queue = WorkQueue(handler, num_workers=1, max_depth=4, stale_after=10.0, metrics=metrics)
+    await queue.start()
+    
+    await queue.submit(make_message("bad"))
+    await queue.submit(make_message("good"))
+    await asyncio.wait_for(queue.queue.join(), timeout=2.0)
+    await queue.stop()
+    
+    assert handled == ["good"]
+
+
+def test_is_stale():
+    """Age is taken from the producer timestamp (shared by queue and JetStream mode)."""
+    message = make_message("a")
+    
+    assert not is_stale(message, 5.0, now=message.timestamp + 5.0)
+    assert is_stale(message, 5.0, now=message.timestamp + 5.1)
@@ -97,6 +97,7 @@ try:
         "src/main.py",
         "src/config.py",
         "src/separator.py",
+        "src/backends.py",
         "src/nats_client.py",
         "src/metrics.py",
         "tests/__init__.py",
@@ -0,0 +1,73 @@
+"""
+Audio ring buffer for Speaker ID/Diarization service.
+Preallocated float32 storage of the most recent samples of a stream.
+"""
+
+import numpy as np
+
+# int16 PCM -> float32 [-1, 1)
+PCM16_SCALE = np.float32(1.0 / 32768.0)
+
+
+class AudioRingBuffer:
+    """Fixed-capacity ring of float32 samples; memory never grows with stream length."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.total_samples = 0  # absolute number of samples ever written
+        self._buffer = np.zeros(capacity, dtype=np.float32)
+        self._odd_byte = b""  # PCM chunks may split a sample across messages
+
+    def append(self, samples: np.ndarray):
+        """Append samples, overwriting the oldest ones when full."""
+        self._write(samples, None)
+
+    def append_pcm16(self, pcm: bytes):
+        """
+        Append raw int16 PCM. Samples are read through a zero-copy view and
+        normalized directly into the ring (np.multiply with out=), so no
+        intermediate int16/float arrays are allocated.
+        """
+        if self._odd_byte:
+            pcm = self._odd_byte + pcm
+        usable = len(pcm) - len(pcm) % 2
+        self._odd_byte = pcm[usable:]
+
+        self._write(np.frombuffer(pcm, dtype=np.int16, count=usable // 2), PCM16_SCALE)
+
+    def _write(self, samples: np.ndarray, scale):
+        """Copy (optionally scaling) samples into the ring, wrapping around."""
+        written = len(samples)
+        if written > self.capacity:
+            # Only the tail can survive; skip straight to it
+            self.total_samples += written - self.capacity
+            samples = samples[-self.capacity:]
+
+        start = self.total_samples % self.capacity
+        first = min(len(samples), self.capacity - start)
+        head = self._buffer[start:start + first]
+        tail = self._buffer[:len(samples) - first]
+
+        if scale is None:
+            head[:] = samples[:first]
+            tail[:] = samples[first:]
+        else:
+            np.multiply(samples[:first], scale, out=head)
+            np.multiply(samples[first:], scale, out=tail)
+
+        self.total_samples += len(samples)
+
+    def latest(self, num_samples: int) -> np.ndarray:
+        """Return a contiguous copy of the most recent num_samples."""
+        num_samples = min(num_samples, self.total_samples, self.capacity)
+        if num_samples == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        end = self.total_samples % self.capacity
+        start = (end - num_samples) % self.capacity
+        if start < end:
+            return self._buffer[start:end].copy()
+        return np.concatenate((self._buffer[start:], self._buffer[:end]))
+
+    def __len__(self) -> int:
+        return min(self.total_samples, self.capacity)
@@ -18,15 +18,64 @@ class DiarizationConfig:
     model: str
     min_speaker_duration: float
     max_speakers: int
+    embedding_model: str
+    backend: str  # default backend: "pyannote" or "vad" (pyannote not loaded)
+
+
+@dataclass
+class VADConfig:
+    """webrtcvad fast-path diarization and automatic downgrade configuration."""
+    aggressiveness: int  # webrtcvad mode 0-3
+    frame_ms: int  # 10, 20 or 30
+    min_speech: float  # shorter speech runs are dropped
+    min_silence: float  # shorter pauses do not split a speech run
+    max_segment: float  # longer runs are split before embedding
+    cluster_threshold: float
+    load_threshold: float  # fraction of MAX_CONCURRENT_REQUESTS in flight
+    defcon_level: int  # watchdog DEFCON at/above which VAD is used
+
+
+@dataclass
+class StreamingConfig:
+    """Streaming diarization (DiarizeStream) configuration."""
+    window_seconds: float
+    min_window_seconds: float
+    cluster_threshold: float
+    ingest_hop_seconds: float
+
+
+@dataclass
+class InferenceConfig:
+    """Model inference worker pool configuration."""
+    executor: str  # "process" or "thread"
+    workers: int
+    torch_threads: int
+    warm_up: bool  # synthetic inference before reporting ready
+    encoder_runtime: str  # "torch" or "onnx" (resemblyzer backend only)
+    encoder_onnx_path: str
 
 
 @dataclass
 class RecognitionConfig:
     """Speaker recognition configuration."""
     embeddings_path: str
+    embedding_backend: str  # "resemblyzer" or "pyannote"
+    pyannote_embeddings_path: str
     threshold: float
     unknown_detection: bool
     embedding_dimension: int
+    reload_debounce: float
+    cluster_max_audio: float
+    conversation_cache_ttl: float
+    unknown_cluster_threshold: float
+    unknown_ttl: float
+    
+    @property
+    def profiles_path(self) -> str:
+        """Directory with enrolled profiles for the active embedding backend."""
+        if self.embedding_backend == "pyannote":
+            return self.pyannote_embeddings_path
+        return self.embeddings_path
 
 
 @dataclass
@@ -35,6 +84,7 @@ class OverlapConfig:
     detection_enabled: bool
     threshold: float
     min_duration: float
+    separation_margin: float
 
 
 @dataclass
@@ -50,9 +100,16 @@ class NATSConfig:
     url: str
     publish_recognized: str
     publish_unknown: str
+    publish_overlap: str
+    publish_batch: str
     subscribe_verified: str
     subscribe_rejected: str
     subscribe_conversation_ended: str
+    subscribe_promote_unknown: str
+    subscribe_system_health: str
+    gate_buffer_size: int
+    gate_ttl: float
+    gate_batch_publish: bool
 
 
 @dataclass
@@ -74,6 +131,9 @@ class MetricsConfig:
 class Config:
     """Main configuration container."""
     diarization: DiarizationConfig
+    vad: VADConfig
+    streaming: StreamingConfig
+    inference: InferenceConfig
     recognition: RecognitionConfig
     overlap: OverlapConfig
     source_separation: SourceSeparationConfig
@@ -89,20 +149,61 @@ def load_config() -> Config:
     diarization = DiarizationConfig(
         model=os.getenv("DIARIZATION_MODEL", "pyannote/speaker-diarization-3.1"),
         min_speaker_duration=float(os.getenv("MIN_SPEAKER_DURATION", "1.0")),
-        max_speakers=int(os.getenv("MAX_SPEAKERS", "3"))
+        max_speakers=int(os.getenv("MAX_SPEAKERS", "3")),
+        embedding_model=os.getenv(
+            "PYANNOTE_EMBEDDING_MODEL", "pyannote/wespeaker-voxceleb-resnet34-LM"
+        ),
+        backend=os.getenv("DIARIZATION_BACKEND", "pyannote").lower()
+    )
+    
+    vad = VADConfig(
+        aggressiveness=int(os.getenv("VAD_AGGRESSIVENESS", "2")),
+        frame_ms=int(os.getenv("VAD_FRAME_MS", "30")),
+        min_speech=float(os.getenv("VAD_MIN_SPEECH", "0.5")),
+        min_silence=float(os.getenv("VAD_MIN_SILENCE", "0.3")),
+        max_segment=float(os.getenv("VAD_MAX_SEGMENT", "3.0")),
+        cluster_threshold=float(os.getenv("VAD_CLUSTER_THRESHOLD", "0.75")),
+        load_threshold=float(os.getenv("VAD_LOAD_THRESHOLD", "0.8")),
+        defcon_level=int(os.getenv("VAD_DEFCON_LEVEL", "2"))
+    )
+    
+    streaming = StreamingConfig(
+        window_seconds=float(os.getenv("STREAM_WINDOW_SECONDS", "8.0")),
+        min_window_seconds=float(os.getenv("STREAM_MIN_WINDOW_SECONDS", "1.5")),
+        cluster_threshold=float(os.getenv("STREAM_CLUSTER_THRESHOLD", "0.75")),
+        ingest_hop_seconds=float(os.getenv("STREAM_INGEST_HOP_SECONDS", "2.0"))
+    )
+    
+    inference = InferenceConfig(
+        executor=os.getenv("INFERENCE_EXECUTOR", "process").lower(),
+        workers=int(os.getenv("INFERENCE_WORKERS", "2")),
+        torch_threads=int(os.getenv("TORCH_NUM_THREADS", "2")),
+        warm_up=os.getenv("INFERENCE_WARM_UP", "true").lower() == "true",
+        encoder_runtime=os.getenv("ENCODER_RUNTIME", "torch").lower(),
+        encoder_onnx_path=os.getenv("ENCODER_ONNX_PATH", "/models/voice_encoder.int8.onnx")
     )
     
     recognition = RecognitionConfig(
         embeddings_path=os.getenv("EMBEDDINGS_PATH", "/data/embeddings"),
+        embedding_backend=os.getenv("EMBEDDING_BACKEND", "resemblyzer").lower(),
+        pyannote_embeddings_path=os.getenv(
+            "PYANNOTE_EMBEDDINGS_PATH", "/data/embeddings/pyannote"
+        ),
         threshold=float(os.getenv("RECOGNITION_THRESHOLD", "0.70")),
         unknown_detection=os.getenv("UNKNOWN_DETECTION", "true").lower() == "true",
-        embedding_dimension=int(os.getenv("EMBEDDING_DIMENSION", "256"))
+        embedding_dimension=int(os.getenv("EMBEDDING_DIMENSION", "256")),
+        reload_debounce=float(os.getenv("EMBEDDINGS_RELOAD_DEBOUNCE", "1.0")),
+        cluster_max_audio=float(os.getenv("RECOGNITION_CLUSTER_MAX_AUDIO", "8.0")),
+        conversation_cache_ttl=float(os.getenv("CONVERSATION_CACHE_TTL", "300")),
+        unknown_cluster_threshold=float(os.getenv("UNKNOWN_CLUSTER_THRESHOLD", "0.75")),
+        unknown_ttl=float(os.getenv("UNKNOWN_SPEAKER_TTL", "3600"))
     )
     
     overlap = OverlapConfig(
         detection_enabled=os.getenv("OVERLAP_DETECTION", "true").lower() == "true",
         threshold=float(os.getenv("OVERLAP_THRESHOLD", "0.5")),
-        min_duration=float(os.getenv("OVERLAP_MIN_DURATION", "0.5"))
+        min_duration=float(os.getenv("OVERLAP_MIN_DURATION", "0.5")),
+        separation_margin=float(os.getenv("OVERLAP_SEPARATION_MARGIN", "0.25"))
     )
     
     source_separation = SourceSeparationConfig(
@@ -114,9 +215,16 @@ def load_config() -> Config:
         url=os.getenv("NATS_URL", "nats://nats:4222"),
         publish_recognized="speech.diarized.{speaker_id}",
         publish_unknown="speech.diarized.unknown",
+        publish_overlap="audio.overlap_detected",
+        publish_batch="speech.diarized_batch",  # outside speech.diarized.* (speaker ids)
         subscribe_verified="speaker.verified",
         subscribe_rejected="speaker.rejected",
-        subscribe_conversation_ended="conversation.ended"
+        subscribe_conversation_ended="conversation.ended",
+        subscribe_promote_unknown="speaker.unknown.promote",
+        subscribe_system_health="system.health.status",
+        gate_buffer_size=int(os.getenv("GATE_BUFFER_SIZE", "100")),
+        gate_ttl=float(os.getenv("GATE_TTL_SECONDS", "300")),
+        gate_batch_publish=os.getenv("GATE_BATCH_PUBLISH", "false").lower() == "true"
     )
     
     grpc = GRPCConfig(
@@ -132,6 +240,9 @@ def load_config() -> Config:
     
     return Config(
         diarization=diarization,
+        vad=vad,
+        streaming=streaming,
+        inference=inference,
         recognition=recognition,
         overlap=overlap,
         source_separation=source_separation,
@@ -0,0 +1,193 @@
+"""
+Enrolled embeddings store for Speaker ID/Diarization service.
+Keeps an immutable snapshot (dict + normalized matrix) that is rebuilt off to the
+side and swapped atomically, so concurrent identifications never see a partial reload.
+"""
+
+import os
+import threading
+from collections import Counter
+import numpy as np
+import structlog
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Tuple
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class EmbeddingSnapshot:
+    """Immutable view of the enrolled speakers at a point in time."""
+    embeddings: Dict[str, np.ndarray] = field(default_factory=dict)
+    user_ids: Tuple[str, ...] = ()
+    matrix: np.ndarray = field(default_factory=lambda: np.zeros((0, 0), dtype=np.float32))
+
+    @classmethod
+    def build(cls, embeddings: Dict[str, np.ndarray]) -> "EmbeddingSnapshot":
+        """
+        Build snapshot with an L2-normalized (users x dim) matrix for vectorized matching.
+        Embeddings that are not 1-D vectors of the most common dimension (e.g. a
+        profile from another embedding backend) are skipped and logged.
+        """
+        dims = Counter(
+            embedding.shape[0] for embedding in embeddings.values() if embedding.ndim == 1
+        )
+        if not dims:
+            return cls()
+
+        dim = dims.most_common(1)[0][0]
+        rejected = [
+            user_id for user_id, embedding in embeddings.items()
+            if embedding.shape != (dim,)
+        ]
+        for user_id in rejected:
+            logger.error(
+                "embedding_shape_mismatch",
+                user_id=user_id,
+                shape=embeddings[user_id].shape,
+                expected=(dim,)
+            )
+        if rejected:
+            embeddings = {
+                user_id: embedding for user_id, embedding in embeddings.items()
+                if user_id not in rejected
+            }
+
+        user_ids = tuple(sorted(embeddings))
+
+        matrix = np.stack([embeddings[user_id] for user_id in user_ids]).astype(np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1.0, norms)
+
+        return cls(embeddings=embeddings, user_ids=user_ids, matrix=matrix)
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+
+class EmbeddingStore:
+    """
+    Copy-on-write store of enrolled embeddings.
+    Readers grab `snapshot` once per request; writers build a new snapshot and swap it in.
+    """
+
+    def __init__(self, embeddings_path: str):
+        self.embeddings_path = Path(embeddings_path)
+        self._snapshot = EmbeddingSnapshot()
+        self._write_lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> EmbeddingSnapshot:
+        """Current snapshot (attribute read is atomic, never observes a half-built dict)."""
+        return self._snapshot
+
+    def load_all(self):
+        """Full (re)load of every .npy file in the embeddings directory."""
+        if not self.embeddings_path.exists():
+            logger.warning(
+                "embeddings_directory_not_found",
+                path=str(self.embeddings_path)
+            )
+            return
+
+        embeddings: Dict[str, np.ndarray] = {}
+        for embedding_file in self.embeddings_path.glob("*.npy"):
+            embedding = self._load_file(embedding_file)
+            if embedding is not None:
+                embeddings[embedding_file.stem] = embedding
+
+        with self._write_lock:
+            self._snapshot = EmbeddingSnapshot.build(embeddings)
+
+        logger.info(
+            "enrolled_embeddings_loaded",
+            total=len(self._snapshot),
+            users=list(self._snapshot.user_ids)
+        )
+
+    def apply_changes(self, paths: Iterable[str]):
+        """
+        Incrementally add/update/remove the given files.
+        Only the changed files are parsed; the rest are reused from the current snapshot.
+        """
+        with self._write_lock:
+            embeddings = dict(self._snapshot.embeddings)
+
+            for path in paths:
+                embedding_file = Path(path)
+                user_id = embedding_file.stem
+
+                if not embedding_file.exists():
+                    if embeddings.pop(user_id, None) is not None:
+                        logger.info("embedding_removed", user_id=user_id)
+                    continue
+
+                embedding = self._load_file(embedding_file)
+                if embedding is not None:
+                    embeddings[user_id] = embedding
+
+            self._snapshot = EmbeddingSnapshot.build(embeddings)
+
+        logger.info(
+            "enrolled_embeddings_updated",
+            total=len(self._snapshot),
+            users=list(self._snapshot.user_ids)
+        )
+
+    def add(self, user_id: str, embedding: np.ndarray) -> bool:
+        """
+        Enroll a new embedding directly (e.g. a promoted unknown speaker).
+        The .npy is written atomically and the snapshot only updated once it is on
+        disk, so an enrollment never silently disappears on restart. Returns False
+        when the file could not be written (e.g. read-only mount).
+        """
+        embedding_file = self.embeddings_path / f"{user_id}.npy"
+        try:
+            self.embeddings_path.mkdir(parents=True, exist_ok=True)
+            tmp_file = embedding_file.with_suffix(".npy.tmp")
+            with open(tmp_file, "wb") as f:
+                np.save(f, embedding)
+            os.replace(tmp_file, embedding_file)
+            logger.info("embedding_saved", user_id=user_id, file=str(embedding_file))
+
+        except OSError as e:
+            logger.error(
+                "embedding_not_persisted",
+                user_id=user_id,
+                file=str(embedding_file),
+                error=str(e)
+            )
+            return False
+
+        with self._write_lock:
+            embeddings = dict(self._snapshot.embeddings)
+            embeddings[user_id] = embedding
+            self._snapshot = EmbeddingSnapshot.build(embeddings)
+
+        logger.info(
+            "enrolled_embeddings_updated",
+            total=len(self._snapshot),
+            users=list(self._snapshot.user_ids)
+        )
+        return True
+
+    @staticmethod
+    def _load_file(embedding_file: Path):
+        """Load a single embedding file, returning None on failure (e.g. partial write)."""
+        try:
+            embedding = np.load(embedding_file)
+            logger.info(
+                "embedding_loaded",
+                user_id=embedding_file.stem,
+                shape=embedding.shape
+            )
+            return embedding
+
+        except Exception as e:
+            logger.error(
+                "failed_to_load_embedding",
+                file=str(embedding_file),
+                error=str(e)
+            )
+            return None
@@ -4,14 +4,21 @@ Receives audio + transcript from Whisper ASR, processes, and returns results.
 """
 
 import grpc
+import time
 import asyncio
 import structlog
 import numpy as np
 from concurrent import futures
-from typing import Optional
+from typing import Dict, List, Optional
+from grpc_health.v1 import health, health_pb2, health_pb2_grpc
 
-from .config import GRPCConfig
-from .speaker_identifier import SpeakerIdentifier, DiarizationResult
+from .config import GRPCConfig, StreamingConfig, SourceSeparationConfig
+from .speaker_identifier import (
+    SpeakerIdentifier, DiarizationResult, OverlapRegion, SpeakerSegment, TranscriptWord
+)
+from .streaming import StreamingDiarizer
+from .audio_buffer import PCM16_SCALE
+from .inference import InferenceOverloadedError, DiarizationTurn, SAMPLE_RATE
 from .nats_client import NATSClient
 from .metrics import speaker_diarization_latency_seconds
 
@@ -21,6 +28,8 @@ from . import speaker_id_pb2_grpc
 
 logger = structlog.get_logger(__name__)
 
+SERVICE_NAME = speaker_id_pb2.DESCRIPTOR.services_by_name["SpeakerIdentifier"].full_name
+
 
 class SpeakerIdentifierService(speaker_id_pb2_grpc.SpeakerIdentifierServicer):
     """gRPC service implementation."""
@@ -28,10 +37,14 @@ class SpeakerIdentifierService(speaker_id_pb2_grpc.SpeakerIdentifierServicer):
     def __init__(
         self,
         speaker_identifier: SpeakerIdentifier,
-        nats_client: NATSClient
+        nats_client: NATSClient,
+        streaming_config: StreamingConfig,
+        separation_config: SourceSeparationConfig
     ):
         self.speaker_identifier = speaker_identifier
         self.nats_client = nats_client
+        self.streaming_config = streaming_config
+        self.separation_config = separation_config
     
     async def DiarizeAudio(
         self,
@@ -39,6 +52,8 @@ class SpeakerIdentifierService(speaker_id_pb2_grpc.SpeakerIdentifierServicer):
         context: grpc.aio.ServicerContext
     ) -> speaker_id_pb2.DiarizeResponse:
         """Process single audio request."""
+        await self._ensure_ready(context)
+        
         try:
             logger.info(
                 "diarize_request_received",
@@ -47,77 +62,35 @@ class SpeakerIdentifierService(speaker_id_pb2_grpc.SpeakerIdentifierServicer):
                 transcript_length=len(request.transcript)
             )
             
-            # Convert audio bytes to numpy array (16kHz, mono, int16)
-            audio_array = np.frombuffer(request.audio, dtype=np.int16)
-            audio_array = audio_array.astype(np.float32) / 32768.0  # Normalize to [-1, 1]
+            audio_array = self._decode_audio(request.audio)
             
             # Process with speaker identifier
             with speaker_diarization_latency_seconds.time():
                 result: DiarizationResult = await self.speaker_identifier.identify_and_diarize(
                     audio=audio_array,
                     transcript=request.transcript,
-                    conversation_id=request.conversation_id
+                    conversation_id=request.conversation_id,
+                    words=self._decode_words(request),
+                    backend=request.diarization_backend
                 )
             
-            # Publish results to NATS (handles gate mechanism)
-            for segment in result.segments:
-                await self.nats_client.publish_diarization_result({
-                    "speaker_id": segment.speaker_id,
-                    "recognized": segment.recognized,
-                    "confidence": segment.confidence,
-                    "text": segment.text,
-                    "start_time": segment.start_time,
-                    "end_time": segment.end_time,
-                    "overlap_detected": result.overlap_detected,
-                    "timestamp": request.timestamp,
-                    "conversation_id": request.conversation_id
-                })
-            
-            # Trigger source separation if overlap detected
-            if result.overlap_detected:
-                await self.nats_client.trigger_source_separation(
-                    request.audio,
-                    request.conversation_id
-                )
+            return await self._publish_and_respond(request, result)
             
-            # Build gRPC response
-            response = speaker_id_pb2.DiarizeResponse(
-                overlap_detected=result.overlap_detected,
-                timestamp=request.timestamp,
+        except asyncio.CancelledError:
+            # Client disconnected: queued inference for this request is dropped
+            logger.info(
+                "diarize_request_cancelled",
                 conversation_id=request.conversation_id
             )
+            raise
             
-            # Add segments
-            for segment in result.segments:
-                proto_segment = speaker_id_pb2.SpeakerSegment(
-                    speaker_id=segment.speaker_id,
-                    recognized=segment.recognized,
-                    confidence=segment.confidence,
-                    text=segment.text,
-                    start_time=segment.start_time,
-                    end_time=segment.end_time
-                )
-                response.segments.append(proto_segment)
-            
-            # Set first segment as primary (for backward compatibility)
-            if result.segments:
-                primary = result.segments[0]
-                response.speaker_id = primary.speaker_id
-                response.recognized = primary.recognized
-                response.confidence = primary.confidence
-                response.text = primary.text
-                response.start_time = primary.start_time
-                response.end_time = primary.end_time
-            
-            logger.info(
-                "diarize_request_completed",
-                conversation_id=request.conversation_id,
-                segments=len(result.segments),
-                overlap=result.overlap_detected,
-                processing_time=f"{result.processing_time:.3f}s"
+        except InferenceOverloadedError as e:
+            logger.warning(
+                "diarize_request_rejected",
+                error=str(e),
+                conversation_id=request.conversation_id
             )
-            
-            return response
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
             
         except Exception as e:
             logger.error(
@@ -134,17 +107,265 @@ class SpeakerIdentifierService(speaker_id_pb2_grpc.SpeakerIdentifierServicer):
         request_iterator,
         context: grpc.aio.ServicerContext
     ):
-        """Process streaming audio requests."""
+        """
+        Process streaming audio requests.
+        One StreamingDiarizer per conversation keeps speaker continuity across chunks;
+        each response carries only the segments that are new since the previous one.
+        """
+        await self._ensure_ready(context)
+        diarizers: Dict[str, StreamingDiarizer] = {}
+        
         try:
             async for request in request_iterator:
-                response = await self.DiarizeAudio(request, context)
-                yield response
+                diarizer = diarizers.get(request.conversation_id)
+                if diarizer is None:
+                    diarizer = StreamingDiarizer(
+                        self.speaker_identifier,
+                        self.streaming_config,
+                        request.conversation_id,
+                        request.diarization_backend
+                    )
+                    diarizers[request.conversation_id] = diarizer
+                    logger.info(
+                        "diarize_stream_started",
+                        conversation_id=request.conversation_id
+                    )
                 
+                audio_array = self._decode_audio(request.audio)
+                
+                try:
+                    with speaker_diarization_latency_seconds.time():
+                        result = await diarizer.process(
+                            audio_array, request.transcript, self._decode_words(request)
+                        )
+                except InferenceOverloadedError as e:
+                    # Chunk stays in the rolling buffer and is covered by the next window
+                    logger.warning(
+                        "stream_window_skipped",
+                        error=str(e),
+                        conversation_id=request.conversation_id
+                    )
+                    result = DiarizationResult(
+                        segments=[], overlap_detected=False, processing_time=0.0
+                    )
+                
+                yield await self._publish_and_respond(request, result)
+            
+        except asyncio.CancelledError:
+            logger.info("diarize_stream_cancelled", conversations=len(diarizers))
+            raise
+            
         except Exception as e:
             logger.error("stream_diarization_failed", error=str(e))
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(f"Stream diarization failed: {str(e)}")
             raise
+    
+    async def DiarizeAudioStream(
+        self,
+        request_iterator,
+        context: grpc.aio.ServicerContext
+    ) -> speaker_id_pb2.DiarizeResponse:
+        """
+        Client-streaming ingestion of a single utterance.
+        PCM chunks are normalized in place into the diarizer's preallocated ring
+        (memory bounded by the streaming window, not by utterance length) and the
+        window is diarized every ingest hop, so most of the work is done before
+        the speaker finishes. The tail is flushed through the same diarizer, so
+        audio that left the ring was already covered by an earlier hop.
+        """
+        await self._ensure_ready(context)
+        
+        # Header fields and transcript gathered from the chunks
+        request = speaker_id_pb2.DiarizeRequest()
+        transcript_parts: List[str] = []
+        diarizer: Optional[StreamingDiarizer] = None
+        segments: List[SpeakerSegment] = []
+        overlap_regions: List[OverlapRegion] = []
+        hop_samples = int(self.streaming_config.ingest_hop_seconds * SAMPLE_RATE)
+        last_run = 0
+        start_time = time.time()
+        
+        try:
+            async for chunk in request_iterator:
+                if diarizer is None:
+                    request.conversation_id = chunk.conversation_id
+                    request.timestamp = chunk.timestamp
+                    request.diarization_backend = chunk.diarization_backend
+                    diarizer = StreamingDiarizer(
+                        self.speaker_identifier,
+                        self.streaming_config,
+                        chunk.conversation_id,
+                        chunk.diarization_backend
+                    )
+                
+                if chunk.transcript:
+                    transcript_parts.append(chunk.transcript)
+                request.words.extend(chunk.words)
+                diarizer.append_pcm16(chunk.audio)
+                
+                # Diarize while the speaker is still talking
+                if diarizer.buffer.total_samples - last_run >= hop_samples:
+                    last_run = diarizer.buffer.total_samples
+                    try:
+                        partial = await diarizer.diarize()
+                    except InferenceOverloadedError as e:
+                        # Audio stays in the ring and is covered by the next window
+                        logger.warning(
+                            "stream_window_skipped",
+                            error=str(e),
+                            conversation_id=request.conversation_id
+                        )
+                        continue
+                    segments.extend(partial.segments)
+                    overlap_regions.extend(partial.overlap_regions)
+            
+            if diarizer is None:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Empty audio stream")
+            
+            request.transcript = " ".join(transcript_parts)
+            
+            # Tail of the utterance (also an utterance shorter than min_window)
+            if diarizer.buffer.total_samples > last_run:
+                with speaker_diarization_latency_seconds.time():
+                    final = await diarizer.diarize(final=True)
+                segments.extend(final.segments)
+                overlap_regions.extend(final.overlap_regions)
+            
+            # Transcript usually arrives last: attribute words over the whole utterance
+            texts = SpeakerIdentifier.split_transcript(
+                request.transcript,
+                self._decode_words(request),
+                [DiarizationTurn(s.start_time, s.end_time, s.speaker_id) for s in segments]
+            )
+            for segment, text in zip(segments, texts):
+                segment.text = text
+            
+            result = DiarizationResult(
+                segments=segments,
+                overlap_detected=bool(overlap_regions),
+                processing_time=time.time() - start_time,
+                overlap_regions=overlap_regions
+            )
+            return await self._publish_and_respond(request, result)
+            
+        except asyncio.CancelledError:
+            logger.info(
+                "diarize_audio_stream_cancelled",
+                conversation_id=request.conversation_id
+            )
+            raise
+            
+        except InferenceOverloadedError as e:
+            logger.warning(
+                "diarize_request_rejected",
+                error=str(e),
+                conversation_id=request.conversation_id
+            )
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+            
+        except grpc.aio.AbortError:
+            # context.abort() above (e.g. empty stream) already set the status
+            raise
+            
+        except Exception as e:
+            logger.error(
+                "diarize_audio_stream_failed",
+                error=str(e),
+                conversation_id=request.conversation_id
+            )
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(f"Diarization failed: {str(e)}")
+            raise
+    
+    async def _ensure_ready(self, context: grpc.aio.ServicerContext):
+        """Reject requests while models are still loading (health reports NOT_SERVING)."""
+        if not self.speaker_identifier.ready:
+            await context.abort(grpc.StatusCode.UNAVAILABLE, "Models are still loading")
+    
+    @staticmethod
+    def _decode_audio(audio: bytes) -> np.ndarray:
+        """Convert audio bytes (16kHz, mono, int16) to float32 in [-1, 1] with one allocation."""
+        return np.multiply(np.frombuffer(audio, dtype=np.int16), PCM16_SCALE)
+    
+    @staticmethod
+    def _decode_words(request: speaker_id_pb2.DiarizeRequest) -> List[TranscriptWord]:
+        """Word-level timestamps sent by Whisper ASR (empty when not provided)."""
+        return [
+            TranscriptWord(text=word.word, start=word.start, end=word.end)
+            for word in request.words
+        ]
+    
+    async def _publish_and_respond(
+        self,
+        request: speaker_id_pb2.DiarizeRequest,
+        result: DiarizationResult
+    ) -> speaker_id_pb2.DiarizeResponse:
+        """Publish segments to NATS, trigger separation and build the gRPC response."""
+        # Publish results to NATS (handles gate mechanism)
+        for segment in result.segments:
+            await self.nats_client.publish_diarization_result({
+                "speaker_id": segment.speaker_id,
+                "recognized": segment.recognized,
+                "confidence": segment.confidence,
+                "text": segment.text,
+                "start_time": segment.start_time,
+                "end_time": segment.end_time,
+                "overlap_detected": result.overlap_detected,
+                "timestamp": request.timestamp,
+                "conversation_id": request.conversation_id
+            })
+        
+        # Trigger source separation only for the overlapping regions
+        if self.separation_config.enabled:
+            for region in result.overlap_regions:
+                if region.end - region.start < self.separation_config.min_overlap_duration:
+                    continue
+                await self.nats_client.trigger_source_separation(
+                    region.audio,
+                    region.speakers,
+                    request.conversation_id,
+                    region.clip_start
+                )
+        
+        # Build gRPC response
+        response = speaker_id_pb2.DiarizeResponse(
+            overlap_detected=result.overlap_detected,
+            timestamp=request.timestamp,
+            conversation_id=request.conversation_id
+        )
+        
+        # Add segments
+        for segment in result.segments:
+            proto_segment = speaker_id_pb2.SpeakerSegment(
+                speaker_id=segment.speaker_id,
+                recognized=segment.recognized,
+                confidence=segment.confidence,
+                text=segment.text,
+                start_time=segment.start_time,
+                end_time=segment.end_time
+            )
+            response.segments.append(proto_segment)
+        
+        # Set first segment as primary (for backward compatibility)
+        if result.segments:
+            primary = result.segments[0]
+            response.speaker_id = primary.speaker_id
+            response.recognized = primary.recognized
+            response.confidence = primary.confidence
+            response.text = primary.text
+            response.start_time = primary.start_time
+            response.end_time = primary.end_time
+        
+        logger.info(
+            "diarize_request_completed",
+            conversation_id=request.conversation_id,
+            segments=len(result.segments),
+            overlap=result.overlap_detected,
+            processing_time=f"{result.processing_time:.3f}s"
+        )
+        
+        return response
 
 
 class GRPCServer:
@@ -154,11 +375,17 @@ class GRPCServer:
         self,
         config: GRPCConfig,
         speaker_identifier: SpeakerIdentifier,
-        nats_client: NATSClient
+        nats_client: NATSClient,
+        streaming_config: StreamingConfig,
+        separation_config: SourceSeparationConfig
     ):
         self.config = config
         self.server: Optional[grpc.aio.Server] = None
-        self.service = SpeakerIdentifierService(speaker_identifier, nats_client)
+        self.service = SpeakerIdentifierService(
+            speaker_identifier, nats_client, streaming_config, separation_config
+        )
+        # Standard grpc.health.v1: NOT_SERVING until models are loaded and warmed up
+        self.health = health.aio.HealthServicer()
     
     async def start(self):
         """Start gRPC server."""
@@ -171,6 +398,8 @@ class GRPCServer:
                 self.service,
                 self.server
             )
+            health_pb2_grpc.add_HealthServicer_to_server(self.health, self.server)
+            await self.set_serving(False)
             
             listen_addr = f"[::]:{self.config.port}"
             self.server.add_insecure_port(listen_addr)
@@ -187,9 +416,20 @@ class GRPCServer:
             logger.error("grpc_server_start_failed", error=str(e))
             raise
     
+    async def set_serving(self, serving: bool):
+        """Report readiness to gRPC health checks (overall and per service)."""
+        status = (
+            health_pb2.HealthCheckResponse.SERVING
+            if serving else health_pb2.HealthCheckResponse.NOT_SERVING
+        )
+        for service in ("", SERVICE_NAME):
+            await self.health.set(service, status)
+        logger.info("grpc_health_status_changed", serving=serving)
+    
     async def stop(self):
         """Stop gRPC server."""
         if self.server:
+            await self.set_serving(False)
             await self.server.stop(grace=5)
             logger.info("grpc_server_stopped")
     
@@ -0,0 +1,641 @@
+"""
+Model inference worker pool for Speaker ID/Diarization service.
+Runs pyannote diarization and embedding extraction off the gRPC event loop.
+"""
+
+import os
+import time
+import asyncio
+import multiprocessing
+import numpy as np
+import torch
+import structlog
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Union
+
+# Pyannote for diarization
+from pyannote.audio import Pipeline
+from pyannote.audio.pipelines.speaker_verification import PretrainedSpeakerEmbedding
+
+# Resemblyzer for embeddings (compatible with Speaker Verification)
+from resemblyzer import VoiceEncoder
+from resemblyzer import audio as resemblyzer_audio
+
+from .config import DiarizationConfig, InferenceConfig, VADConfig
+from .onnx_encoder import OnnxVoiceEncoder
+from .metrics import MetricsCollector
+
+logger = structlog.get_logger(__name__)
+
+# VAD backend degrades to the energy gate alone when webrtcvad is not installed
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+    logger.warning("webrtcvad_unavailable", fallback="energy_only_vad")
+
+SAMPLE_RATE = 16000
+
+# Resemblyzer partial-utterance defaults (same as VoiceEncoder.embed_utterance)
+PARTIALS_RATE = 1.3
+PARTIALS_MIN_COVERAGE = 0.75
+
+# Synthetic utterance used to warm up the models before reporting ready
+WARM_UP_SECONDS = 3.0
+
+# VAD frames quieter than this RMS (int16 units, ~-50 dBFS) are silence without calling webrtcvad
+VAD_ENERGY_FLOOR = 100.0
+
+
+@dataclass
+class DiarizationTurn:
+    """Single speaker turn produced by the diarization pipeline."""
+    start: float
+    end: float
+    speaker_label: str
+
+
+@dataclass
+class DiarizationOutput:
+    """Diarization turns plus optional per-cluster embeddings from the pipeline."""
+    turns: List[DiarizationTurn]
+    label_embeddings: Optional[Dict[str, np.ndarray]] = None
+
+
+class InferenceOverloadedError(Exception):
+    """Raised when the inference pool has no admission slots left."""
+
+
+class SpeakerModels:
+    """
+    Heavy models owned by one inference worker.
+
+    Embedding backends:
+    - resemblyzer: pyannote Pipeline + VoiceEncoder (same space as Speaker Verification).
+      The encoder runs in torch fp32 or as the exported ONNX graph (ENCODER_RUNTIME)
+    - pyannote: pyannote Pipeline only; per-cluster embeddings are taken from the
+      pipeline output and its internal embedding model is shared for the rest
+    """
+
+    def __init__(
+        self,
+        diarization_config: DiarizationConfig,
+        inference_config: InferenceConfig,
+        embedding_backend: str
+    ):
+        self.diarization_config = diarization_config
+        self.inference_config = inference_config
+        self.embedding_backend = embedding_backend
+        self.encoder: Optional[Union[VoiceEncoder, OnnxVoiceEncoder]] = None
+        self.embedding_model: Optional[PretrainedSpeakerEmbedding] = None
+        # Seconds spent per startup stage (reported back to the main process)
+        self.load_times: Dict[str, float] = {}
+
+        if embedding_backend == "pyannote":
+            # Load diarization pipeline and share its embedding model
+            self.diarization_pipeline = self._timed(
+                "diarization_pipeline", self._load_diarization_pipeline
+            )
+            self.embedding_model = self._timed(
+                "pyannote_embedding", self._load_pyannote_embedding
+            )
+        else:
+            # Encoder (same as Speaker Verification for compatibility) and diarization
+            # pipeline are independent: load both at once, startup takes the slowest
+            with ThreadPoolExecutor(max_workers=2, thread_name_prefix="model-load") as loader:
+                encoder = loader.submit(self._timed, "voice_encoder", self._load_encoder)
+                pipeline = loader.submit(
+                    self._timed, "diarization_pipeline", self._load_diarization_pipeline
+                )
+                self.encoder = encoder.result()
+                self.diarization_pipeline = pipeline.result()
+            logger.info(
+                "voice_encoder_initialized",
+                device="cpu",
+                runtime=inference_config.encoder_runtime,
+                pid=os.getpid()
+            )
+
+    def _load_encoder(self) -> Union[VoiceEncoder, OnnxVoiceEncoder]:
+        """VoiceEncoder in torch fp32, or its ONNX export (fp32 / int8)."""
+        if self.inference_config.encoder_runtime == "onnx":
+            return OnnxVoiceEncoder(
+                self.inference_config.encoder_onnx_path,
+                num_threads=self.inference_config.torch_threads
+            )
+        return VoiceEncoder()
+
+    def _timed(self, stage: str, load, *args):
+        """Run a loading step and keep its duration in load_times."""
+        started_at = time.time()
+        try:
+            return load(*args)
+        finally:
+            self.load_times[stage] = time.time() - started_at
+
+    def warm_up(self, run_inference: bool) -> Dict[str, float]:
+        """
+        Run one synthetic diarization + batched embedding so the first real request
+        does not pay lazy initialization (torch allocator, resemblyzer mel filters,
+        pyannote graph). Returns the startup stage durations of this worker.
+        """
+        if run_inference:
+            started_at = time.time()
+            audio = np.random.default_rng(0).normal(
+                0.0, 0.05, int(WARM_UP_SECONDS * SAMPLE_RATE)
+            ).astype(np.float32)
+            half = WARM_UP_SECONDS / 2
+            self.diarize(audio)
+            self.embed_groups(audio, [[(0.0, half)], [(half, WARM_UP_SECONDS)]])
+            self.load_times["warm_up"] = time.time() - started_at
+
+        return dict(self.load_times)
+
+    def _load_diarization_pipeline(self) -> Optional[Pipeline]:
+        """Load pyannote diarization pipeline (skipped when VAD is the default backend)."""
+        if self.diarization_config.backend == "vad":
+            logger.info("diarization_pipeline_skipped", backend="vad")
+            return None
+
+        try:
+            # Note: Requires HuggingFace token for pyannote models
+            # Set via: export HUGGINGFACE_TOKEN=your_token
+            pipeline = Pipeline.from_pretrained(
+                self.diarization_config.model,
+                use_auth_token=os.getenv("HUGGINGFACE_TOKEN")
+            )
+
+            logger.info(
+                "diarization_pipeline_loaded",
+                model=self.diarization_config.model
+            )
+            return pipeline
+
+        except Exception as e:
+            logger.error("failed_to_load_diarization_pipeline", error=str(e))
+            # Fallback: disable diarization, use only recognition
+            return None
+
+    def _load_pyannote_embedding(self) -> PretrainedSpeakerEmbedding:
+        """Reuse the pipeline's embedding model, loading it standalone only if needed."""
+        pipeline_embedding = getattr(self.diarization_pipeline, "_embedding", None)
+        if pipeline_embedding is not None:
+            logger.info("pyannote_embedding_shared_with_pipeline")
+            return pipeline_embedding
+
+        embedding_model = PretrainedSpeakerEmbedding(
+            self.diarization_config.embedding_model,
+            use_auth_token=os.getenv("HUGGINGFACE_TOKEN")
+        )
+        logger.info(
+            "pyannote_embedding_loaded",
+            model=self.diarization_config.embedding_model
+        )
+        return embedding_model
+
+    def diarize(self, audio: np.ndarray) -> Optional[DiarizationOutput]:
+        """
+        Run diarization on the full audio.
+        With the pyannote backend, the per-cluster embeddings computed by the
+        pipeline are returned too (one per speaker label).
+        Returns None when the pipeline is unavailable or fails (caller falls back
+        to single speaker recognition).
+        """
+        if self.diarization_pipeline is None:
+            return None
+
+        try:
+            file = {
+                "waveform": torch.from_numpy(audio).unsqueeze(0),
+                "sample_rate": SAMPLE_RATE
+            }
+
+            label_embeddings = None
+            if self.embedding_backend == "pyannote":
+                diarization_output, centroids = self.diarization_pipeline(
+                    file, return_embeddings=True
+                )
+                # No centroids when clustering did not run (oracle / single speaker):
+                # label_embeddings stays None and callers embed labels from their turns
+                if centroids is not None:
+                    # Centroid rows follow diarization_output.labels() order
+                    label_embeddings = {
+                        label: centroids[index]
+                        for index, label in enumerate(diarization_output.labels())
+                        if index < len(centroids) and np.all(np.isfinite(centroids[index]))
+                    }
+            else:
+                diarization_output = self.diarization_pipeline(file)
+
+            turns = [
+                DiarizationTurn(start=turn.start, end=turn.end, speaker_label=speaker_label)
+                for turn, _, speaker_label in diarization_output.itertracks(yield_label=True)
+            ]
+            return DiarizationOutput(turns=turns, label_embeddings=label_embeddings)
+
+        except Exception as e:
+            logger.error("diarization_pipeline_failed", error=str(e))
+            return None
+
+    def diarize_vad(self, audio: np.ndarray, vad_config: VADConfig) -> Optional[DiarizationOutput]:
+        """
+        Cheap diarization: webrtcvad speech runs, one batched embedding pass over
+        all runs and greedy online clustering of the run embeddings.
+        Returns None when no speech is found (caller falls back to single speaker).
+        """
+        spans = self._vad_speech_spans(audio, vad_config)
+        if not spans:
+            return None
+
+        embeddings = self.embed_groups(audio, [[span] for span in spans])
+        assignments, centroids = _greedy_cluster(
+            embeddings, vad_config.cluster_threshold, self.diarization_config.max_speakers
+        )
+
+        # Consecutive pieces of the same speaker become one turn
+        turns: List[DiarizationTurn] = []
+        for (start, end), cluster in zip(spans, assignments):
+            label = f"VAD_SPEAKER_{cluster:02d}"
+            previous = turns[-1] if turns else None
+            if (
+                previous is not None
+                and previous.speaker_label == label
+                and start - previous.end < vad_config.min_silence
+            ):
+                previous.end = end
+            else:
+                turns.append(DiarizationTurn(start=start, end=end, speaker_label=label))
+
+        label_embeddings = {
+            f"VAD_SPEAKER_{cluster:02d}": centroid for cluster, centroid in enumerate(centroids)
+        }
+        return DiarizationOutput(turns=turns, label_embeddings=label_embeddings)
+
+    @staticmethod
+    def _vad_speech_spans(audio: np.ndarray, vad_config: VADConfig) -> List[Tuple[float, float]]:
+        """
+        Speech (start, end) spans in seconds. Frames are a zero-copy reshape of the
+        int16 signal; quiet frames are rejected by a vectorized RMS check and only the
+        rest go through webrtcvad (when installed; otherwise the energy check alone
+        decides). Runs come from edge detection on the frame mask.
+        """
+        frame_size = SAMPLE_RATE * vad_config.frame_ms // 1000
+        frame_seconds = frame_size / SAMPLE_RATE
+        num_frames = len(audio) // frame_size
+        if num_frames == 0:
+            return []
+
+        pcm = np.clip(audio[:num_frames * frame_size] * 32768.0, -32768, 32767).astype(np.int16)
+        frames = pcm.reshape(num_frames, frame_size)
+
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+        voiced = rms >= VAD_ENERGY_FLOOR
+        if webrtcvad is not None:
+            vad = webrtcvad.Vad(vad_config.aggressiveness)
+            for index in np.flatnonzero(voiced):
+                voiced[index] = vad.is_speech(frames[index].tobytes(), SAMPLE_RATE)
+
+        edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        if len(starts) == 0:
+            return []
+
+        # Pauses shorter than min_silence do not split a run
+        long_pause = (starts[1:] - ends[:-1]) * frame_seconds >= vad_config.min_silence
+        starts = np.concatenate((starts[:1], starts[1:][long_pause]))
+        ends = np.concatenate((ends[:-1][long_pause], ends[-1:]))
+
+        spans = []
+        for start, end in zip(starts * frame_seconds, ends * frame_seconds):
+            duration = end - start
+            if duration < vad_config.min_speech:
+                continue
+            # Split long runs evenly so a speaker change inside one can still be found
+            pieces = int(np.ceil(duration / vad_config.max_segment))
+            bounds = np.linspace(start, end, pieces + 1)
+            spans.extend(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+        return spans
+
+    def embed(self, audio: np.ndarray) -> np.ndarray:
+        """Create embedding for an entire utterance."""
+        if self.embedding_model is not None or isinstance(self.encoder, OnnxVoiceEncoder):
+            return self.embed_segments(audio, [(0.0, len(audio) / SAMPLE_RATE)])[0]
+        return self.encoder.embed_utterance(audio)
+
+    def embed_segments(
+        self,
+        audio: np.ndarray,
+        spans: List[Tuple[float, float]]
+    ) -> np.ndarray:
+        """
+        Create one embedding per (start, end) span of the audio in a single
+        batched forward pass.
+        """
+        return self.embed_groups(audio, [[span] for span in spans])
+
+    def embed_groups(
+        self,
+        audio: np.ndarray,
+        groups: List[List[Tuple[float, float]]]
+    ) -> np.ndarray:
+        """
+        Create one embedding per group of (start, end) spans (e.g. all turns of a
+        speaker label) in a single batched forward pass.
+        """
+        if self.embedding_model is not None:
+            return self._embed_groups_pyannote(audio, groups)
+        return self._embed_groups_resemblyzer(audio, groups)
+
+    def _embed_groups_pyannote(
+        self,
+        audio: np.ndarray,
+        groups: List[List[Tuple[float, float]]]
+    ) -> np.ndarray:
+        """
+        Concatenate the spans of each group, zero-pad all groups into one
+        (batch, 1, samples) tensor and mask the padding.
+        """
+        if not groups:
+            return np.zeros((0, self.embedding_model.dimension), dtype=np.float32)
+
+        segments = [
+            np.concatenate([
+                audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)] for start, end in spans
+            ])
+            for spans in groups
+        ]
+        max_length = max(len(segment) for segment in segments)
+
+        waveforms = np.zeros((len(segments), 1, max_length), dtype=np.float32)
+        masks = np.zeros((len(segments), max_length), dtype=np.float32)
+        for index, segment in enumerate(segments):
+            waveforms[index, 0, :len(segment)] = segment
+            masks[index, :len(segment)] = 1.0
+
+        return self.embedding_model(
+            torch.from_numpy(waveforms), masks=torch.from_numpy(masks)
+        )
+
+    def _embed_groups_resemblyzer(
+        self,
+        audio: np.ndarray,
+        groups: List[List[Tuple[float, float]]]
+    ) -> np.ndarray:
+        """
+        Same math as VoiceEncoder.embed_utterance: each span is split into
+        partial utterances, all partials of all groups go through the LSTM
+        together, and each group embedding is the L2-normed mean of its partials.
+        """
+        if not groups:
+            return np.zeros((0, self._embedding_dim()), dtype=np.float32)
+
+        mels = []
+        owners = []
+        for index, spans in enumerate(groups):
+            for start, end in spans:
+                wav = audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)]
+
+                wav_slices, mel_slices = VoiceEncoder.compute_partial_slices(
+                    len(wav), PARTIALS_RATE, PARTIALS_MIN_COVERAGE
+                )
+                max_wave_length = wav_slices[-1].stop
+                if max_wave_length >= len(wav):
+                    wav = np.pad(wav, (0, max_wave_length - len(wav)), "constant")
+
+                mel = resemblyzer_audio.wav_to_mel_spectrogram(wav)
+                mels.extend(mel[s] for s in mel_slices)
+                owners.extend([index] * len(mel_slices))
+
+        partial_embeds = self._encode_partials(np.array(mels))
+
+        # Mean of partials per group, then L2 normalize
+        owners = np.asarray(owners)
+        sums = np.zeros((len(groups), partial_embeds.shape[1]), dtype=np.float32)
+        np.add.at(sums, owners, partial_embeds)
+        raw_embeds = sums / np.bincount(owners, minlength=len(groups))[:, None]
+
+        return raw_embeds / np.linalg.norm(raw_embeds, axis=1, keepdims=True)
+
+
+    def _encode_partials(self, mels: np.ndarray) -> np.ndarray:
+        """LSTM forward pass over a (batch, frames, n_mels) array of mel partials."""
+        if isinstance(self.encoder, OnnxVoiceEncoder):
+            return self.encoder.embed_partials(mels)
+
+        with torch.no_grad():
+            batch = torch.from_numpy(mels).to(self.encoder.device)
+            return self.encoder(batch).cpu().numpy()
+
+    def _embedding_dim(self) -> int:
+        """Output dimension of the active resemblyzer encoder."""
+        if isinstance(self.encoder, OnnxVoiceEncoder):
+            return self.encoder.embedding_dim
+        return self.encoder.linear.out_features
+
+
+def _greedy_cluster(
+    embeddings: np.ndarray,
+    threshold: float,
+    max_clusters: int
+) -> Tuple[List[int], List[np.ndarray]]:
+    """
+    Single pass online clustering in time order: each embedding joins the closest
+    centroid (cosine >= threshold, or always once max_clusters exist) and updates
+    its running mean, otherwise it starts a new cluster.
+    Returns the cluster index of each embedding and the L2-normalized centroids.
+    """
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    embeddings = embeddings / np.where(norms > 0, norms, 1.0)
+
+    centroids: List[np.ndarray] = []
+    counts: List[int] = []
+    assignments: List[int] = []
+    for embedding in embeddings:
+        if centroids:
+            similarities = np.stack(centroids) @ embedding
+            best = int(np.argmax(similarities))
+            if similarities[best] >= threshold or len(centroids) >= max_clusters:
+                centroid = centroids[best] * counts[best] + embedding
+                centroids[best] = centroid / np.linalg.norm(centroid)
+                counts[best] += 1
+                assignments.append(best)
+                continue
+
+        centroids.append(embedding)
+        counts.append(1)
+        assignments.append(len(centroids) - 1)
+
+    return assignments, centroids
+
+
+# Models of the current worker (one copy per process in process mode,
+# a single shared copy in thread mode)
+_models: Optional[SpeakerModels] = None
+
+
+def _init_worker(
+    diarization_config: DiarizationConfig,
+    inference_config: InferenceConfig,
+    embedding_backend: str
+):
+    """Worker initializer: pin torch intra-op threads and load models once."""
+    global _models
+    torch.set_num_threads(inference_config.torch_threads)
+    _models = SpeakerModels(diarization_config, inference_config, embedding_backend)
+
+
+def _warm_up_worker(run_inference: bool, barrier=None) -> Tuple[int, Dict[str, float]]:
+    """
+    Warm up the models of this worker, returning (pid, startup stage durations).
+    In process mode every warm-up waits on a barrier sized to the pool, so no
+    worker can pick up a second warm-up while another has not run one yet.
+    """
+    report = _models.warm_up(run_inference)
+    if barrier is not None:
+        barrier.wait()
+    return os.getpid(), report
+
+
+def _run(method: str, submitted_at: float, *args):
+    """Execute a model method inside the worker, returning (result, queue_wait, run_time)."""
+    started_at = time.time()
+    result = getattr(_models, method)(*args)
+    return result, started_at - submitted_at, time.time() - started_at
+
+
+class InferenceExecutor:
+    """
+    Dedicated executor for GIL-heavy torch work with bounded admission.
+    At most one job per worker is handed to the pool; the rest wait on a
+    semaphore, so cancelling the awaiting coroutine (e.g. gRPC client disconnect)
+    drops queued work. A job already running in a worker runs to completion.
+    """
+
+    def __init__(
+        self,
+        config: InferenceConfig,
+        diarization_config: DiarizationConfig,
+        embedding_backend: str,
+        max_pending: int
+    ):
+        self.config = config
+        self.diarization_config = diarization_config
+        self.embedding_backend = embedding_backend
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        # Jobs handed to the pool (its internal queue cannot be cancelled)
+        self._slots = asyncio.Semaphore(config.workers)
+
+    async def start(self) -> Dict[str, float]:
+        """
+        Create the worker pool, load the models off the event loop and warm them up.
+        Returns only once every worker has loaded and warmed up its models, with
+        the startup stage durations (slowest worker per stage).
+        """
+        initargs = (
+            self.diarization_config,
+            self.config,
+            self.embedding_backend
+        )
+        loop = asyncio.get_running_loop()
+
+        if self.config.executor == "process":
+            # Workers load their models in the initializer, triggered by the warm-up below
+            context = multiprocessing.get_context("spawn")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.config.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=initargs
+            )
+
+            # One warm-up per worker, pinned by a barrier and acked by pid
+            manager = await asyncio.to_thread(context.Manager)
+            try:
+                barrier = manager.Barrier(self.config.workers)
+                reports = await asyncio.gather(*(
+                    loop.run_in_executor(
+                        self._executor, _warm_up_worker, self.config.warm_up, barrier
+                    )
+                    for _ in range(self.config.workers)
+                ))
+            finally:
+                manager.shutdown()
+
+            warmed_pids = {pid for pid, _ in reports}
+            if len(warmed_pids) != self.config.workers:
+                raise RuntimeError(
+                    f"Only {len(warmed_pids)}/{self.config.workers} inference workers warmed up"
+                )
+        else:
+            # Thread mode: one shared copy of the models in this process
+            await asyncio.to_thread(_init_worker, *initargs)
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.config.workers,
+                thread_name_prefix="inference"
+            )
+            reports = [
+                await loop.run_in_executor(self._executor, _warm_up_worker, self.config.warm_up)
+            ]
+
+        load_times: Dict[str, float] = {}
+        for _, report in reports:
+            for stage, seconds in report.items():
+                load_times[stage] = max(load_times.get(stage, 0.0), seconds)
+
+        logger.info(
+            "inference_executor_started",
+            executor=self.config.executor,
+            workers=self.config.workers,
+            embedding_backend=self.embedding_backend,
+            torch_threads=self.config.torch_threads,
+            max_pending=self.max_pending,
+            load_times={stage: f"{seconds:.2f}s" for stage, seconds in load_times.items()}
+        )
+        return load_times
+
+    @property
+    def pending(self) -> int:
+        """Requests admitted and not finished yet."""
+        return self._pending
+
+    async def submit(self, method: str, *args):
+        """
+        Run a SpeakerModels method in the pool.
+        Raises InferenceOverloadedError when max_pending requests are already in flight.
+        """
+        if self._pending >= self.max_pending:
+            MetricsCollector.record_inference_rejected()
+            raise InferenceOverloadedError(
+                f"Inference pool saturated ({self._pending}/{self.max_pending} pending)"
+            )
+
+        self._pending += 1
+        MetricsCollector.set_inference_pending(self._pending)
+
+        try:
+            loop = asyncio.get_running_loop()
+            submitted_at = time.time()
+            await self._slots.acquire()
+            future = loop.run_in_executor(self._executor, _run, method, submitted_at, *args)
+            # The slot is freed when the worker is done, even if the caller was cancelled
+            future.add_done_callback(lambda _: self._slots.release())
+            result, queue_wait, run_time = await asyncio.shield(future)
+
+            MetricsCollector.record_inference_stage("queue_wait", queue_wait)
+            MetricsCollector.record_inference_stage(method, run_time)
+            return result
+
+        finally:
+            self._pending -= 1
+            MetricsCollector.set_inference_pending(self._pending)
+
+    def shutdown(self):
+        """Stop the worker pool, dropping work that has not started yet."""
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            logger.info("inference_executor_stopped")
@@ -5,8 +5,10 @@ Initializes all components and starts the server.
 
 import asyncio
 import signal
+import threading
 import structlog
 from pathlib import Path
+from typing import Optional
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
@@ -38,25 +40,69 @@ logger = structlog.get_logger(__name__)
 
 
 class EmbeddingsWatcher(FileSystemEventHandler):
-    """Watch embeddings directory for changes and hot reload."""
+    """
+    Watch embeddings directory for changes and hot reload.
+    Events are debounced and applied incrementally (only the touched files).
+    """
     
-    def __init__(self, speaker_identifier: SpeakerIdentifier):
+    def __init__(self, speaker_identifier: SpeakerIdentifier, debounce_seconds: float = 1.0):
         self.speaker_identifier = speaker_identifier
+        self.debounce_seconds = debounce_seconds
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
     
     def on_created(self, event):
         if not event.is_directory and event.src_path.endswith('.npy'):
             logger.info("new_embedding_detected", path=event.src_path)
-            self.speaker_identifier.reload_embeddings()
+            self._schedule(event.src_path)
     
     def on_modified(self, event):
         if not event.is_directory and event.src_path.endswith('.npy'):
-            logger.info("embedding_modified", path=event.src_path)
-            self.speaker_identifier.reload_embeddings()
+            logger.debug("embedding_modified", path=event.src_path)
+            self._schedule(event.src_path)
     
     def on_deleted(self, event):
         if not event.is_directory and event.src_path.endswith('.npy'):
             logger.info("embedding_deleted", path=event.src_path)
-            self.speaker_identifier.reload_embeddings()
+            self._schedule(event.src_path)
+    
+    def on_moved(self, event):
+        # Atomic saves (write tmp + rename) show up as moves
+        if event.is_directory:
+            return
+        if event.src_path.endswith('.npy'):
+            self._schedule(event.src_path)
+        if event.dest_path.endswith('.npy'):
+            logger.info("embedding_replaced", path=event.dest_path)
+            self._schedule(event.dest_path)
+    
+    def _schedule(self, path: str):
+        """Collect changed path and (re)arm the debounce timer."""
+        with self._lock:
+            self._pending.add(path)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce_seconds, self._flush)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def _flush(self):
+        """Apply all pending changes in a single incremental update."""
+        with self._lock:
+            paths = sorted(self._pending)
+            self._pending.clear()
+            self._timer = None
+        
+        if paths:
+            self.speaker_identifier.apply_embedding_changes(paths)
+    
+    def stop(self):
+        """Cancel pending debounce timer."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
 
 
 class SpeakerIDService:
@@ -69,6 +115,8 @@ class SpeakerIDService:
         self.grpc_server: GRPCServer = None
         self.metrics_collector: MetricsCollector = None
         self.embeddings_observer: Observer = None
+        self.embeddings_watcher: EmbeddingsWatcher = None
+        self.load_task: Optional[asyncio.Task] = None
         self.shutdown_event = asyncio.Event()
     
     async def initialize(self):
@@ -85,21 +133,34 @@ class SpeakerIDService:
             self.speaker_identifier = SpeakerIdentifier(
                 diarization_config=self.config.diarization,
                 recognition_config=self.config.recognition,
-                overlap_config=self.config.overlap
+                overlap_config=self.config.overlap,
+                inference_config=self.config.inference,
+                vad_config=self.config.vad,
+                max_pending=self.config.grpc.max_concurrent_requests
             )
             
             # Initialize NATS client
             self.nats_client = NATSClient(self.config.nats)
+            self.nats_client.promote_unknown_callback = self.speaker_identifier.promote_unknown
+            self.nats_client.system_health_callback = self.speaker_identifier.update_system_health
+            self.nats_client.conversation_ended_callbacks.append(
+                self.speaker_identifier.forget_conversation
+            )
             await self.nats_client.connect()
             
             # Initialize gRPC server
             self.grpc_server = GRPCServer(
                 config=self.config.grpc,
                 speaker_identifier=self.speaker_identifier,
-                nats_client=self.nats_client
+                nats_client=self.nats_client,
+                streaming_config=self.config.streaming,
+                separation_config=self.config.source_separation
             )
             await self.grpc_server.start()
             
+            # Models load in the background; gRPC health turns SERVING when done
+            self.load_task = asyncio.create_task(self._load_models())
+            
             # Start embeddings directory watcher
             self._start_embeddings_watcher()
             
@@ -109,10 +170,24 @@ class SpeakerIDService:
             logger.error("initialization_failed", error=str(e))
             raise
     
+    async def _load_models(self):
+        """Load and warm up models, then report the service ready."""
+        try:
+            await self.speaker_identifier.load()
+            await self.grpc_server.set_serving(True)
+            
+        except asyncio.CancelledError:
+            raise
+            
+        except Exception as e:
+            # Health stays NOT_SERVING: the orchestrator restarts the container
+            logger.error("model_loading_failed", error=str(e))
+            self.shutdown_event.set()
+    
     def _start_embeddings_watcher(self):
         """Start watching embeddings directory for changes."""
         try:
-            embeddings_path = Path(self.config.recognition.embeddings_path)
+            embeddings_path = Path(self.config.recognition.profiles_path)
             
             if not embeddings_path.exists():
                 logger.warning(
@@ -121,10 +196,13 @@ class SpeakerIDService:
                 )
                 return
             
-            event_handler = EmbeddingsWatcher(self.speaker_identifier)
+            self.embeddings_watcher = EmbeddingsWatcher(
+                self.speaker_identifier,
+                debounce_seconds=self.config.recognition.reload_debounce
+            )
             self.embeddings_observer = Observer()
             self.embeddings_observer.schedule(
-                event_handler,
+                self.embeddings_watcher,
                 str(embeddings_path),
                 recursive=False
             )
@@ -162,10 +240,16 @@ class SpeakerIDService:
         """Graceful shutdown."""
         logger.info("shutting_down_speaker_id_service")
         
+        # Stop background model loading
+        if self.load_task and not self.load_task.done():
+            self.load_task.cancel()
+        
         # Stop embeddings watcher
         if self.embeddings_observer:
             self.embeddings_observer.stop()
             self.embeddings_observer.join()
+        if self.embeddings_watcher:
+            self.embeddings_watcher.stop()
         
         # Stop gRPC server
         if self.grpc_server:
@@ -175,6 +259,10 @@ class SpeakerIDService:
         if self.nats_client:
             await self.nats_client.disconnect()
         
+        # Stop inference workers
+        if self.speaker_identifier:
+            self.speaker_identifier.shutdown()
+        
         self.shutdown_event.set()
         logger.info("speaker_id_service_shutdown_complete")
 
@@ -31,10 +31,27 @@ source_separation_triggers_total = Counter(
     'Total source separation triggers'
 )
 
+speaker_cache_lookups_total = Counter(
+    'speaker_cache_lookups_total',
+    'Per-label recognitions by conversation cache result',
+    ['result']  # label_hit, embedding_hit, miss
+)
+
+inference_rejected_total = Counter(
+    'inference_rejected_total',
+    'Total requests rejected by inference pool admission control'
+)
+
+diarization_backend_total = Counter(
+    'diarization_backend_total',
+    'Diarization runs by backend and selection reason',
+    ['backend', 'reason']  # pyannote/vad; requested, config, defcon, load, fallback, default
+)
+
 gate_operations_total = Counter(
     'gate_operations_total',
     'Total gate operations',
-    ['operation']  # verified, rejected, conversation_ended
+    ['operation']  # verified, rejected, conversation_ended, expired
 )
 
 # Histograms
@@ -51,6 +68,19 @@ speaker_confidence_histogram = Histogram(
     buckets=[0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 1.0]
 )
 
+inference_stage_seconds = Histogram(
+    'speaker_inference_stage_seconds',
+    'Per-stage inference latency in seconds',
+    ['stage'],  # queue_wait, diarize, embed_segments, embed, recognition
+    buckets=[0.01, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0]
+)
+
+gate_flush_latency_seconds = Histogram(
+    'gate_flush_latency_seconds',
+    'Time from gate open (speaker.verified) until buffered results are delivered',
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5]
+)
+
 # Gauges
 gate_buffer_size = Gauge(
     'gate_buffer_size',
@@ -62,11 +92,27 @@ active_conversations = Gauge(
     'Number of active conversations'
 )
 
+inference_pending_requests = Gauge(
+    'inference_pending_requests',
+    'Inference requests admitted and not yet finished'
+)
+
 enrolled_speakers_total = Gauge(
     'enrolled_speakers_total',
     'Total number of enrolled speakers'
 )
 
+startup_stage_seconds = Gauge(
+    'speaker_startup_stage_seconds',
+    'Duration of each startup stage of the last start',
+    ['stage']  # voice_encoder, diarization_pipeline, pyannote_embedding, embeddings, warm_up, total
+)
+
+models_ready = Gauge(
+    'speaker_models_ready',
+    'Models loaded and warmed up (1) or still loading (0)'
+)
+
 
 class MetricsCollector:
     """Centralized metrics collection."""
@@ -107,7 +153,7 @@ class MetricsCollector:
     
     @staticmethod
     def record_gate_operation(operation: str):
-        """Record gate operation (verified, rejected, conversation_ended)."""
+        """Record gate operation (verified, rejected, conversation_ended, expired, missing_conversation_id)."""
         gate_operations_total.labels(operation=operation).inc()
     
     @staticmethod
@@ -124,3 +170,43 @@ class MetricsCollector:
     def set_enrolled_speakers(count: int):
         """Set enrolled speakers count."""
         enrolled_speakers_total.set(count)
+    
+    @staticmethod
+    def record_diarization_backend(backend: str, reason: str):
+        """Record which diarization backend ran and why."""
+        diarization_backend_total.labels(backend=backend, reason=reason).inc()
+    
+    @staticmethod
+    def record_startup_stage(stage: str, seconds: float):
+        """Record duration of a startup stage."""
+        startup_stage_seconds.labels(stage=stage).set(seconds)
+    
+    @staticmethod
+    def set_models_ready(ready: bool):
+        """Set models readiness."""
+        models_ready.set(1 if ready else 0)
+    
+    @staticmethod
+    def record_inference_stage(stage: str, seconds: float):
+        """Record latency of a single inference stage."""
+        inference_stage_seconds.labels(stage=stage).observe(seconds)
+    
+    @staticmethod
+    def set_inference_pending(count: int):
+        """Set number of in-flight inference requests."""
+        inference_pending_requests.set(count)
+    
+    @staticmethod
+    def record_inference_rejected():
+        """Record request rejected by inference admission control."""
+        inference_rejected_total.inc()
+    
+    @staticmethod
+    def record_gate_flush(seconds: float):
+        """Record gate-open-to-delivered latency of a buffer flush."""
+        gate_flush_latency_seconds.observe(seconds)
+    
+    @staticmethod
+    def record_speaker_cache(result: str):
+        """Record conversation speaker cache result (label_hit, embedding_hit, miss)."""
+        speaker_cache_lookups_total.labels(result=result).inc()
@@ -3,14 +3,20 @@ NATS client for Speaker ID/Diarization service.
 Handles gate mechanism (buffering until speaker.verified) and publishes results.
 """
 
-import asyncio
+import time
 import json
+import asyncio
+import base64
 import structlog
-from typing import Optional, Dict, Any
+import numpy as np
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Callable, Deque, List, Tuple
 from nats.aio.client import Client as NATS
 from enum import Enum
 
 from .config import NATSConfig
+from .metrics import MetricsCollector
 
 logger = structlog.get_logger(__name__)
 
@@ -22,16 +28,28 @@ class GateState(Enum):
     ANALYZING = "analyzing"
 
 
+@dataclass
+class ConversationGate:
+    """Gate of a single conversation: state plus bounded result buffer."""
+    state: GateState
+    buffer: Deque[Dict[str, Any]]
+    last_activity: float = field(default_factory=time.monotonic)
+
+
 class NATSClient:
-    """NATS client with gate mechanism for speaker verification."""
+    """
+    NATS client with gate mechanism for speaker verification.
+    Gates are keyed by conversation_id, so concurrent sessions never share a buffer.
+    """
     
     def __init__(self, config: NATSConfig):
         self.config = config
         self.nc: Optional[NATS] = None
-        self.gate_state = GateState.IDLE
-        self.buffer: list[Dict[str, Any]] = []
-        self.current_conversation_id: Optional[str] = None
-        
+        self.gates: Dict[str, ConversationGate] = {}
+        self.conversation_ended_callbacks: list[Callable[[str], None]] = []
+        self.promote_unknown_callback: Optional[Callable[[str, str], bool]] = None
+        self.system_health_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    
     async def connect(self):
         """Connect to NATS server."""
         try:
@@ -52,6 +70,14 @@ class NATSClient:
                 self.config.subscribe_conversation_ended, 
                 cb=self._on_conversation_ended
             )
+            await self.nc.subscribe(
+                self.config.subscribe_promote_unknown,
+                cb=self._on_promote_unknown
+            )
+            await self.nc.subscribe(
+                self.config.subscribe_system_health,
+                cb=self._on_system_health
+            )
             
             logger.info("subscribed_to_gate_events")
             
@@ -65,23 +91,89 @@ class NATSClient:
             await self.nc.close()
             logger.info("disconnected_from_nats")
     
+    def _get_gate(
+        self,
+        conversation_id: str,
+        state: GateState = GateState.BUFFERING
+    ) -> ConversationGate:
+        """Get the gate of a conversation, creating it in the given state."""
+        self._evict_expired()
+        gate = self.gates.get(conversation_id)
+        if gate is None:
+            gate = ConversationGate(
+                state=state,
+                buffer=deque(maxlen=self.config.gate_buffer_size)
+            )
+            self.gates[conversation_id] = gate
+            logger.info(
+                "gate_created",
+                conversation_id=conversation_id,
+                state=state.value
+            )
+        gate.last_activity = time.monotonic()
+        return gate
+    
+    def _target_conversations(self, event: str, conversation_id: Optional[str]) -> list[str]:
+        """
+        Conversations a verified/rejected event applies to.
+        Events without conversation_id are logged and ignored: opening (or
+        discarding) every buffering gate would leak results across sessions.
+        """
+        if conversation_id:
+            return [conversation_id]
+        MetricsCollector.record_gate_operation("missing_conversation_id")
+        logger.warning("gate_event_without_conversation_id", event=event)
+        return []
+    
+    def _evict_expired(self):
+        """Drop gates without activity for gate_ttl (never verified/rejected/ended)."""
+        deadline = time.monotonic() - self.config.gate_ttl
+        expired = [
+            conversation_id
+            for conversation_id, gate in self.gates.items()
+            if gate.last_activity < deadline
+        ]
+        for conversation_id in expired:
+            gate = self.gates.pop(conversation_id)
+            MetricsCollector.record_gate_operation("expired")
+            logger.warning(
+                "gate_expired",
+                conversation_id=conversation_id,
+                state=gate.state.value,
+                discarded_items=len(gate.buffer)
+            )
+        
+        if expired:
+            self._update_gate_metrics()
+    
+    def _update_gate_metrics(self):
+        """Active conversations and total buffered results."""
+        MetricsCollector.set_active_conversations(len(self.gates))
+        MetricsCollector.set_buffer_size(sum(len(gate.buffer) for gate in self.gates.values()))
+    
     async def _on_speaker_verified(self, msg):
         """Handle speaker.verified event - open gate."""
         try:
+            opened_at = time.monotonic()
             data = json.loads(msg.data.decode())
-            conversation_id = data.get("conversation_id")
-            
-            logger.info(
-                "gate_opened",
-                conversation_id=conversation_id,
-                buffered_items=len(self.buffer)
-            )
+            MetricsCollector.record_gate_operation("verified")
             
-            self.gate_state = GateState.ANALYZING
-            self.current_conversation_id = conversation_id
+            for conversation_id in self._target_conversations("speaker.verified", data.get("conversation_id")):
+                # Verification may arrive before the first result: open the gate anyway
+                gate = self._get_gate(conversation_id, GateState.ANALYZING)
+                
+                logger.info(
+                    "gate_opened",
+                    conversation_id=conversation_id,
+                    buffered_items=len(gate.buffer)
+                )
+                
+                gate.state = GateState.ANALYZING
+                
+                # Publish all buffered results
+                await self._flush_buffer(conversation_id, gate, opened_at)
             
-            # Publish all buffered results
-            await self._flush_buffer()
+            self._update_gate_metrics()
             
         except Exception as e:
             logger.error("error_processing_verified", error=str(e))
@@ -90,18 +182,19 @@ class NATSClient:
         """Handle speaker.rejected event - discard buffer."""
         try:
             data = json.loads(msg.data.decode())
-            conversation_id = data.get("conversation_id")
+            MetricsCollector.record_gate_operation("rejected")
             
-            logger.warning(
-                "gate_rejected",
-                conversation_id=conversation_id,
-                discarded_items=len(self.buffer)
-            )
+            for conversation_id in self._target_conversations("speaker.rejected", data.get("conversation_id")):
+                # Discard buffer
+                gate = self.gates.pop(conversation_id, None)
+                
+                logger.warning(
+                    "gate_rejected",
+                    conversation_id=conversation_id,
+                    discarded_items=len(gate.buffer) if gate else 0
+                )
             
-            # Discard buffer
-            self.buffer.clear()
-            self.gate_state = GateState.IDLE
-            self.current_conversation_id = None
+            self._update_gate_metrics()
             
         except Exception as e:
             logger.error("error_processing_rejected", error=str(e))
@@ -111,6 +204,7 @@ class NATSClient:
         try:
             data = json.loads(msg.data.decode())
             conversation_id = data.get("conversation_id")
+            MetricsCollector.record_gate_operation("conversation_ended")
             
             logger.info(
                 "conversation_ended",
@@ -118,72 +212,172 @@ class NATSClient:
                 resetting_gate=True
             )
             
-            # Reset to IDLE
-            self.buffer.clear()
-            self.gate_state = GateState.IDLE
-            self.current_conversation_id = None
+            # Reset to IDLE (gate is recreated on the next result)
+            self.gates.pop(conversation_id, None)
+            self._update_gate_metrics()
+            
+            # Let other components drop per-conversation state
+            for callback in self.conversation_ended_callbacks:
+                callback(conversation_id)
             
         except Exception as e:
             logger.error("error_processing_conversation_ended", error=str(e))
     
+    async def _on_promote_unknown(self, msg):
+        """Handle speaker.unknown.promote event - enroll an unknown cluster."""
+        try:
+            data = json.loads(msg.data.decode())
+            unknown_id = data["unknown_id"]
+            user_id = data["user_id"]
+            
+            promoted = False
+            if self.promote_unknown_callback:
+                promoted = self.promote_unknown_callback(unknown_id, user_id)
+            
+            logger.info(
+                "promote_unknown_requested",
+                unknown_id=unknown_id,
+                user_id=user_id,
+                promoted=promoted
+            )
+            
+            # Admin tools use request/reply to learn the outcome
+            if msg.reply:
+                await msg.respond(json.dumps({"promoted": promoted}).encode())
+            
+        except Exception as e:
+            logger.error("error_processing_promote_unknown", error=str(e))
+    
+    async def _on_system_health(self, msg):
+        """Handle system.health.status heartbeat from the watchdog (carries DEFCON)."""
+        try:
+            status = json.loads(msg.data.decode())
+            if self.system_health_callback:
+                self.system_health_callback(status)
+            
+        except Exception as e:
+            logger.error("error_processing_system_health", error=str(e))
+    
     async def publish_diarization_result(self, result: Dict[str, Any]):
         """
         Publish diarization result.
-        If gate is closed (BUFFERING), store in buffer.
-        If gate is open (ANALYZING), publish immediately.
+        If the conversation gate is closed (BUFFERING), store in its buffer.
+        If it is open (ANALYZING), publish immediately.
         """
         try:
-            if self.gate_state == GateState.IDLE:
-                # Start buffering mode on first result
-                self.gate_state = GateState.BUFFERING
-                logger.info("gate_buffering_started")
-            
-            if self.gate_state == GateState.BUFFERING:
-                # Store in buffer
-                self.buffer.append(result)
+            conversation_id = result.get("conversation_id")
+            gate = self._get_gate(conversation_id)
+            
+            if gate.state == GateState.BUFFERING:
+                if len(gate.buffer) == gate.buffer.maxlen:
+                    logger.warning(
+                        "gate_buffer_full",
+                        conversation_id=conversation_id,
+                        max_size=gate.buffer.maxlen
+                    )
+                
+                # Store in buffer (oldest result dropped when full)
+                gate.buffer.append(result)
                 logger.debug(
                     "result_buffered",
+                    conversation_id=conversation_id,
                     speaker_id=result.get("speaker_id"),
-                    buffer_size=len(self.buffer)
+                    buffer_size=len(gate.buffer)
                 )
+                self._update_gate_metrics()
                 
-            elif self.gate_state == GateState.ANALYZING:
+            elif gate.state == GateState.ANALYZING:
                 # Publish immediately
                 await self._publish_result(result)
-                
+            
         except Exception as e:
             logger.error("error_publishing_result", error=str(e))
     
-    async def _flush_buffer(self):
-        """Flush all buffered results to NATS."""
-        if not self.buffer:
+    async def _flush_buffer(
+        self,
+        conversation_id: str,
+        gate: ConversationGate,
+        opened_at: float
+    ):
+        """
+        Flush buffered results of a conversation to NATS.
+        Everything is encoded up front and published back-to-back (nats-py only
+        appends to its pending buffer), followed by a single flush() round trip.
+        The buffer is only cleared once flush() succeeds: on failure the results
+        stay buffered and the next speaker.verified retries them. Messages that did
+        go out before the failure carry the same Nats-Msg-Id on the retry, so
+        JetStream drops the duplicates.
+        """
+        if not gate.buffer:
             return
         
-        logger.info("flushing_buffer", count=len(self.buffer))
+        results = list(gate.buffer)
         
-        for result in self.buffer:
-            await self._publish_result(result)
-        
-        self.buffer.clear()
-        logger.info("buffer_flushed")
+        try:
+            if self.config.gate_batch_publish:
+                # One coalesced message per conversation
+                messages = [(
+                    self.config.publish_batch,
+                    json.dumps({
+                        "conversation_id": conversation_id,
+                        "results": results
+                    }).encode(),
+                    f"{self._msg_id(results[0])}..{self._msg_id(results[-1])}:{len(results)}"
+                )]
+            else:
+                messages = [self._encode_result(result) for result in results]
+            
+            await asyncio.gather(*(
+                self.nc.publish(subject, payload, headers={"Nats-Msg-Id": msg_id})
+                for subject, payload, msg_id in messages
+            ))
+            await self.nc.flush()
+            gate.buffer.clear()
+            
+            flush_latency = time.monotonic() - opened_at
+            MetricsCollector.record_gate_flush(flush_latency)
+            
+            logger.info(
+                "buffer_flushed",
+                conversation_id=conversation_id,
+                count=len(results),
+                messages=len(messages),
+                latency=f"{flush_latency * 1000:.1f}ms"
+            )
+            
+        except Exception as e:
+            logger.error(
+                "error_flushing_buffer",
+                conversation_id=conversation_id,
+                count=len(results),
+                error=str(e)
+            )
+    
+    @staticmethod
+    def _msg_id(result: Dict[str, Any]) -> str:
+        """Stable id of a result (same on every retry), for JetStream deduplication."""
+        return (
+            f"{result.get('conversation_id')}:{result.get('timestamp')}:"
+            f"{result.get('start_time')}-{result.get('end_time')}"
+        )
+    
+    def _encode_result(self, result: Dict[str, Any]) -> Tuple[str, bytes, str]:
+        """Subject (by recognition), JSON payload and Nats-Msg-Id of a single result."""
+        if result.get("recognized", False):
+            subject = self.config.publish_recognized.format(speaker_id=result.get("speaker_id"))
+        else:
+            subject = self.config.publish_unknown
+        return subject, json.dumps(result).encode(), self._msg_id(result)
     
     async def _publish_result(self, result: Dict[str, Any]):
         """Publish a single result to NATS."""
         try:
             speaker_id = result.get("speaker_id")
             recognized = result.get("recognized", False)
-            
-            # Choose subject based on recognition
-            if recognized:
-                subject = self.config.publish_recognized.format(speaker_id=speaker_id)
-            else:
-                subject = self.config.publish_unknown
+            subject, payload, msg_id = self._encode_result(result)
             
             # Publish to NATS
-            await self.nc.publish(
-                subject,
-                json.dumps(result).encode()
-            )
+            await self.nc.publish(subject, payload, headers={"Nats-Msg-Id": msg_id})
             
             logger.info(
                 "result_published",
@@ -196,23 +390,42 @@ class NATSClient:
         except Exception as e:
             logger.error("error_publishing_to_nats", error=str(e), result=result)
     
-    async def trigger_source_separation(self, audio_data: bytes, conversation_id: str):
-        """Trigger source separation when overlap detected."""
+    async def trigger_source_separation(
+        self,
+        audio: np.ndarray,
+        speakers: List[str],
+        conversation_id: str,
+        start_time: float
+    ):
+        """
+        Trigger source separation for one overlap region.
+        audio: float32 clip of the region (16kHz mono), sent as base64 int16 PCM.
+        start_time: time of the clip's first sample (region start minus margin).
+        """
         try:
+            pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
             payload = {
-                "audio": audio_data.hex(),  # Convert bytes to hex string
+                "audio": base64.b64encode(pcm.tobytes()).decode(),
+                "duration": len(pcm) / 16000.0,
+                "speakers": speakers,
                 "conversation_id": conversation_id,
-                "timestamp": asyncio.get_event_loop().time()
+                "start_time": start_time,
+                "timestamp": time.time()
             }
             
+            # Msg-Id lets a JetStream stream on this subject drop duplicates
             await self.nc.publish(
-                "audio.separation.trigger",
-                json.dumps(payload).encode()
+                self.config.publish_overlap,
+                json.dumps(payload).encode(),
+                headers={"Nats-Msg-Id": f"{conversation_id}:{start_time}"}
             )
+            MetricsCollector.record_source_separation_trigger()
             
             logger.info(
                 "source_separation_triggered",
-                conversation_id=conversation_id
+                conversation_id=conversation_id,
+                speakers=speakers,
+                duration=f"{payload['duration']:.2f}s"
             )
             
         except Exception as e:
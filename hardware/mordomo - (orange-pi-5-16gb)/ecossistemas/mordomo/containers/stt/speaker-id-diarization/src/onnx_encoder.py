@@ -0,0 +1,36 @@
+"""
+ONNX runtime for the Resemblyzer VoiceEncoder.
+Runs the graph exported by speaker-verification/scripts/export_encoder_onnx.py
+(fp32 or dynamic int8) with onnxruntime, so both containers share one model file
+and one embedding space.
+"""
+
+import numpy as np
+import onnxruntime as ort
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+class OnnxVoiceEncoder:
+    """Replacement for VoiceEncoder's LSTM forward pass (mel partials -> embeddings)."""
+
+    def __init__(self, model_path: str, num_threads: int):
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.session = ort.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        self.embedding_dim = self.session.get_outputs()[0].shape[-1]
+
+        logger.info("onnx_voice_encoder_loaded", path=model_path, threads=num_threads)
+
+    def embed_partials(self, mels: np.ndarray) -> np.ndarray:
+        """L2-normalized embeddings of a (batch, frames, n_mels) array of mel partials."""
+        return self.session.run(
+            None, {self.input_name: mels.astype(np.float32, copy=False)}
+        )[0]
@@ -0,0 +1,140 @@
+"""
+Per-conversation speaker cache for Speaker ID/Diarization service.
+Remembers who each diarization label / voice was within a conversation so repeated
+speakers are not re-identified (and re-hashed into new unknown IDs) on every request.
+"""
+
+import time
+import numpy as np
+import structlog
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class CachedSpeaker:
+    """Identity resolved for one speaker of a conversation."""
+    speaker_id: str
+    confidence: float
+    recognized: bool
+    centroid: np.ndarray  # L2-normalized embedding
+
+    @property
+    def identity(self) -> Tuple[str, float, bool]:
+        return self.speaker_id, self.confidence, self.recognized
+
+
+@dataclass
+class _ConversationEntry:
+    """Cached speakers of a single conversation."""
+    labels: Dict[str, CachedSpeaker] = field(default_factory=dict)
+    speakers: List[CachedSpeaker] = field(default_factory=list)
+    last_seen: float = field(default_factory=time.monotonic)
+
+
+class ConversationSpeakerCache:
+    """
+    Cache of resolved speakers keyed by conversation_id.
+
+    - Label lookups are a dictionary hit, valid when labels are stable across
+      requests (streaming diarization keeps them stable).
+    - Embedding lookups compare against the few speakers already seen in the
+      conversation before searching the full enrolled database.
+    """
+
+    def __init__(self, ttl_seconds: float, match_threshold: float):
+        self.ttl_seconds = ttl_seconds
+        self.match_threshold = match_threshold
+        self._conversations: Dict[str, _ConversationEntry] = {}
+
+    def lookup_label(self, conversation_id: str, label: str) -> Optional[CachedSpeaker]:
+        """Return cached speaker for a (conversation, label) pair."""
+        entry = self._touch(conversation_id)
+        return entry.labels.get(label) if entry else None
+
+    def match(self, conversation_id: str, embedding: np.ndarray) -> Optional[CachedSpeaker]:
+        """Return the conversation speaker closest to embedding, if above threshold."""
+        entry = self._touch(conversation_id)
+        if not entry or not entry.speakers:
+            return None
+
+        norm = np.linalg.norm(embedding)
+        if norm == 0:
+            return None
+
+        centroids = np.stack([speaker.centroid for speaker in entry.speakers])
+        similarities = centroids @ (embedding / norm)
+        best_index = int(np.argmax(similarities))
+
+        if similarities[best_index] >= self.match_threshold:
+            return entry.speakers[best_index]
+        return None
+
+    def store(
+        self,
+        conversation_id: str,
+        identity: Tuple[str, float, bool],
+        embedding: np.ndarray,
+        label: Optional[str] = None
+    ) -> CachedSpeaker:
+        """Cache identity for a conversation (and label, when given)."""
+        self._evict_expired()
+        entry = self._conversations.setdefault(conversation_id, _ConversationEntry())
+        entry.last_seen = time.monotonic()
+
+        speaker_id, confidence, recognized = identity
+        speaker = next(
+            (cached for cached in entry.speakers if cached.speaker_id == speaker_id),
+            None
+        )
+        if speaker is None:
+            norm = np.linalg.norm(embedding)
+            speaker = CachedSpeaker(
+                speaker_id=speaker_id,
+                confidence=confidence,
+                recognized=recognized,
+                centroid=embedding / norm if norm > 0 else embedding
+            )
+            entry.speakers.append(speaker)
+
+        if label is not None:
+            entry.labels[label] = speaker
+
+        return speaker
+
+    def promote(self, unknown_id: str, user_id: str):
+        """Re-label cached speakers of an unknown cluster promoted to an enrolled user."""
+        for entry in self._conversations.values():
+            for speaker in entry.speakers:
+                if speaker.speaker_id == unknown_id:
+                    speaker.speaker_id = user_id
+                    speaker.recognized = True
+
+    def forget(self, conversation_id: str):
+        """Drop everything cached for a conversation (e.g. conversation.ended)."""
+        if self._conversations.pop(conversation_id, None) is not None:
+            logger.debug("conversation_speakers_forgotten", conversation_id=conversation_id)
+
+    def _touch(self, conversation_id: str) -> Optional[_ConversationEntry]:
+        """Get a live entry and refresh its TTL."""
+        self._evict_expired()
+        entry = self._conversations.get(conversation_id)
+        if entry:
+            entry.last_seen = time.monotonic()
+        return entry
+
+    def _evict_expired(self):
+        """Drop conversations not seen for ttl_seconds."""
+        deadline = time.monotonic() - self.ttl_seconds
+        expired = [
+            conversation_id
+            for conversation_id, entry in self._conversations.items()
+            if entry.last_seen < deadline
+        ]
+        for conversation_id in expired:
+            del self._conversations[conversation_id]
+
+    def __len__(self) -> int:
+        return len(self._conversations)
@@ -3,29 +3,36 @@ Speaker Identification and Diarization core logic.
 Combines pyannote.audio diarization with speaker recognition using embeddings.
 """
 
-import os
 import time
-import hashlib
+import asyncio
 import numpy as np
-import torch
 import structlog
-from pathlib import Path
+from collections import Counter
 from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
-# Pyannote for diarization
-from pyannote.audio import Pipeline
-from pyannote.audio.pipelines.speaker_verification import PretrainedSpeakerEmbedding
-
-# Resemblyzer for embeddings (compatible with Speaker Verification)
-from resemblyzer import VoiceEncoder
-
-from .config import DiarizationConfig, RecognitionConfig, OverlapConfig
+from .config import (
+    DiarizationConfig, RecognitionConfig, OverlapConfig, InferenceConfig, VADConfig
+)
+from .embedding_store import EmbeddingStore
+from .inference import (
+    InferenceExecutor, InferenceOverloadedError, DiarizationTurn, DiarizationOutput, SAMPLE_RATE
+)
+from .speaker_cache import ConversationSpeakerCache
+from .unknown_speakers import UnknownSpeakerStore
 from .metrics import MetricsCollector
 
 logger = structlog.get_logger(__name__)
 
 
+@dataclass
+class TranscriptWord:
+    """Word with timestamps from Whisper ASR (seconds, same timeline as the audio)."""
+    text: str
+    start: float
+    end: float
+
+
 @dataclass
 class SpeakerSegment:
     """Individual speaker segment result."""
@@ -37,12 +44,23 @@ class SpeakerSegment:
     end_time: float
 
 
+@dataclass
+class OverlapRegion:
+    """Interval where two or more speakers talk at the same time."""
+    start: float
+    end: float
+    speakers: List[str]
+    audio: Optional[np.ndarray] = None  # Clip (with separation margin) for source separation
+    clip_start: Optional[float] = None  # Time of the clip's first sample (start - margin, clamped)
+
+
 @dataclass
 class DiarizationResult:
     """Complete diarization result."""
     segments: List[SpeakerSegment]
     overlap_detected: bool
     processing_time: float
+    overlap_regions: List[OverlapRegion] = field(default_factory=list)
 
 
 class SpeakerIdentifier:
@@ -50,159 +68,219 @@ class SpeakerIdentifier:
     Hybrid Speaker Identification:
     1. Diarization: Separate voices into segments
     2. Recognition: Identify each segment with enrolled embeddings
+    
+    diarize, embed_labels, identify_labels, split_transcript and unknown_identity
+    are the steps of identify_and_diarize, public for StreamingDiarizer.
     """
     
     def __init__(
         self,
         diarization_config: DiarizationConfig,
         recognition_config: RecognitionConfig,
-        overlap_config: OverlapConfig
+        overlap_config: OverlapConfig,
+        inference_config: InferenceConfig,
+        vad_config: VADConfig,
+        max_pending: int
     ):
         self.diarization_config = diarization_config
         self.recognition_config = recognition_config
         self.overlap_config = overlap_config
+        self.vad_config = vad_config
+        
+        # Latest DEFCON from the system watchdog (1 = normal ... 4 = emergency)
+        self.defcon = 1
         
-        # Initialize encoder (same as Speaker Verification for compatibility)
-        self.encoder = VoiceEncoder()
-        logger.info("voice_encoder_initialized", device="cpu")
+        # Models (VoiceEncoder + pyannote) live in a dedicated worker pool,
+        # keeping torch work off the gRPC event loop. Loaded in the background by load().
+        self.inference = InferenceExecutor(
+            config=inference_config,
+            diarization_config=diarization_config,
+            embedding_backend=recognition_config.embedding_backend,
+            max_pending=max_pending
+        )
         
-        # Load diarization pipeline
-        self._load_diarization_pipeline()
+        # Enrolled embeddings (copy-on-write snapshot), also filled by load().
+        # Profiles must live in the same space as the active embedding backend.
+        self.embedding_store = EmbeddingStore(self.recognition_config.profiles_path)
         
-        # Load enrolled embeddings from database
-        self.enrolled_embeddings: Dict[str, np.ndarray] = {}
-        self._load_enrolled_embeddings()
+        # True once models are loaded and warmed up (gRPC health reports SERVING)
+        self.ready = False
+        
+        # Speakers already resolved per conversation (reused across requests)
+        self.speaker_cache = ConversationSpeakerCache(
+            ttl_seconds=self.recognition_config.conversation_cache_ttl,
+            match_threshold=self.recognition_config.threshold
+        )
         
-        # Update metrics
-        MetricsCollector.set_enrolled_speakers(len(self.enrolled_embeddings))
+        # Online clusters of non-enrolled speakers (stable unknown_* IDs)
+        self.unknown_speakers = UnknownSpeakerStore(
+            ttl_seconds=self.recognition_config.unknown_ttl,
+            match_threshold=self.recognition_config.unknown_cluster_threshold
+        )
     
-    def _load_diarization_pipeline(self):
-        """Load pyannote diarization pipeline."""
-        try:
-            # Note: Requires HuggingFace token for pyannote models
-            # Set via: export HUGGINGFACE_TOKEN=your_token
-            self.diarization_pipeline = Pipeline.from_pretrained(
-                self.diarization_config.model,
-                use_auth_token=os.getenv("HUGGINGFACE_TOKEN")
-            )
-            
+    async def load(self):
+        """
+        Load models and enrolled embeddings concurrently, off the event loop.
+        Models are warmed up with a synthetic inference before the service is ready.
+        """
+        started_at = time.time()
+        
+        async def load_embeddings():
+            stage_started_at = time.time()
+            await asyncio.to_thread(self.embedding_store.load_all)
+            MetricsCollector.set_enrolled_speakers(len(self.embedding_store.snapshot))
+            MetricsCollector.record_startup_stage("embeddings", time.time() - stage_started_at)
+        
+        load_times, _ = await asyncio.gather(self.inference.start(), load_embeddings())
+        for stage, seconds in load_times.items():
+            MetricsCollector.record_startup_stage(stage, seconds)
+        
+        total = time.time() - started_at
+        MetricsCollector.record_startup_stage("total", total)
+        MetricsCollector.set_models_ready(True)
+        self.ready = True
+        
+        logger.info("speaker_identifier_ready", startup_time=f"{total:.2f}s")
+    
+    def shutdown(self):
+        """Release the inference worker pool."""
+        self.inference.shutdown()
+    
+    def update_system_health(self, status: Dict):
+        """Track the watchdog DEFCON (system.health.status) to downgrade diarization cost."""
+        defcon = int(status.get("defcon", 1))
+        if defcon != self.defcon:
             logger.info(
-                "diarization_pipeline_loaded",
-                model=self.diarization_config.model
+                "system_defcon_changed",
+                previous=self.defcon,
+                defcon=defcon,
+                vad_fast_path=defcon >= self.vad_config.defcon_level
             )
-            
-        except Exception as e:
-            logger.error("failed_to_load_diarization_pipeline", error=str(e))
-            # Fallback: disable diarization, use only recognition
-            self.diarization_pipeline = None
+            self.defcon = defcon
     
-    def _load_enrolled_embeddings(self):
-        """Load all enrolled speaker embeddings from database."""
-        embeddings_path = Path(self.recognition_config.embeddings_path)
-        
-        if not embeddings_path.exists():
-            logger.warning(
-                "embeddings_directory_not_found",
-                path=str(embeddings_path)
-            )
-            return
+    def select_backend(self, requested: str = "") -> Tuple[str, str]:
+        """
+        Diarization backend for a request, with the reason it was chosen:
+        explicit per-request choice, VAD as configured default, watchdog DEFCON
+        or inference pool load; pyannote otherwise.
+        """
+        if requested in ("pyannote", "vad"):
+            return requested, "requested"
+        if self.diarization_config.backend == "vad":
+            return "vad", "config"
+        if self.defcon >= self.vad_config.defcon_level:
+            return "vad", "defcon"
+        if self.inference.pending >= self.vad_config.load_threshold * self.inference.max_pending:
+            return "vad", "load"
+        return "pyannote", "default"
+    
+    async def diarize(self, audio: np.ndarray, requested: str = "") -> Optional[DiarizationOutput]:
+        """
+        Run the selected diarization backend in the inference pool.
+        When pyannote is unavailable or fails, the VAD backend is used instead.
+        """
+        backend, reason = self.select_backend(requested)
         
-        # Load all .npy files
-        for embedding_file in embeddings_path.glob("*.npy"):
-            try:
-                user_id = embedding_file.stem  # e.g., "user_1" from "user_1.npy"
-                embedding = np.load(embedding_file)
-                
-                self.enrolled_embeddings[user_id] = embedding
-                
-                logger.info(
-                    "embedding_loaded",
-                    user_id=user_id,
-                    shape=embedding.shape
-                )
-                
-            except Exception as e:
-                logger.error(
-                    "failed_to_load_embedding",
-                    file=str(embedding_file),
-                    error=str(e)
-                )
+        if backend == "pyannote":
+            output = await self.inference.submit("diarize", audio)
+            if output is not None:
+                MetricsCollector.record_diarization_backend(backend, reason)
+                return output
+            backend, reason = "vad", "fallback"
+        
+        MetricsCollector.record_diarization_backend(backend, reason)
+        return await self.inference.submit("diarize_vad", audio, self.vad_config)
+    
+    def forget_conversation(self, conversation_id: str):
+        """Drop cached speakers of a finished conversation."""
+        self.speaker_cache.forget(conversation_id)
+    
+    def apply_embedding_changes(self, paths: List[str]):
+        """Incremental hot reload of changed embedding files (called by watchdog)."""
+        logger.info("applying_embedding_changes", files=len(paths))
+        self.embedding_store.apply_changes(paths)
+        MetricsCollector.set_enrolled_speakers(len(self.embedding_store.snapshot))
+    
+    def promote_unknown(self, unknown_id: str, user_id: str) -> bool:
+        """
+        Enroll an unknown speaker cluster as user_id using its centroid,
+        without re-recording. Returns False if the cluster is unknown/expired or
+        the profile could not be written (the cluster is kept for a retry).
+        """
+        speaker = self.unknown_speakers.get(unknown_id)
+        if speaker is None:
+            logger.warning("unknown_speaker_not_found", unknown_id=unknown_id)
+            return False
+        
+        if not self.embedding_store.add(user_id, speaker.centroid):
+            logger.warning("unknown_speaker_not_promoted", unknown_id=unknown_id, user_id=user_id)
+            return False
+        
+        self.unknown_speakers.pop(unknown_id)
+        self.speaker_cache.promote(unknown_id, user_id)
+        MetricsCollector.set_enrolled_speakers(len(self.embedding_store.snapshot))
         
         logger.info(
-            "enrolled_embeddings_loaded",
-            total=len(self.enrolled_embeddings),
-            users=list(self.enrolled_embeddings.keys())
+            "unknown_speaker_promoted",
+            unknown_id=unknown_id,
+            user_id=user_id,
+            samples=speaker.count
         )
-    
-    def reload_embeddings(self):
-        """Hot reload embeddings (called by watchdog)."""
-        logger.info("reloading_embeddings")
-        self.enrolled_embeddings.clear()
-        self._load_enrolled_embeddings()
-        MetricsCollector.set_enrolled_speakers(len(self.enrolled_embeddings))
+        return True
     
     async def identify_and_diarize(
         self,
         audio: np.ndarray,
         transcript: str,
-        conversation_id: str
+        conversation_id: str,
+        words: Optional[List[TranscriptWord]] = None,
+        backend: str = ""
     ) -> DiarizationResult:
         """
         Main processing pipeline:
-        1. Diarize audio (separate speakers)
+        1. Diarize audio (separate speakers) with pyannote or the VAD fast path
         2. Recognize each speaker (compare with enrolled embeddings)
-        3. Return identified segments
+        3. Return identified segments (with their own words, when word timestamps are given)
         """
         start_time = time.time()
         
         try:
-            # If no diarization pipeline, treat as single speaker
-            if self.diarization_pipeline is None:
+            # 1. DIARIZATION: Separate voices (runs in inference pool)
+            diarization_output = await self.diarize(audio, backend)
+            
+            # No speech found by any backend: treat as single speaker
+            if diarization_output is None:
                 return await self._recognize_single_speaker(
                     audio, transcript, conversation_id
                 )
             
-            # 1. DIARIZATION: Separate voices
-            diarization_output = self.diarization_pipeline({
-                "waveform": torch.from_numpy(audio).unsqueeze(0),
-                "sample_rate": 16000
-            })
+            # Skip segments too short
+            turns = [
+                turn for turn in diarization_output.turns
+                if turn.end - turn.start >= self.diarization_config.min_speaker_duration
+            ]
+            
+            # 2. RECOGNITION: Identify each speaker label once
+            label_identities = await self.identify_labels(
+                audio, turns, diarization_output.label_embeddings, conversation_id
+            )
+            identities = [
+                label_identities.get(turn.speaker_label, self.unknown_identity())
+                for turn in turns
+            ]
             
-            # 2. RECOGNITION: Identify each segment
+            # 3. Build identified segments
             segments = []
-            overlap_detected = False
+            texts = self.split_transcript(transcript, words, turns)
             
-            for turn, _, speaker_label in diarization_output.itertracks(yield_label=True):
-                start = turn.start
-                end = turn.end
-                
-                # Extract audio segment
-                start_sample = int(start * 16000)
-                end_sample = int(end * 16000)
-                audio_segment = audio[start_sample:end_sample]
-                
-                # Skip segments too short
-                if end - start < self.diarization_config.min_speaker_duration:
-                    continue
-                
-                # Create embedding for this segment
-                segment_embedding = self.encoder.embed_utterance(audio_segment)
-                
-                # Compare with enrolled embeddings
-                speaker_id, confidence, recognized = self._recognize_speaker(
-                    segment_embedding
-                )
-                
-                # Extract corresponding text (simple time-based split)
-                segment_text = self._extract_text_segment(transcript, start, end)
-                
+            for turn, text, (speaker_id, confidence, recognized) in zip(turns, texts, identities):
                 segment = SpeakerSegment(
                     speaker_id=speaker_id,
                     recognized=recognized,
                     confidence=confidence,
-                    text=segment_text,
-                    start_time=start,
-                    end_time=end
+                    text=text,
+                    start_time=turn.start,
+                    end_time=turn.end
                 )
                 segments.append(segment)
                 
@@ -211,11 +289,8 @@ class SpeakerIdentifier:
                     speaker_id, recognized, confidence
                 )
             
-            # Check for overlap
-            if self.overlap_config.detection_enabled:
-                overlap_detected = self._detect_overlap(segments)
-                if overlap_detected:
-                    MetricsCollector.record_overlap()
+            # Check for overlap (exact regions, clipped for source separation)
+            overlap_regions = self.find_overlaps(segments, audio)
             
             processing_time = time.time() - start_time
             
@@ -223,16 +298,21 @@ class SpeakerIdentifier:
                 "diarization_completed",
                 conversation_id=conversation_id,
                 segments=len(segments),
-                overlap=overlap_detected,
+                overlap=bool(overlap_regions),
                 processing_time=f"{processing_time:.3f}s"
             )
             
             return DiarizationResult(
                 segments=segments,
-                overlap_detected=overlap_detected,
-                processing_time=processing_time
+                overlap_detected=bool(overlap_regions),
+                processing_time=processing_time,
+                overlap_regions=overlap_regions
             )
             
+        except InferenceOverloadedError:
+            # Admission rejected: surface to caller instead of queueing more work
+            raise
+            
         except Exception as e:
             logger.error(
                 "diarization_failed",
@@ -255,11 +335,18 @@ class SpeakerIdentifier:
         start_time = time.time()
         
         try:
-            # Create embedding for entire audio
-            embedding = self.encoder.embed_utterance(audio)
+            # Create embedding for entire audio (runs in inference pool)
+            embedding = await self.inference.submit("embed", audio)
             
-            # Recognize speaker
-            speaker_id, confidence, recognized = self._recognize_speaker(embedding)
+            # Recognize speaker (conversation cache first, then enrolled database)
+            cached = self.speaker_cache.match(conversation_id, embedding)
+            if cached is not None:
+                speaker_id, confidence, recognized = cached.identity
+            else:
+                speaker_id, confidence, recognized = self._recognize_speaker(embedding)
+                self.speaker_cache.store(
+                    conversation_id, (speaker_id, confidence, recognized), embedding
+                )
             
             segment = SpeakerSegment(
                 speaker_id=speaker_id,
@@ -267,7 +354,7 @@ class SpeakerIdentifier:
                 confidence=confidence,
                 text=transcript,
                 start_time=0.0,
-                end_time=len(audio) / 16000.0
+                end_time=len(audio) / SAMPLE_RATE
             )
             
             processing_time = time.time() - start_time
@@ -300,69 +387,327 @@ class SpeakerIdentifier:
         Compare embedding with enrolled speakers.
         Returns: (speaker_id, confidence, recognized)
         """
-        if not self.enrolled_embeddings:
-            # No enrolled speakers
-            unknown_id = self._generate_unknown_id(embedding)
-            return unknown_id, 0.0, False
-        
-        # Calculate cosine similarity with all enrolled embeddings
-        similarities = {}
-        for user_id, enrolled_embedding in self.enrolled_embeddings.items():
-            similarity = self._cosine_similarity(embedding, enrolled_embedding)
-            similarities[user_id] = similarity
-        
-        # Find best match
-        best_user_id = max(similarities, key=similarities.get)
-        best_confidence = similarities[best_user_id]
-        
-        # Check threshold
-        if best_confidence >= self.recognition_config.threshold:
-            # Recognized
-            return best_user_id, best_confidence, True
+        return self._recognize_speakers(embedding[np.newaxis, :])[0]
+    
+    async def identify_labels(
+        self,
+        audio: np.ndarray,
+        turns: List[DiarizationTurn],
+        label_embeddings: Optional[Dict[str, np.ndarray]],
+        conversation_id: str,
+        stable_labels: bool = False
+    ) -> Dict[str, Tuple[str, float, bool]]:
+        """
+        Recognize each diarization label once instead of every turn.
+        
+        - stable_labels: labels mean the same speaker across requests (streaming),
+          so a cached label is a plain dictionary lookup
+        - otherwise the label embedding is compared with the speakers already seen
+          in this conversation before searching the enrolled database
+        """
+        labels = list(dict.fromkeys(turn.speaker_label for turn in turns))
+        identities: Dict[str, Tuple[str, float, bool]] = {}
+        
+        pending = []
+        for label in labels:
+            cached = (
+                self.speaker_cache.lookup_label(conversation_id, label)
+                if stable_labels else None
+            )
+            if cached is not None:
+                identities[label] = cached.identity
+                MetricsCollector.record_speaker_cache("label_hit")
+            else:
+                pending.append(label)
+        
+        if not pending:
+            return identities
+        
+        # One embedding per label
+        if label_embeddings is not None:
+            # pyannote backend: cluster embeddings come with the diarization output
+            pending = [label for label in pending if label in label_embeddings]
+            if not pending:
+                return identities
+            embeddings = np.stack([label_embeddings[label] for label in pending])
         else:
-            # Unknown (below threshold)
-            unknown_id = self._generate_unknown_id(embedding)
-            return unknown_id, best_confidence, False
+            embeddings = await self.embed_labels(audio, turns, pending)
+        
+        # Speakers already seen in this conversation first
+        unresolved = []
+        for label, embedding in zip(pending, embeddings):
+            cached = self.speaker_cache.match(conversation_id, embedding)
+            if cached is not None:
+                self.speaker_cache.store(conversation_id, cached.identity, embedding, label)
+                identities[label] = cached.identity
+                MetricsCollector.record_speaker_cache("embedding_hit")
+            else:
+                unresolved.append((label, embedding))
+        
+        # Enrolled database for the rest
+        if unresolved:
+            results = self._recognize_speakers(
+                np.stack([embedding for _, embedding in unresolved])
+            )
+            for (label, embedding), identity in zip(unresolved, results):
+                self.speaker_cache.store(conversation_id, identity, embedding, label)
+                identities[label] = identity
+                MetricsCollector.record_speaker_cache("miss")
+        
+        return identities
     
-    @staticmethod
-    def _cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
-        """Calculate cosine similarity between two embeddings."""
-        return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
+    async def embed_labels(
+        self,
+        audio: np.ndarray,
+        turns: List[DiarizationTurn],
+        labels: List[str]
+    ) -> np.ndarray:
+        """One embedding per label from its longest turns, all labels in one batched forward pass."""
+        return await self.inference.submit(
+            "embed_groups",
+            audio,
+            [self._select_label_spans(turns, label) for label in labels]
+        )
+    
+    def _select_label_spans(
+        self,
+        turns: List[DiarizationTurn],
+        label: str
+    ) -> List[Tuple[float, float]]:
+        """Longest turns of a label, up to cluster_max_audio seconds in total."""
+        spans = sorted(
+            ((turn.start, turn.end) for turn in turns if turn.speaker_label == label),
+            key=lambda span: span[1] - span[0],
+            reverse=True
+        )
+        
+        selected = []
+        total = 0.0
+        for start, end in spans:
+            selected.append((start, end))
+            total += end - start
+            if total >= self.recognition_config.cluster_max_audio:
+                break
+        
+        return selected
     
     @staticmethod
-    def _generate_unknown_id(embedding: np.ndarray) -> str:
-        """Generate unique ID for unknown speaker based on embedding hash."""
-        embedding_bytes = embedding.tobytes()
-        hash_obj = hashlib.sha256(embedding_bytes)
-        hash_hex = hash_obj.hexdigest()[:8]
-        return f"unknown_{hash_hex}"
+    def unknown_identity() -> Tuple[str, float, bool]:
+        """Identity for turns whose cluster has no usable embedding."""
+        return "unknown", 0.0, False
+    
+    def _recognize_speakers(
+        self,
+        embeddings: np.ndarray
+    ) -> List[Tuple[str, float, bool]]:
+        """
+        Compare a batch of embeddings with enrolled speakers using a single
+        (segments x users) matrix multiply. Embeddings below threshold join an
+        unknown speaker cluster (when unknown_detection is enabled), queried per
+        embedding so one created earlier in the batch can be joined.
+        Returns: [(speaker_id, confidence, recognized), ...] in input order
+        """
+        recognition_start = time.time()
+        snapshot = self.embedding_store.snapshot
+        
+        if snapshot.user_ids:
+            # Cosine similarity with all enrolled embeddings (rows are pre-normalized)
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            similarities = (embeddings / np.where(norms == 0, 1.0, norms)) @ snapshot.matrix.T
+        
+        results = []
+        for index, embedding in enumerate(embeddings):
+            best_confidence = 0.0
+            
+            if snapshot.user_ids:
+                # Find best enrolled match
+                best_index = int(np.argmax(similarities[index]))
+                best_confidence = float(similarities[index, best_index])
+                
+                # Check threshold
+                if best_confidence >= self.recognition_config.threshold:
+                    # Recognized
+                    results.append((snapshot.user_ids[best_index], best_confidence, True))
+                    continue
+            
+            # Unknown (below threshold): join closest unknown cluster or start a new one
+            if self.recognition_config.unknown_detection:
+                unknown_id = self.unknown_speakers.match(embedding)
+            else:
+                unknown_id = self.unknown_identity()[0]
+            
+            results.append((unknown_id, best_confidence, False))
+        
+        MetricsCollector.record_inference_stage("recognition", time.time() - recognition_start)
+        return results
     
     @staticmethod
-    def _extract_text_segment(transcript: str, start: float, end: float) -> str:
+    def split_transcript(
+        transcript: str,
+        words: Optional[List[TranscriptWord]],
+        turns: List[DiarizationTurn]
+    ) -> List[str]:
         """
-        Simple text extraction based on time proportions.
-        TODO: Improve with word-level timestamps from Whisper ASR.
+        Text of each turn from word-level timestamps.
+        Every word goes to exactly one turn: the latest-starting turn containing its
+        midpoint (or, past the end of a nested turn, the earlier turn reaching
+        furthest), or the nearest turn when it falls in a gap. Turn lookup is a
+        binary search over turn starts, so the cost is O((words + turns) log turns).
+        Without words, every turn carries the full transcript.
         """
-        # Placeholder: return full transcript for now
-        # In production, use word timestamps from Whisper
-        return transcript
+        if not words or not turns:
+            return [transcript] * len(turns)
+        
+        order = sorted(range(len(turns)), key=lambda index: turns[index].start)
+        starts = np.array([turns[index].start for index in order])
+        ends = np.array([turns[index].end for index in order])
+        midpoints = np.array([(word.start + word.end) / 2 for word in words])
+        
+        # Latest turn starting at or before each word midpoint
+        positions = np.clip(np.searchsorted(starts, midpoints, side="right") - 1, 0, None)
+        
+        # That turn already ended (nested in a longer one): take the turn reaching
+        # furthest among those starting at or before it, if it still covers the word
+        indices = np.arange(len(order))
+        reach = np.maximum.accumulate(
+            np.where(ends == np.maximum.accumulate(ends), indices, 0)
+        )
+        positions = np.where(
+            (midpoints > ends[positions]) & (midpoints <= ends[reach[positions]]),
+            reach[positions],
+            positions
+        )
+        
+        # Word after that turn ended: move to the next turn if it is closer
+        next_positions = np.minimum(positions + 1, len(order) - 1)
+        gap_before = midpoints - ends[positions]
+        gap_after = starts[next_positions] - midpoints
+        positions = np.where(
+            (gap_before > 0) & (next_positions != positions) & (gap_after < gap_before),
+            next_positions,
+            positions
+        )
+        
+        turn_words: List[List[str]] = [[] for _ in turns]
+        for word, position in zip(words, positions):
+            turn_words[order[position]].append(word.text.strip())
+        
+        return [" ".join(text for text in texts if text) for texts in turn_words]
     
-    def _detect_overlap(self, segments: List[SpeakerSegment]) -> bool:
-        """Detect if any segments overlap in time."""
-        for i, seg1 in enumerate(segments):
-            for seg2 in segments[i+1:]:
-                # Check temporal overlap
-                overlap_start = max(seg1.start_time, seg2.start_time)
-                overlap_end = min(seg1.end_time, seg2.end_time)
-                overlap_duration = overlap_end - overlap_start
-                
-                if overlap_duration > self.overlap_config.min_duration:
-                    logger.info(
-                        "overlap_detected",
-                        speaker1=seg1.speaker_id,
-                        speaker2=seg2.speaker_id,
-                        duration=f"{overlap_duration:.2f}s"
-                    )
-                    return True
-        
-        return False
+    def find_overlaps(
+        self,
+        segments: List[SpeakerSegment],
+        audio: np.ndarray,
+        audio_offset: float = 0.0
+    ) -> List[OverlapRegion]:
+        """
+        Detect overlap regions and attach their audio clips.
+        audio_offset: time (in segment timestamps) of the first sample of audio.
+        """
+        if not self.overlap_config.detection_enabled:
+            return []
+        
+        regions = self._detect_overlap(segments)
+        if not regions:
+            return []
+        
+        MetricsCollector.record_overlap()
+        return self._clip_overlap_audio(regions, audio, audio_offset)
+    
+    def _detect_overlap(self, segments: List[SpeakerSegment]) -> List[OverlapRegion]:
+        """
+        Sweep line over segment boundaries (O(n log n)).
+        Returns maximal intervals with 2+ active segments, longer than overlap
+        min_duration, with the speakers involved.
+        
+        Events are keyed by segment, not speaker_id: two voices resolved to the
+        same id (two "unknown" clusters, or one enrolled user matched twice) still
+        overlap. A speaker_id is listed once per segment it had active at the same
+        time, so the region keeps one entry per simultaneous voice.
+        """
+        events = sorted(
+            [(segment.start_time, 1, index) for index, segment in enumerate(segments)]
+            + [(segment.end_time, -1, index) for index, segment in enumerate(segments)]
+        )
+        
+        active: set = set()
+        regions: List[OverlapRegion] = []
+        region_start: Optional[float] = None
+        region_voices: Dict[str, int] = {}
+        
+        index = 0
+        while index < len(events):
+            time_point = events[index][0]
+            was_overlapping = len(active) >= 2
+            
+            # Apply every boundary at this instant before checking the state
+            while index < len(events) and events[index][0] == time_point:
+                _, delta, segment_index = events[index]
+                if delta > 0:
+                    active.add(segment_index)
+                else:
+                    active.discard(segment_index)
+                index += 1
+            
+            overlapping = len(active) >= 2
+            if overlapping:
+                if not was_overlapping:
+                    region_start = time_point
+                # Most simultaneous segments seen per speaker_id in this region
+                voices = Counter(segments[i].speaker_id for i in active)
+                for speaker_id, count in voices.items():
+                    region_voices[speaker_id] = max(region_voices.get(speaker_id, 0), count)
+            elif was_overlapping:
+                if time_point - region_start > self.overlap_config.min_duration:
+                    regions.append(OverlapRegion(
+                        start=region_start,
+                        end=time_point,
+                        speakers=[
+                            speaker_id
+                            for speaker_id in sorted(region_voices)
+                            for _ in range(region_voices[speaker_id])
+                        ]
+                    ))
+                region_voices = {}
+        
+        for region in regions:
+            logger.info(
+                "overlap_detected",
+                speakers=region.speakers,
+                start=f"{region.start:.2f}s",
+                duration=f"{region.end - region.start:.2f}s"
+            )
+        
+        return regions
+    
+    def _clip_overlap_audio(
+        self,
+        regions: List[OverlapRegion],
+        audio: np.ndarray,
+        audio_offset: float
+    ) -> List[OverlapRegion]:
+        """
+        Extract each region plus separation margin from audio, merging regions
+        whose padded clips would overlap.
+        """
+        margin = self.overlap_config.separation_margin
+        
+        merged: List[OverlapRegion] = []
+        for region in regions:
+            if merged and region.start - margin <= merged[-1].end + margin:
+                previous = merged[-1]
+                previous.end = max(previous.end, region.end)
+                # Union as multisets: keep one entry per simultaneous voice
+                previous.speakers = sorted(
+                    (Counter(previous.speakers) | Counter(region.speakers)).elements()
+                )
+            else:
+                merged.append(OverlapRegion(region.start, region.end, list(region.speakers)))
+        
+        for region in merged:
+            start_sample = max(0, int((region.start - margin - audio_offset) * SAMPLE_RATE))
+            end_sample = min(len(audio), int((region.end + margin - audio_offset) * SAMPLE_RATE))
+            region.audio = audio[start_sample:end_sample]
+            region.clip_start = audio_offset + start_sample / SAMPLE_RATE
+        
+        return merged
@@ -0,0 +1,283 @@
+"""
+Streaming diarization for Speaker ID/Diarization service.
+Keeps per-conversation state across DiarizeStream chunks: a rolling audio window,
+online speaker centroids with stable labels, and the point up to which audio was
+already reported.
+"""
+
+import time
+import itertools
+import numpy as np
+import structlog
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from .config import StreamingConfig
+from .audio_buffer import AudioRingBuffer
+from .inference import SAMPLE_RATE, DiarizationTurn
+from .speaker_identifier import (
+    SpeakerIdentifier, SpeakerSegment, DiarizationResult, TranscriptWord
+)
+from .metrics import MetricsCollector
+
+logger = structlog.get_logger(__name__)
+
+# Unique per stream so stable labels never collide in the conversation speaker cache
+_stream_ids = itertools.count()
+
+
+@dataclass
+class StreamSpeaker:
+    """Speaker tracked across windows of one stream."""
+    label: str
+    centroid: np.ndarray  # L2-normalized running mean of window embeddings
+    count: int = 1
+
+
+class StreamingDiarizer:
+    """
+    Stateful diarizer for one conversation stream.
+
+    Each chunk is appended to a fixed-size ring buffer and only the latest window is
+    diarized, so per-chunk cost does not grow with conversation length. Window-local
+    pyannote labels are mapped to stream labels by cosine similarity with the
+    speaker centroids seen so far, and only audio not yet reported is emitted.
+
+    Emitted segments are final: a later window that attributes audio before
+    `emitted_until` to another speaker only affects what is emitted next.
+    """
+
+    def __init__(
+        self,
+        speaker_identifier: SpeakerIdentifier,
+        config: StreamingConfig,
+        conversation_id: str,
+        backend: str = ""
+    ):
+        self.speaker_identifier = speaker_identifier
+        self.config = config
+        self.conversation_id = conversation_id
+        self.backend = backend  # requested diarization backend ("" = automatic)
+        self.stream_id = next(_stream_ids)
+
+        self.buffer = AudioRingBuffer(int(config.window_seconds * SAMPLE_RATE))
+        self.min_window_samples = int(config.min_window_seconds * SAMPLE_RATE)
+        self.speakers: List[StreamSpeaker] = []
+
+        # Stream time (seconds) up to which segments were already emitted
+        self.emitted_until = 0.0
+        # Transcript (and words, in stream time) of audio not emitted yet
+        self._pending_text: List[str] = []
+        self._pending_words: List[TranscriptWord] = []
+
+    @property
+    def stream_time(self) -> float:
+        """Seconds of audio received so far."""
+        return self.buffer.total_samples / SAMPLE_RATE
+
+    async def process(
+        self,
+        audio: np.ndarray,
+        transcript: str,
+        words: Optional[List[TranscriptWord]] = None
+    ) -> DiarizationResult:
+        """
+        Add a chunk and diarize the latest window.
+        Returns only new segments (audio after `emitted_until`), with stream timestamps.
+        words: word timestamps relative to the start of this chunk.
+        """
+        chunk_offset = self.stream_time
+        self.buffer.append(audio)
+        if transcript:
+            self._pending_text.append(transcript)
+        if words:
+            self._pending_words.extend(
+                TranscriptWord(word.text, word.start + chunk_offset, word.end + chunk_offset)
+                for word in words
+            )
+
+        return await self.diarize()
+
+    def append_pcm16(self, pcm: bytes):
+        """Add raw int16 PCM, normalized straight into the ring buffer (no text)."""
+        self.buffer.append_pcm16(pcm)
+
+    async def diarize(self, final: bool = False) -> DiarizationResult:
+        """
+        Diarize the latest window of buffered audio.
+        Returns only new segments (audio after `emitted_until`), with stream timestamps.
+        final: end of the stream, flush the tail even if shorter than min_window.
+        """
+        start_time = time.time()
+
+        # Not enough audio for a meaningful window yet: keep accumulating
+        if not final and len(self.buffer) < self.min_window_samples:
+            return DiarizationResult(
+                segments=[], overlap_detected=False, processing_time=time.time() - start_time
+            )
+
+        window = self.buffer.latest(len(self.buffer))
+        window_offset = self.stream_time - len(window) / SAMPLE_RATE
+
+        turns, local_embeddings = await self._diarize_window(window)
+
+        # Map window-local labels to stable stream labels
+        label_map = {
+            label: self._assign_speaker(embedding)
+            for label, embedding in local_embeddings.items()
+        }
+
+        # Keep only audio not reported yet, in stream time
+        new_turns = []
+        for turn in turns:
+            speaker = label_map.get(turn.speaker_label)
+            end = turn.end + window_offset
+            if speaker is None or end <= self.emitted_until:
+                continue
+            new_turns.append(DiarizationTurn(
+                start=max(turn.start + window_offset, self.emitted_until),
+                end=end,
+                speaker_label=speaker.label
+            ))
+
+        if not new_turns:
+            return DiarizationResult(
+                segments=[], overlap_detected=False, processing_time=time.time() - start_time
+            )
+
+        # Stream labels are stable, so identities come from the cache after the first hit
+        centroids = {
+            speaker.label: speaker.centroid for speaker in label_map.values() if speaker
+        }
+        identities = await self.speaker_identifier.identify_labels(
+            window, new_turns, centroids, self.conversation_id, stable_labels=True
+        )
+
+        self.emitted_until = max(turn.end for turn in new_turns)
+        segments = self._build_segments(new_turns, identities, self._take_texts(new_turns))
+
+        overlap_regions = self.speaker_identifier.find_overlaps(segments, window, window_offset)
+
+        processing_time = time.time() - start_time
+        logger.debug(
+            "stream_window_diarized",
+            conversation_id=self.conversation_id,
+            stream_time=f"{self.stream_time:.2f}s",
+            segments=len(segments),
+            speakers=len(self.speakers),
+            processing_time=f"{processing_time:.3f}s"
+        )
+
+        return DiarizationResult(
+            segments=segments,
+            overlap_detected=bool(overlap_regions),
+            processing_time=processing_time,
+            overlap_regions=overlap_regions
+        )
+
+    async def _diarize_window(self, window: np.ndarray):
+        """Diarize the window and get one embedding per window-local label."""
+        identifier = self.speaker_identifier
+        output = await identifier.diarize(window, self.backend)
+
+        if output is None:
+            # No speech found by any backend: the whole window is one speaker
+            turns = [DiarizationTurn(0.0, len(window) / SAMPLE_RATE, "window")]
+            label_embeddings = None
+        else:
+            turns = [
+                turn for turn in output.turns
+                if turn.end - turn.start >= identifier.diarization_config.min_speaker_duration
+            ]
+            label_embeddings = output.label_embeddings
+
+        labels = list(dict.fromkeys(turn.speaker_label for turn in turns))
+        if label_embeddings is None and labels:
+            embeddings = await identifier.embed_labels(window, turns, labels)
+            label_embeddings = dict(zip(labels, embeddings))
+
+        local_embeddings = {
+            label: label_embeddings[label]
+            for label in labels
+            if label_embeddings and label in label_embeddings
+        }
+        return turns, local_embeddings
+
+    def _assign_speaker(self, embedding: np.ndarray) -> Optional[StreamSpeaker]:
+        """Online clustering: match the closest centroid or start a new speaker."""
+        norm = np.linalg.norm(embedding)
+        if norm == 0:
+            return None
+        embedding = embedding / norm
+
+        if self.speakers:
+            similarities = np.stack([speaker.centroid for speaker in self.speakers]) @ embedding
+            best_index = int(np.argmax(similarities))
+            at_capacity = (
+                len(self.speakers) >= self.speaker_identifier.diarization_config.max_speakers
+            )
+
+            if similarities[best_index] >= self.config.cluster_threshold or at_capacity:
+                speaker = self.speakers[best_index]
+                centroid = speaker.centroid * speaker.count + embedding
+                speaker.centroid = centroid / np.linalg.norm(centroid)
+                speaker.count += 1
+                return speaker
+
+        speaker = StreamSpeaker(
+            label=f"stream{self.stream_id}_speaker{len(self.speakers)}",
+            centroid=embedding
+        )
+        self.speakers.append(speaker)
+        logger.info(
+            "stream_speaker_added",
+            conversation_id=self.conversation_id,
+            label=speaker.label,
+            speakers=len(self.speakers)
+        )
+        return speaker
+
+    def _take_texts(self, turns: List[DiarizationTurn]) -> List[str]:
+        """
+        Text for the emitted turns: pending words up to `emitted_until` when word
+        timestamps are available, otherwise the whole pending transcript.
+        """
+        if not self._pending_words:
+            transcript = " ".join(self._pending_text)
+            self._pending_text.clear()
+            return [transcript] * len(turns)
+
+        ready, pending = [], []
+        for word in self._pending_words:
+            if (word.start + word.end) / 2 <= self.emitted_until:
+                ready.append(word)
+            else:
+                pending.append(word)
+        self._pending_words = pending
+        self._pending_text.clear()
+        return self.speaker_identifier.split_transcript("", ready, turns)
+
+    def _build_segments(
+        self,
+        turns: List[DiarizationTurn],
+        identities: Dict,
+        texts: List[str]
+    ) -> List[SpeakerSegment]:
+        """Build SpeakerSegments for the new turns."""
+        identifier = self.speaker_identifier
+        segments = []
+        for turn, text in zip(turns, texts):
+            speaker_id, confidence, recognized = identities.get(
+                turn.speaker_label, identifier.unknown_identity()
+            )
+            segments.append(SpeakerSegment(
+                speaker_id=speaker_id,
+                recognized=recognized,
+                confidence=confidence,
+                text=text,
+                start_time=turn.start,
+                end_time=turn.end
+            ))
+            MetricsCollector.record_identification(speaker_id, recognized, confidence)
+
+        return segments
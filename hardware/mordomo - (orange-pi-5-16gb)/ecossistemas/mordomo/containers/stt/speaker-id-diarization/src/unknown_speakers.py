@@ -0,0 +1,131 @@
+"""
+Unknown speaker clustering for Speaker ID/Diarization service.
+Groups embeddings that match no enrolled user into online clusters with stable
+`unknown_*` IDs, so the same visitor keeps one ID across utterances.
+"""
+
+import time
+import uuid
+import numpy as np
+import structlog
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class UnknownSpeaker:
+    """Online cluster of a speaker that is not enrolled."""
+    speaker_id: str
+    centroid: np.ndarray  # L2-normalized running mean
+    count: int = 1
+    last_seen: float = field(default_factory=time.monotonic)
+
+
+class UnknownSpeakerStore:
+    """
+    Clusters of unknown speakers with TTL eviction.
+
+    Searched by `match` after the enrolled users missed, one embedding at a time
+    against a cached (clusters x dim) matrix of L2-normalized centroids.
+    """
+
+    def __init__(self, ttl_seconds: float, match_threshold: float):
+        self.ttl_seconds = ttl_seconds
+        self.match_threshold = match_threshold
+        self._speakers: Dict[str, UnknownSpeaker] = {}
+        self._ids: Tuple[str, ...] = ()
+        self._matrix: Optional[np.ndarray] = None
+
+    def assign(
+        self,
+        embedding: np.ndarray,
+        candidate_id: Optional[str] = None,
+        similarity: float = -1.0
+    ) -> str:
+        """
+        Add embedding to the candidate cluster when it is close enough,
+        otherwise start a new cluster. Returns the cluster ID.
+        """
+        norm = np.linalg.norm(embedding)
+        embedding = embedding / norm if norm > 0 else embedding
+
+        speaker = self._speakers.get(candidate_id) if candidate_id else None
+        if speaker is not None and similarity >= self.match_threshold:
+            centroid = speaker.centroid * speaker.count + embedding
+            centroid_norm = np.linalg.norm(centroid)
+            speaker.centroid = centroid / centroid_norm if centroid_norm > 0 else centroid
+            speaker.count += 1
+            speaker.last_seen = time.monotonic()
+            self._matrix = None
+            return speaker.speaker_id
+
+        speaker = UnknownSpeaker(
+            speaker_id=f"unknown_{uuid.uuid4().hex[:8]}",
+            centroid=embedding.astype(np.float32)
+        )
+        self._speakers[speaker.speaker_id] = speaker
+        self._matrix = None
+
+        logger.info("unknown_speaker_cluster_created", speaker_id=speaker.speaker_id)
+        return speaker.speaker_id
+
+    def match(self, embedding: np.ndarray) -> str:
+        """
+        Assign embedding to the closest current cluster, or a new one.
+        Clusters are queried at call time, so a cluster created by the previous
+        call (e.g. another label of the same batch) can already be joined.
+        """
+        self._evict_expired()
+        self._rebuild()
+        if not self._ids:
+            return self.assign(embedding)
+
+        norm = np.linalg.norm(embedding)
+        similarities = self._matrix @ (embedding / norm if norm > 0 else embedding)
+        best_index = int(np.argmax(similarities))
+        return self.assign(embedding, self._ids[best_index], float(similarities[best_index]))
+
+    def get(self, speaker_id: str) -> Optional[UnknownSpeaker]:
+        """Live cluster by ID (None if unknown or expired)."""
+        self._evict_expired()
+        return self._speakers.get(speaker_id)
+
+    def pop(self, speaker_id: str) -> Optional[UnknownSpeaker]:
+        """Remove a cluster (e.g. promoted to an enrolled user)."""
+        speaker = self._speakers.pop(speaker_id, None)
+        if speaker is not None:
+            self._matrix = None
+        return speaker
+
+    def _rebuild(self):
+        """Rebuild the centroid matrix (rows in `_ids` order) after clusters changed."""
+        if self._matrix is not None:
+            return
+
+        self._ids = tuple(self._speakers)
+        if self._ids:
+            self._matrix = np.stack(
+                [self._speakers[speaker_id].centroid for speaker_id in self._ids]
+            ).astype(np.float32)
+        else:
+            self._matrix = np.zeros((0, 0), dtype=np.float32)
+
+    def _evict_expired(self):
+        """Drop clusters not heard for ttl_seconds."""
+        deadline = time.monotonic() - self.ttl_seconds
+        expired = [
+            speaker_id
+            for speaker_id, speaker in self._speakers.items()
+            if speaker.last_seen < deadline
+        ]
+        for speaker_id in expired:
+            del self._speakers[speaker_id]
+            logger.debug("unknown_speaker_cluster_expired", speaker_id=speaker_id)
+
+        if expired:
+            self._matrix = None
+
+    def __len__(self) -> int:
+        return len(self._speakers)
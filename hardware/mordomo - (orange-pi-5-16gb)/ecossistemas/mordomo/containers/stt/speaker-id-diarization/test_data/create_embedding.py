@@ -8,6 +8,7 @@ import sounddevice as sd
 from resemblyzer import VoiceEncoder
 from pathlib import Path
 import argparse
+import torch
 
 SAMPLE_RATE = 16000
 DURATION = 5  # segundos
@@ -38,6 +39,17 @@ def create_embedding(audio: np.ndarray, encoder: VoiceEncoder) -> np.ndarray:
     return embedding
 
 
+def create_pyannote_embedding(audio: np.ndarray, model_name: str) -> np.ndarray:
+    """Cria embedding no espaço do pyannote (EMBEDDING_BACKEND=pyannote)."""
+    from pyannote.audio.pipelines.speaker_verification import PretrainedSpeakerEmbedding
+    
+    print(f"🧠 Criando embedding pyannote ({model_name})...")
+    model = PretrainedSpeakerEmbedding(model_name)
+    embedding = model(torch.from_numpy(audio).reshape(1, 1, -1))[0]
+    print(f"✅ Embedding criado (shape: {embedding.shape})")
+    return embedding
+
+
 def save_embedding(embedding: np.ndarray, user_id: str, output_dir: Path):
     """Salva embedding em arquivo .npy."""
     output_path = output_dir / f"{user_id}.npy"
@@ -64,27 +76,43 @@ def main():
         default="./test_data/embeddings",
         help="Diretório de saída para embeddings"
     )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default="resemblyzer",
+        choices=["resemblyzer", "pyannote"],
+        help="Espaço do embedding (pyannote salva em <output-dir>/pyannote)"
+    )
+    parser.add_argument(
+        "--pyannote-model",
+        type=str,
+        default="pyannote/wespeaker-voxceleb-resnet34-LM",
+        help="Modelo de embedding do pyannote"
+    )
     
     args = parser.parse_args()
     
     # Setup
     output_dir = Path(args.output_dir)
+    if args.backend == "pyannote":
+        output_dir = output_dir / "pyannote"
     output_dir.mkdir(parents=True, exist_ok=True)
     
     print(f"\n{'='*60}")
     print(f"🎯 Criando embedding para: {args.user_id}")
     print(f"{'='*60}\n")
     
-    # Initialize encoder
-    print("🔧 Inicializando Voice Encoder...")
-    encoder = VoiceEncoder()
-    print("✅ Encoder inicializado!\n")
-    
     # Record audio
     audio = record_audio(args.duration)
     
     # Create embedding
-    embedding = create_embedding(audio, encoder)
+    if args.backend == "pyannote":
+        embedding = create_pyannote_embedding(audio, args.pyannote_model)
+    else:
+        print("🔧 Inicializando Voice Encoder...")
+        encoder = VoiceEncoder()
+        print("✅ Encoder inicializado!\n")
+        embedding = create_embedding(audio, encoder)
     
     # Save embedding
     save_embedding(embedding, args.user_id, output_dir)
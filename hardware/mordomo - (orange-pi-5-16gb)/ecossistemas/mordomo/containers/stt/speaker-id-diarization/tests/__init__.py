@@ -0,0 +1 @@
+"""Tests for Speaker ID/Diarization service."""
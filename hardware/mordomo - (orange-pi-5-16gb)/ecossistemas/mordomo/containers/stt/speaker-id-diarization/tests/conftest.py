@@ -0,0 +1,83 @@
+"""Shared fixtures (pure logic only: models are never loaded)."""
+
+import importlib
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import src
+
+from src.config import load_config
+from src.speaker_identifier import SpeakerIdentifier, SpeakerSegment
+
+DIM = 256
+
+
+@pytest.fixture
+def config():
+    """Default configuration (environment defaults)."""
+    return load_config()
+
+
+@pytest.fixture
+def identifier(config, tmp_path):
+    """SpeakerIdentifier with an empty profiles directory and no worker pool started."""
+    config.recognition.embeddings_path = str(tmp_path)
+    config.recognition.pyannote_embeddings_path = str(tmp_path)
+    return SpeakerIdentifier(
+        config.diarization,
+        config.recognition,
+        config.overlap,
+        config.inference,
+        config.vad,
+        max_pending=4
+    )
+
+
+@pytest.fixture(scope="session")
+def grpc_server(tmp_path_factory):
+    """
+    src.grpc_server with stubs generated from proto/ (as the Dockerfile does),
+    written to a temp dir added to the src package path.
+    """
+    pytest.importorskip("grpc_tools")
+    if "src.speaker_id_pb2" not in sys.modules:
+        out = tmp_path_factory.mktemp("stubs")
+        proto = Path(__file__).resolve().parent.parent / "proto"
+        subprocess.run(
+            [sys.executable, "-m", "grpc_tools.protoc", f"-I{proto}",
+             f"--python_out={out}", f"--grpc_python_out={out}", str(proto / "speaker_id.proto")],
+            check=True
+        )
+        stub = out / "speaker_id_pb2_grpc.py"
+        stub.write_text(stub.read_text().replace(
+            "import speaker_id_pb2 as", "from . import speaker_id_pb2 as"
+        ))
+        src.__path__.append(str(out))
+    return importlib.import_module("src.grpc_server")
+
+
+def segment(speaker_id: str, start: float, end: float) -> SpeakerSegment:
+    """Unrecognized segment without text."""
+    return SpeakerSegment(
+        speaker_id=speaker_id,
+        recognized=False,
+        confidence=0.0,
+        text="",
+        start_time=start,
+        end_time=end
+    )
+
+
+def voice(seed: int) -> np.ndarray:
+    """Random unit embedding standing in for one speaker."""
+    embedding = np.random.default_rng(seed).standard_normal(DIM).astype(np.float32)
+    return embedding / np.linalg.norm(embedding)
+
+
+def utterance(speaker: np.ndarray, seed: int) -> np.ndarray:
+    """Another utterance of the same speaker (small perturbation)."""
+    return speaker + 0.05 * voice(seed)
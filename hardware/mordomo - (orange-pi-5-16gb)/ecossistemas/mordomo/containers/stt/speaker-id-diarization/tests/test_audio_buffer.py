@@ -0,0 +1,46 @@
+"""Tests for the preallocated audio ring buffer."""
+
+import numpy as np
+
+from src.audio_buffer import AudioRingBuffer
+
+
+def test_latest_before_wrap():
+    buffer = AudioRingBuffer(8)
+    buffer.append(np.arange(5, dtype=np.float32))
+
+    assert len(buffer) == 5
+    assert buffer.latest(3).tolist() == [2, 3, 4]
+    assert buffer.latest(100).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_wraps_keeping_most_recent_samples():
+    buffer = AudioRingBuffer(8)
+    for start in range(0, 20, 3):
+        buffer.append(np.arange(start, start + 3, dtype=np.float32))
+
+    assert buffer.total_samples == 21
+    assert len(buffer) == 8
+    assert buffer.latest(8).tolist() == list(range(13, 21))
+
+
+def test_chunk_larger_than_capacity():
+    buffer = AudioRingBuffer(4)
+    buffer.append(np.arange(3, dtype=np.float32))
+    buffer.append(np.arange(10, dtype=np.float32))
+
+    assert buffer.total_samples == 13
+    assert buffer.latest(4).tolist() == [6, 7, 8, 9]
+
+
+def test_pcm16_split_across_chunks():
+    """A sample split between two messages is reassembled and normalized."""
+    samples = np.array([0, 16384, -32768, 32767, -16384], dtype=np.int16)
+    pcm = samples.tobytes()
+
+    buffer = AudioRingBuffer(4)
+    buffer.append_pcm16(pcm[:3])
+    buffer.append_pcm16(pcm[3:])
+
+    assert buffer.total_samples == 5
+    assert np.allclose(buffer.latest(4), samples[1:] / 32768.0)
@@ -0,0 +1,37 @@
+"""Tests for the enrolled embeddings store."""
+
+import numpy as np
+
+from src.embedding_store import EmbeddingSnapshot, EmbeddingStore
+
+
+def test_snapshot_rows_are_normalized():
+    snapshot = EmbeddingSnapshot.build({"bob": np.full(4, 2.0), "alice": np.ones(4)})
+
+    assert snapshot.user_ids == ("alice", "bob")
+    assert np.allclose(np.linalg.norm(snapshot.matrix, axis=1), 1.0)
+
+
+def test_snapshot_skips_mismatched_shapes():
+    snapshot = EmbeddingSnapshot.build({
+        "alice": np.ones(256),
+        "bob": np.ones(256),
+        "carol": np.ones(512),
+        "dave": np.ones((1, 256)),
+    })
+
+    assert snapshot.user_ids == ("alice", "bob")
+    assert snapshot.matrix.shape == (2, 256)
+    assert set(snapshot.embeddings) == {"alice", "bob"}
+
+
+def test_load_all_survives_bad_file(tmp_path):
+    np.save(tmp_path / "alice.npy", np.ones(256, dtype=np.float32))
+    np.save(tmp_path / "bob.npy", np.ones(192, dtype=np.float32))
+    np.save(tmp_path / "carol.npy", np.ones(256, dtype=np.float32))
+    (tmp_path / "broken.npy").write_bytes(b"partial")
+
+    store = EmbeddingStore(str(tmp_path))
+    store.load_all()
+
+    assert store.snapshot.user_ids == ("alice", "carol")
@@ -0,0 +1,67 @@
+"""Tests for the debounced embeddings hot reload."""
+
+import importlib
+import threading
+
+import numpy as np
+import pytest
+from watchdog.events import (
+    FileCreatedEvent, FileDeletedEvent, FileModifiedEvent, FileMovedEvent
+)
+
+from tests.conftest import voice
+
+DEBOUNCE = 0.05
+
+
+class RecordingIdentifier:
+    """Records apply_embedding_changes calls."""
+
+    def __init__(self):
+        self.calls = []
+        self.applied = threading.Event()
+
+    def apply_embedding_changes(self, paths):
+        self.calls.append(paths)
+        self.applied.set()
+
+
+@pytest.fixture
+def watcher_class(grpc_server):
+    # src.main imports the gRPC server, whose stubs the grpc_server fixture provides
+    return importlib.import_module("src.main").EmbeddingsWatcher
+
+
+def test_burst_collapses_into_one_update(watcher_class, tmp_path):
+    identifier = RecordingIdentifier()
+    watcher = watcher_class(identifier, debounce_seconds=DEBOUNCE)
+    alice, bob = str(tmp_path / "alice.npy"), str(tmp_path / "bob.npy")
+
+    watcher.on_created(FileCreatedEvent(alice))
+    watcher.on_modified(FileModifiedEvent(alice))
+    # Atomic save: the tmp file is renamed over the profile
+    watcher.on_moved(FileMovedEvent(str(tmp_path / "bob.npy.tmp"), bob))
+    watcher.on_modified(FileModifiedEvent(str(tmp_path / "notes.txt")))
+
+    assert identifier.applied.wait(timeout=2)
+    # Let a stray second timer fire, if any
+    threading.Event().wait(3 * DEBOUNCE)
+    assert identifier.calls == [[alice, bob]]
+
+
+def test_deleted_profile_leaves_snapshot(watcher_class, identifier, tmp_path):
+    np.save(tmp_path / "alice.npy", voice(1))
+    np.save(tmp_path / "bob.npy", voice(2))
+    identifier.apply_embedding_changes([str(tmp_path / "alice.npy"), str(tmp_path / "bob.npy")])
+    assert identifier.embedding_store.snapshot.user_ids == ("alice", "bob")
+
+    applied = threading.Event()
+    apply = identifier.apply_embedding_changes
+    identifier.apply_embedding_changes = lambda paths: (apply(paths), applied.set())
+    watcher = watcher_class(identifier, debounce_seconds=DEBOUNCE)
+
+    (tmp_path / "bob.npy").unlink()
+    watcher.on_deleted(FileDeletedEvent(str(tmp_path / "bob.npy")))
+
+    assert applied.wait(timeout=2)
+    assert identifier.embedding_store.snapshot.user_ids == ("alice",)
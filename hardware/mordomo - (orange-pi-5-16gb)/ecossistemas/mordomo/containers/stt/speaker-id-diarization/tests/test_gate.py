@@ -0,0 +1,149 @@
+"""Tests for the per-conversation result gate."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.nats_client import GateState, NATSClient
+
+
+class FakeNATS:
+    """Records published messages; flush() can be made to fail."""
+
+    def __init__(self, fail_flush: bool = False):
+        self.fail_flush = fail_flush
+        self.published = []
+        self.headers = []
+
+    async def publish(self, subject, payload, headers=None):
+        self.published.append((subject, payload))
+        self.headers.append(headers)
+
+    async def flush(self):
+        if self.fail_flush:
+            raise TimeoutError("nats: flush timeout")
+
+
+def verified(conversation_id: str):
+    return SimpleNamespace(data=json.dumps({"conversation_id": conversation_id}).encode())
+
+
+rejected = verified
+
+
+@pytest.fixture
+def client(config):
+    client = NATSClient(config.nats)
+    client.nc = FakeNATS()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_buffered_results_flushed_on_verified(client):
+    await client.publish_diarization_result({"conversation_id": "c1", "speaker_id": "alice", "text": "oi"})
+    assert len(client.gates["c1"].buffer) == 1
+    assert client.nc.published == []
+
+    await client._on_speaker_verified(verified("c1"))
+
+    assert client.gates["c1"].state == GateState.ANALYZING
+    assert not client.gates["c1"].buffer
+    assert len(client.nc.published) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_buffer_for_retry(client):
+    await client.publish_diarization_result({"conversation_id": "c1", "speaker_id": "alice", "text": "oi"})
+    client.nc.fail_flush = True
+
+    await client._on_speaker_verified(verified("c1"))
+    assert len(client.gates["c1"].buffer) == 1
+
+    client.nc.fail_flush = False
+    await client._on_speaker_verified(verified("c1"))
+    assert not client.gates["c1"].buffer
+
+
+@pytest.mark.asyncio
+async def test_conversations_are_gated_independently(client):
+    await client.publish_diarization_result({"conversation_id": "c1", "speaker_id": "alice", "text": "oi"})
+    await client.publish_diarization_result({"conversation_id": "c2", "speaker_id": "bob", "text": "olá"})
+
+    await client._on_speaker_verified(verified("c1"))
+    await client._on_speaker_rejected(rejected("c2"))
+
+    assert [json.loads(payload)["text"] for _, payload in client.nc.published] == ["oi"]
+    assert client.gates["c1"].state == GateState.ANALYZING
+    assert "c2" not in client.gates
+
+
+@pytest.mark.asyncio
+async def test_event_without_conversation_id_is_ignored(client):
+    await client.publish_diarization_result({"conversation_id": "c1", "speaker_id": "alice", "text": "oi"})
+
+    await client._on_speaker_verified(SimpleNamespace(data=b"{}"))
+    await client._on_speaker_rejected(SimpleNamespace(data=b"{}"))
+
+    assert client.nc.published == []
+    assert client.gates["c1"].state == GateState.BUFFERING
+    assert len(client.gates["c1"].buffer) == 1
+
+
+@pytest.mark.asyncio
+async def test_idle_gates_expire_after_ttl(client, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.nats_client.time.monotonic", lambda: now[0])
+
+    await client.publish_diarization_result({"conversation_id": "c1", "speaker_id": "alice", "text": "oi"})
+    now[0] += client.config.gate_ttl / 2
+    await client.publish_diarization_result({"conversation_id": "c2", "speaker_id": "bob", "text": "olá"})
+
+    now[0] += client.config.gate_ttl / 2 + 1
+    await client.publish_diarization_result({"conversation_id": "c3", "speaker_id": "carol", "text": "e aí"})
+
+    assert set(client.gates) == {"c2", "c3"}
+
+
+@pytest.mark.asyncio
+async def test_gate_buffer_keeps_newest_results(client):
+    client.config.gate_buffer_size = 3
+
+    for i in range(5):
+        await client.publish_diarization_result({"conversation_id": "c1", "speaker_id": "alice", "text": str(i)})
+
+    assert [result["text"] for result in client.gates["c1"].buffer] == ["2", "3", "4"]
+
+
+@pytest.mark.asyncio
+async def test_retried_flush_reuses_message_ids(client):
+    for start in (0.0, 2.0):
+        await client.publish_diarization_result({
+            "conversation_id": "c1", "speaker_id": "alice", "text": "oi",
+            "timestamp": 1.0, "start_time": start, "end_time": start + 2.0
+        })
+    client.nc.fail_flush = True
+    await client._on_speaker_verified(verified("c1"))
+
+    client.nc.fail_flush = False
+    await client._on_speaker_verified(verified("c1"))
+
+    ids = [headers["Nats-Msg-Id"] for headers in client.nc.headers]
+    assert len(ids) == 4
+    assert ids[:2] == ids[2:]
+    assert ids[0] != ids[1]
+
+
+@pytest.mark.asyncio
+async def test_batch_subject_outside_speaker_subjects(client):
+    client.config.gate_batch_publish = True
+    await client.publish_diarization_result({"conversation_id": "c1", "speaker_id": "batch", "recognized": True})
+    await client.publish_diarization_result({"conversation_id": "c1", "speaker_id": "alice", "recognized": True})
+
+    await client._on_speaker_verified(verified("c1"))
+
+    (subject, payload), = client.nc.published
+    assert subject == client.config.publish_batch
+    assert subject != client.config.publish_recognized.format(speaker_id="batch")
+    assert not subject.startswith(client.config.publish_recognized.format(speaker_id=""))
+    assert len(json.loads(payload)["results"]) == 2
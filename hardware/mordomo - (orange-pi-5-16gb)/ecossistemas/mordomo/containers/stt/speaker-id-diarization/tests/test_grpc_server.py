@@ -0,0 +1,148 @@
+"""Tests for the gRPC service glue (no server is started, models are never loaded)."""
+
+import grpc
+import numpy as np
+import pytest
+
+from src.inference import SAMPLE_RATE
+from tests.conftest import segment, voice
+from tests.test_streaming import two_halves
+
+
+class FakeNATSClient:
+    """Records what the service publishes."""
+
+    def __init__(self):
+        self.results = []
+        self.separations = []
+
+    async def publish_diarization_result(self, result):
+        self.results.append(result)
+
+    async def trigger_source_separation(self, audio, speakers, conversation_id, start_time):
+        self.separations.append((audio, speakers, conversation_id, start_time))
+
+
+async def fake_embed_groups(method, audio, groups):
+    """Inference double for label embeddings of the fallback single-speaker window."""
+    assert method == "embed_groups"
+    return [voice(index) for index in range(len(groups))]
+
+
+class Aborted(Exception):
+    """Raised by FakeContext.abort, like grpc.aio.AbortError."""
+
+
+class FakeContext:
+    """ServicerContext recording the abort status."""
+
+    def __init__(self):
+        self.code = None
+
+    async def abort(self, code, details=""):
+        self.code = code
+        raise Aborted(details)
+
+    def set_code(self, code):
+        self.code = code
+
+    def set_details(self, details):
+        pass
+
+
+async def chunks(*requests):
+    for request in requests:
+        yield request
+
+
+@pytest.fixture
+def service(grpc_server, identifier, config):
+    return grpc_server.SpeakerIdentifierService(
+        identifier, FakeNATSClient(), config.streaming, config.source_separation
+    )
+
+
+@pytest.mark.asyncio
+async def test_separation_start_time_is_clip_first_sample(grpc_server, service, identifier):
+    audio_offset = 10.0
+    audio = np.arange(10 * SAMPLE_RATE, dtype=np.float64)
+    segments = [segment("alice", 11.0, 14.0), segment("bob", 12.0, 15.0)]
+    regions = identifier.find_overlaps(segments, audio, audio_offset)
+    result = grpc_server.DiarizationResult(
+        segments=segments, overlap_detected=True, processing_time=0.0, overlap_regions=regions
+    )
+
+    await service._publish_and_respond(
+        grpc_server.speaker_id_pb2.DiarizeRequest(conversation_id="c1"), result
+    )
+
+    (clip, _, _, start_time), = service.nats_client.separations
+    assert start_time < 12.0
+    assert clip[0] == round((start_time - audio_offset) * SAMPLE_RATE)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("rpc", ["DiarizeAudio", "DiarizeStream", "DiarizeAudioStream"])
+async def test_rpcs_unavailable_until_models_load(grpc_server, service, rpc):
+    pb2 = grpc_server.speaker_id_pb2
+    context = FakeContext()
+    request = pb2.DiarizeRequest(conversation_id="c1", audio=b"\0\0" * SAMPLE_RATE)
+
+    with pytest.raises(Aborted):
+        if rpc == "DiarizeAudio":
+            await service.DiarizeAudio(request, context)
+        elif rpc == "DiarizeStream":
+            await service.DiarizeStream(chunks(request), context).__anext__()
+        else:
+            chunk = pb2.AudioChunk(conversation_id="c1", audio=request.audio)
+            await service.DiarizeAudioStream(chunks(chunk), context)
+
+    assert context.code == grpc.StatusCode.UNAVAILABLE
+    assert service.nats_client.results == []
+
+
+@pytest.mark.asyncio
+async def test_saturated_pool_rejects_with_resource_exhausted(grpc_server, service, identifier):
+    identifier.ready = True
+    identifier.inference._pending = identifier.inference.max_pending
+    context = FakeContext()
+    request = grpc_server.speaker_id_pb2.DiarizeRequest(
+        conversation_id="c1", audio=b"\0\0" * SAMPLE_RATE
+    )
+
+    with pytest.raises(Aborted):
+        await service.DiarizeAudio(request, context)
+
+    assert context.code == grpc.StatusCode.RESOURCE_EXHAUSTED
+    assert identifier.inference.pending == identifier.inference.max_pending
+
+
+def stream_chunks(pb2, seconds: float, chunk_seconds: float = 0.5):
+    pcm = b"\0\0" * int(chunk_seconds * SAMPLE_RATE)
+    return chunks(*(
+        pb2.AudioChunk(conversation_id="c1", audio=pcm)
+        for _ in range(int(seconds / chunk_seconds))
+    ))
+
+
+async def no_speech(window, backend):
+    """Diarization double: nothing found, the window is treated as one speaker."""
+    return None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("seconds, diarize", [(1.0, no_speech), (20.0, two_halves)])
+async def test_audio_stream_covers_whole_utterance(grpc_server, service, identifier, monkeypatch, seconds, diarize):
+    """Utterances shorter than min_window are flushed at the end; long ones keep audio that left the ring."""
+    identifier.ready = True
+    monkeypatch.setattr(identifier, "diarize", diarize)
+    monkeypatch.setattr(identifier.inference, "submit", fake_embed_groups)
+
+    response = await service.DiarizeAudioStream(
+        stream_chunks(grpc_server.speaker_id_pb2, seconds), FakeContext()
+    )
+
+    bounds = [(segment.start_time, segment.end_time) for segment in response.segments]
+    assert bounds[0][0] == 0.0
+    assert bounds[-1][1] == pytest.approx(seconds)
+    assert all(end == start for (_, end), (start, _) in zip(bounds, bounds[1:]))
@@ -0,0 +1,108 @@
+"""Tests for the inference executor admission and cancellation."""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from src import inference
+from src.inference import InferenceExecutor, InferenceOverloadedError
+
+
+class FakeModels:
+    """Stands in for SpeakerModels: a job that blocks until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = []
+
+    def work(self, name):
+        self.calls.append(name)
+        self.release.wait(timeout=5)
+        return name
+
+
+class StubModels:
+    """Warm-up only: records the pid (and thread) of each warm-up in WARM_UP_DIR."""
+
+    def warm_up(self, run_inference):
+        marker = Path(os.environ["WARM_UP_DIR"]) / f"{os.getpid()}-{threading.get_ident()}"
+        marker.write_text(str(run_inference))
+        time.sleep(0.1)
+        return {"models": 0.5, "warm_up": 0.1}
+
+
+def stub_init_worker(diarization_config, inference_config, embedding_backend):
+    """Importable by reference, so spawned workers load the stub instead of real models."""
+    inference._models = StubModels()
+
+
+@pytest.fixture
+def models(monkeypatch):
+    models = FakeModels()
+    monkeypatch.setattr(inference, "_models", models)
+    return models
+
+
+@pytest.fixture
+def executor(config):
+    config.inference.workers = 1
+    executor = InferenceExecutor(config.inference, config.diarization, "resemblyzer", max_pending=2)
+    executor._executor = ThreadPoolExecutor(max_workers=1)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_never_reaches_a_worker(executor, models):
+    first = asyncio.create_task(executor.submit("work", "first"))
+    second = asyncio.create_task(executor.submit("work", "second"))
+    await asyncio.sleep(0.05)
+
+    second.cancel()
+    models.release.set()
+
+    assert await first == "first"
+    with pytest.raises(asyncio.CancelledError):
+        await second
+    assert models.calls == ["first"]
+    assert executor.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_rejects_beyond_max_pending(executor, models):
+    tasks = [asyncio.create_task(executor.submit("work", name)) for name in ("a", "b")]
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(InferenceOverloadedError):
+        await executor.submit("work", "c")
+
+    models.release.set()
+    assert await asyncio.gather(*tasks) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode, warm_ups", [("thread", 1), ("process", 2)])
+async def test_start_warms_up_every_worker(config, monkeypatch, tmp_path, mode, warm_ups):
+    """Thread mode shares one model copy; process mode warms each worker process once."""
+    monkeypatch.setattr(inference, "_init_worker", stub_init_worker)
+    monkeypatch.setenv("WARM_UP_DIR", str(tmp_path))
+    config.inference.executor = mode
+    config.inference.workers = 2
+    executor = InferenceExecutor(config.inference, config.diarization, "resemblyzer", max_pending=2)
+
+    try:
+        load_times = await executor.start()
+    finally:
+        executor.shutdown()
+
+    markers = list(tmp_path.iterdir())
+    assert len(markers) == warm_ups
+    if mode == "process":
+        assert len({marker.name.split("-")[0] for marker in markers}) == 2
+        assert str(os.getpid()) not in {marker.name.split("-")[0] for marker in markers}
+    assert load_times == {"models": 0.5, "warm_up": 0.1}
@@ -0,0 +1,92 @@
+"""Tests for sweep-line overlap detection."""
+
+import numpy as np
+
+from src.inference import SAMPLE_RATE
+from tests.conftest import segment
+
+
+def test_no_overlap_for_sequential_segments(identifier):
+    segments = [segment("alice", 0.0, 2.0), segment("bob", 2.0, 4.0)]
+
+    assert identifier._detect_overlap(segments) == []
+
+
+def test_overlap_region_bounds_and_speakers(identifier):
+    segments = [segment("alice", 0.0, 3.0), segment("bob", 2.0, 5.0)]
+
+    regions = identifier._detect_overlap(segments)
+
+    assert len(regions) == 1
+    assert (regions[0].start, regions[0].end) == (2.0, 3.0)
+    assert regions[0].speakers == ["alice", "bob"]
+
+
+def test_overlap_between_two_unknown_voices(identifier):
+    """Two voices resolved to the same id still overlap (one entry per voice)."""
+    segments = [segment("unknown", 0.0, 3.0), segment("unknown", 1.0, 4.0)]
+
+    regions = identifier._detect_overlap(segments)
+
+    assert len(regions) == 1
+    assert (regions[0].start, regions[0].end) == (1.0, 3.0)
+    assert regions[0].speakers == ["unknown", "unknown"]
+
+
+def test_same_user_in_sequence_counted_once(identifier):
+    """A speaker taking turns inside one region is still a single voice."""
+    segments = [
+        segment("alice", 0.0, 2.0),
+        segment("bob", 1.0, 5.0),
+        segment("alice", 2.0, 4.0),
+    ]
+
+    regions = identifier._detect_overlap(segments)
+
+    assert len(regions) == 1
+    assert (regions[0].start, regions[0].end) == (1.0, 4.0)
+    assert regions[0].speakers == ["alice", "bob"]
+
+
+def test_short_overlap_ignored(identifier):
+    min_duration = identifier.overlap_config.min_duration
+    segments = [segment("alice", 0.0, 2.0), segment("bob", 2.0 - min_duration / 2, 4.0)]
+
+    assert identifier._detect_overlap(segments) == []
+
+
+def test_clips_are_padded_and_merged(identifier):
+    margin = identifier.overlap_config.separation_margin
+    audio = np.zeros(10 * SAMPLE_RATE, dtype=np.float32)
+    segments = [
+        segment("alice", 0.0, 3.0), segment("bob", 2.0, 4.0),
+        segment("unknown", 3.0 + margin, 6.0),
+    ]
+
+    regions = identifier.find_overlaps(segments, audio)
+
+    assert len(regions) == 1
+    assert regions[0].start == 2.0
+    assert regions[0].speakers == ["alice", "bob", "unknown"]
+    assert len(regions[0].audio) == int((4.0 + margin) * SAMPLE_RATE) - int((2.0 - margin) * SAMPLE_RATE)
+
+
+def test_clip_start_is_first_sample(identifier):
+    """Published start_time must point at audio[0] of the clip, not the region start."""
+    margin = identifier.overlap_config.separation_margin
+    audio_offset = 10.0
+    # Each sample encodes its own index, so audio[0] tells where the clip begins
+    audio = np.arange(10 * SAMPLE_RATE, dtype=np.float64)
+    segments = [
+        segment("alice", 10.0, 13.0), segment("bob", 10.0 + margin / 2, 14.0),
+        segment("carol", 15.0, 18.0), segment("dave", 16.0, 19.0),
+    ]
+
+    regions = identifier.find_overlaps(segments, audio, audio_offset)
+
+    assert len(regions) == 2
+    for region in regions:
+        assert region.audio[0] == round((region.clip_start - audio_offset) * SAMPLE_RATE)
+    # Clamped at the start of the buffer, padded otherwise
+    assert regions[0].clip_start == audio_offset
+    assert regions[1].clip_start == 16.0 - margin
@@ -0,0 +1,82 @@
+"""Tests for the pyannote embedding backend (pipeline output is stubbed)."""
+
+import numpy as np
+import pytest
+from pyannote.core import Annotation, Segment
+
+from src.inference import SAMPLE_RATE, SpeakerModels
+from src.speaker_identifier import SpeakerIdentifier
+from tests.conftest import voice
+
+
+class StubPipeline:
+    """Returns a fixed (annotation, centroids) pair, like return_embeddings=True."""
+
+    def __init__(self, annotation, centroids):
+        self.annotation = annotation
+        self.centroids = centroids
+        self.kwargs = None
+
+    def __call__(self, file, **kwargs):
+        self.kwargs = kwargs
+        return self.annotation, self.centroids
+
+
+def pyannote_models(config, pipeline) -> SpeakerModels:
+    """SpeakerModels with the pyannote backend and no model loaded."""
+    models = SpeakerModels.__new__(SpeakerModels)
+    models.diarization_config = config.diarization
+    models.embedding_backend = "pyannote"
+    models.diarization_pipeline = pipeline
+    return models
+
+
+def annotation() -> Annotation:
+    """SPEAKER_01 talks first, so time order differs from labels() order."""
+    result = Annotation()
+    result[Segment(0.0, 1.5)] = "SPEAKER_01"
+    result[Segment(1.5, 3.0)] = "SPEAKER_00"
+    result[Segment(3.0, 4.0)] = "SPEAKER_02"
+    return result
+
+
+def test_centroids_follow_label_order(config):
+    # Rows follow labels(): SPEAKER_00, SPEAKER_01, SPEAKER_02 (no usable centroid)
+    centroids = np.stack([voice(0), voice(1), np.full(256, np.nan)])
+    pipeline = StubPipeline(annotation(), centroids)
+
+    output = pyannote_models(config, pipeline).diarize(np.zeros(4 * SAMPLE_RATE, dtype=np.float32))
+
+    assert pipeline.kwargs == {"return_embeddings": True}
+    assert [(turn.speaker_label, turn.start) for turn in output.turns] == [
+        ("SPEAKER_01", 0.0), ("SPEAKER_00", 1.5), ("SPEAKER_02", 3.0)
+    ]
+    assert set(output.label_embeddings) == {"SPEAKER_00", "SPEAKER_01"}
+    assert np.array_equal(output.label_embeddings["SPEAKER_00"], voice(0))
+    assert np.array_equal(output.label_embeddings["SPEAKER_01"], voice(1))
+
+
+def test_missing_centroids_leave_labels_to_embed(config):
+    pipeline = StubPipeline(annotation(), None)
+
+    output = pyannote_models(config, pipeline).diarize(np.zeros(4 * SAMPLE_RATE, dtype=np.float32))
+
+    assert len(output.turns) == 3
+    assert output.label_embeddings is None
+
+
+@pytest.mark.parametrize("backend, expected", [
+    ("resemblyzer", "/profiles/resemblyzer"),
+    ("pyannote", "/profiles/pyannote"),
+])
+def test_profiles_path_per_backend(config, backend, expected):
+    config.recognition.embeddings_path = "/profiles/resemblyzer"
+    config.recognition.pyannote_embeddings_path = "/profiles/pyannote"
+    config.recognition.embedding_backend = backend
+
+    assert config.recognition.profiles_path == expected
+    identifier = SpeakerIdentifier(
+        config.diarization, config.recognition, config.overlap,
+        config.inference, config.vad, max_pending=1
+    )
+    assert str(identifier.embedding_store.embeddings_path) == expected
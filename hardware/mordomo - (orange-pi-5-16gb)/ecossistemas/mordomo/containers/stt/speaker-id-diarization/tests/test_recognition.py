@@ -0,0 +1,84 @@
+"""Tests for batched recognition and unknown speaker clustering."""
+
+import numpy as np
+
+from src import unknown_speakers
+from src.unknown_speakers import UnknownSpeakerStore
+from tests.conftest import utterance, voice
+
+
+def test_enrolled_speaker_recognized(identifier):
+    identifier.embedding_store.add("alice", voice(1))
+
+    (speaker_id, confidence, recognized), = identifier._recognize_speakers(
+        np.stack([utterance(voice(1), 100)])
+    )
+
+    assert (speaker_id, recognized) == ("alice", True)
+    assert confidence > identifier.recognition_config.threshold
+
+
+def test_new_unknown_labels_in_one_batch_share_a_cluster(identifier):
+    """Second label of the same visitor joins the cluster the first one created."""
+    identifier.embedding_store.add("alice", voice(1))
+    visitor = voice(2)
+
+    results = identifier._recognize_speakers(
+        np.stack([utterance(visitor, 100), utterance(visitor, 101), voice(3)])
+    )
+
+    ids = [speaker_id for speaker_id, _, _ in results]
+    assert not any(recognized for _, _, recognized in results)
+    assert ids[0].startswith("unknown_")
+    assert ids[0] == ids[1]
+    assert ids[2] != ids[0]
+    assert len(identifier.unknown_speakers) == 2
+
+
+def test_unknown_detection_disabled(identifier):
+    identifier.recognition_config.unknown_detection = False
+
+    results = identifier._recognize_speakers(np.stack([voice(2), voice(3)]))
+
+    assert [speaker_id for speaker_id, _, _ in results] == ["unknown", "unknown"]
+    assert len(identifier.unknown_speakers) == 0
+
+
+def test_unknown_clusters_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(unknown_speakers.time, "monotonic", lambda: now[0])
+    store = UnknownSpeakerStore(ttl_seconds=60, match_threshold=0.75)
+
+    first = store.match(voice(1))
+    assert store.match(utterance(voice(1), 100)) == first
+
+    now[0] += 61
+    assert store.get(first) is None
+    assert store.match(voice(1)) != first
+    assert len(store) == 1
+
+
+def test_promote_unknown_enrolls_cluster(identifier, tmp_path):
+    unknown_id = identifier.unknown_speakers.match(voice(2))
+
+    assert identifier.promote_unknown(unknown_id, "bob")
+
+    assert (tmp_path / "bob.npy").exists()
+    assert identifier.unknown_speakers.get(unknown_id) is None
+    (speaker_id, _, recognized), = identifier._recognize_speakers(
+        np.stack([utterance(voice(2), 100)])
+    )
+    assert (speaker_id, recognized) == ("bob", True)
+
+
+def test_promote_unknown_keeps_cluster_when_write_fails(identifier, tmp_path):
+    unknown_id = identifier.unknown_speakers.match(voice(2))
+    # A regular file where the profiles directory should be: every write fails
+    blocked = tmp_path / "profiles"
+    blocked.write_bytes(b"")
+    identifier.embedding_store.embeddings_path = blocked
+
+    assert not identifier.promote_unknown(unknown_id, "bob")
+
+    assert identifier.unknown_speakers.get(unknown_id) is not None
+    assert "bob" not in identifier.embedding_store.snapshot.user_ids
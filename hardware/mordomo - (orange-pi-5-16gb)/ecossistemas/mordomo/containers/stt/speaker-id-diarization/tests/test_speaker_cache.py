@@ -0,0 +1,92 @@
+"""Tests for the per-conversation speaker cache."""
+
+import numpy as np
+import pytest
+
+from src import speaker_cache
+from src.inference import SAMPLE_RATE, DiarizationTurn
+from src.speaker_cache import ConversationSpeakerCache
+from tests.conftest import utterance, voice
+
+
+def test_label_and_embedding_lookup():
+    cache = ConversationSpeakerCache(ttl_seconds=60, match_threshold=0.7)
+    cache.store("c1", ("alice", 0.9, True), voice(1), label="SPEAKER_00")
+
+    assert cache.lookup_label("c1", "SPEAKER_00").speaker_id == "alice"
+    assert cache.match("c1", utterance(voice(1), 100)).speaker_id == "alice"
+    assert cache.match("c1", voice(2)) is None
+    assert cache.lookup_label("c2", "SPEAKER_00") is None
+
+
+def test_conversations_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(speaker_cache.time, "monotonic", lambda: now[0])
+    cache = ConversationSpeakerCache(ttl_seconds=60, match_threshold=0.7)
+    cache.store("c1", ("alice", 0.9, True), voice(1), label="SPEAKER_00")
+
+    # Lookups refresh the TTL
+    now[0] += 50
+    assert cache.lookup_label("c1", "SPEAKER_00") is not None
+    now[0] += 50
+    assert cache.lookup_label("c1", "SPEAKER_00") is not None
+
+    now[0] += 61
+    assert cache.lookup_label("c1", "SPEAKER_00") is None
+    assert len(cache) == 0
+
+
+def test_promote_relabels_unknown():
+    cache = ConversationSpeakerCache(ttl_seconds=60, match_threshold=0.7)
+    cache.store("c1", ("unknown_1234", 0.3, False), voice(1), label="SPEAKER_00")
+
+    cache.promote("unknown_1234", "bob")
+
+    assert cache.lookup_label("c1", "SPEAKER_00").identity == ("bob", 0.3, True)
+
+
+def test_forget_drops_conversation():
+    cache = ConversationSpeakerCache(ttl_seconds=60, match_threshold=0.7)
+    cache.store("c1", ("alice", 0.9, True), voice(1), label="SPEAKER_00")
+    cache.store("c2", ("alice", 0.9, True), voice(1), label="SPEAKER_00")
+
+    cache.forget("c1")
+
+    assert cache.match("c1", voice(1)) is None
+    assert cache.lookup_label("c2", "SPEAKER_00") is not None
+
+
+def test_same_speaker_stored_once_per_conversation():
+    """A second label resolving to a known speaker points at the same entry."""
+    cache = ConversationSpeakerCache(ttl_seconds=60, match_threshold=0.7)
+    first = cache.store("c1", ("alice", 0.9, True), voice(1), label="SPEAKER_00")
+    second = cache.store("c1", ("alice", 0.8, True), utterance(voice(1), 100), label="SPEAKER_03")
+
+    assert second is first
+    assert cache.lookup_label("c1", "SPEAKER_03") is first
+
+
+@pytest.mark.asyncio
+async def test_identify_labels_reuses_conversation_speakers(identifier, monkeypatch):
+    """Repeat speakers are resolved from the cache, never from the enrolled database."""
+    identifier.embedding_store.add("alice", voice(1))
+    searched = []
+    recognize = identifier._recognize_speakers
+    monkeypatch.setattr(
+        identifier, "_recognize_speakers",
+        lambda embeddings: searched.append(len(embeddings)) or recognize(embeddings)
+    )
+    turns = [DiarizationTurn(0.0, 2.0, "SPEAKER_00")]
+    audio = np.zeros(2 * SAMPLE_RATE, dtype=np.float32)
+
+    first = await identifier.identify_labels(audio, turns, {"SPEAKER_00": voice(1)}, "c1")
+    # New request, new pyannote label, same voice: embedding hit
+    turns = [DiarizationTurn(0.0, 2.0, "SPEAKER_01")]
+    second = await identifier.identify_labels(
+        audio, turns, {"SPEAKER_01": utterance(voice(1), 100)}, "c1"
+    )
+    # Stable (streaming) label: label hit without any embedding
+    third = await identifier.identify_labels(audio, turns, {}, "c1", stable_labels=True)
+
+    assert first["SPEAKER_00"][0] == second["SPEAKER_01"][0] == third["SPEAKER_01"][0] == "alice"
+    assert searched == [1]
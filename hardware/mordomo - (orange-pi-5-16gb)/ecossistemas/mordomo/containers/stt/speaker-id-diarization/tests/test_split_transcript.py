@@ -0,0 +1,47 @@
+"""Tests for splitting the transcript across speaker turns."""
+
+from src.inference import DiarizationTurn
+from src.speaker_identifier import SpeakerIdentifier, TranscriptWord
+
+split = SpeakerIdentifier.split_transcript
+
+
+def words(*items):
+    return [TranscriptWord(text=text, start=start, end=end) for text, start, end in items]
+
+
+def test_without_words_every_turn_gets_full_transcript():
+    turns = [DiarizationTurn(0.0, 1.0, "A"), DiarizationTurn(1.0, 2.0, "B")]
+
+    assert split("oi tudo bem", None, turns) == ["oi tudo bem", "oi tudo bem"]
+    assert split("oi", [], []) == []
+
+
+def test_words_follow_their_turn():
+    turns = [DiarizationTurn(0.0, 1.0, "A"), DiarizationTurn(1.0, 2.0, "B")]
+    transcript = words(("oi", 0.1, 0.3), (" tudo", 0.4, 0.8), (" bem", 1.2, 1.5))
+
+    assert split("oi tudo bem", transcript, turns) == ["oi tudo", "bem"]
+
+
+def test_turn_order_is_preserved_for_unsorted_turns():
+    turns = [DiarizationTurn(1.0, 2.0, "B"), DiarizationTurn(0.0, 1.0, "A")]
+    transcript = words(("oi", 0.1, 0.3), ("bem", 1.2, 1.5))
+
+    assert split("oi bem", transcript, turns) == ["bem", "oi"]
+
+
+def test_word_in_gap_goes_to_nearest_turn():
+    turns = [DiarizationTurn(0.0, 1.0, "A"), DiarizationTurn(3.0, 4.0, "B")]
+    transcript = words(("near_a", 1.1, 1.3), ("near_b", 2.6, 2.8), ("before", -0.5, -0.3))
+
+    assert split("", transcript, turns) == ["near_a before", "near_b"]
+
+
+
+def test_overlapping_turns_take_latest_start():
+    """Inside a nested turn words go to it, after it ends back to the enclosing one."""
+    turns = [DiarizationTurn(0.0, 3.0, "A"), DiarizationTurn(1.0, 2.0, "B")]
+    transcript = words(("a", 0.2, 0.4), ("b", 1.2, 1.4), ("a2", 2.5, 2.7))
+
+    assert split("", transcript, turns) == ["a a2", "b"]
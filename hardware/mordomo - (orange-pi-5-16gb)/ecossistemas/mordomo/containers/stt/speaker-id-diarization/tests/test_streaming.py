@@ -0,0 +1,80 @@
+"""Tests for the streaming diarization window."""
+
+import numpy as np
+import pytest
+
+from src.inference import SAMPLE_RATE, DiarizationOutput, DiarizationTurn
+from src.speaker_identifier import TranscriptWord
+from src.streaming import StreamingDiarizer
+from tests.conftest import voice
+
+CHUNK_SECONDS = 2.0
+
+
+async def two_halves(window, backend):
+    """Diarization double: first half of the window is one voice, second half another."""
+    half = len(window) / SAMPLE_RATE / 2
+    return DiarizationOutput(
+        turns=[DiarizationTurn(0.0, half, "SPEAKER_00"), DiarizationTurn(half, 2 * half, "SPEAKER_01")],
+        label_embeddings={"SPEAKER_00": voice(1), "SPEAKER_01": voice(2)}
+    )
+
+
+@pytest.fixture
+def diarizer(identifier, config, monkeypatch):
+    monkeypatch.setattr(identifier, "diarize", two_halves)
+    return StreamingDiarizer(identifier, config.streaming, "conv-1")
+
+
+def chunk(seconds: float = CHUNK_SECONDS) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def spans(result):
+    return [(segment.start_time, segment.end_time) for segment in result.segments]
+
+
+@pytest.mark.asyncio
+async def test_waits_for_min_window(diarizer):
+    result = await diarizer.process(chunk(diarizer.config.min_window_seconds / 2), "")
+
+    assert result.segments == []
+    assert diarizer.emitted_until == 0.0
+
+
+@pytest.mark.asyncio
+async def test_only_new_audio_is_emitted(diarizer):
+    first = await diarizer.process(chunk(), "")
+    assert spans(first) == [(0.0, 1.0), (1.0, 2.0)]
+    assert diarizer.emitted_until == 2.0
+
+    # Window 0-4s: the first half (0-2s) was already reported
+    second = await diarizer.process(chunk(), "")
+    assert spans(second) == [(2.0, 4.0)]
+    assert diarizer.emitted_until == 4.0
+
+    # Stable stream labels keep the identity resolved on the first window
+    assert second.segments[0].speaker_id == first.segments[1].speaker_id
+
+
+@pytest.mark.asyncio
+async def test_window_slides_in_stream_time(diarizer):
+    window = diarizer.config.window_seconds
+    total = 0.0
+    while total < window + 2 * CHUNK_SECONDS:
+        result = await diarizer.process(chunk(), "")
+        total += CHUNK_SECONDS
+
+    # Last window covers [total - window, total] and only its unreported tail is new
+    assert len(diarizer.buffer) == int(window * SAMPLE_RATE)
+    assert spans(result) == [(total - CHUNK_SECONDS, total)]
+    assert diarizer.emitted_until == total
+
+
+@pytest.mark.asyncio
+async def test_transcript_follows_emitted_audio(diarizer):
+    result = await diarizer.process(
+        chunk(), "oi tudo", [TranscriptWord("oi", 0.2, 0.4), TranscriptWord("tudo", 1.5, 1.8)]
+    )
+
+    assert [segment.text for segment in result.segments] == ["oi", "tudo"]
@@ -0,0 +1,121 @@
+"""Tests for the VAD diarization backend and backend selection."""
+
+import numpy as np
+import pytest
+
+from src import inference
+from src.inference import SAMPLE_RATE, SpeakerModels, _greedy_cluster
+from tests.conftest import utterance, voice
+
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def tone(seconds: float, frequency: float = 220.0) -> np.ndarray:
+    """Voiced-like harmonic tone (fundamental plus overtones)."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    signal = sum(np.sin(2 * np.pi * frequency * k * t) / k for k in range(1, 6))
+    return (0.2 * signal).astype(np.float32)
+
+
+def assert_spans(spans, expected, tolerance=0.1):
+    assert len(spans) == len(expected)
+    for (start, end), (expected_start, expected_end) in zip(spans, expected):
+        assert start == pytest.approx(expected_start, abs=tolerance)
+        assert end == pytest.approx(expected_end, abs=tolerance)
+
+
+def test_silence_has_no_speech(config):
+    assert SpeakerModels._vad_speech_spans(silence(3.0), config.vad) == []
+
+
+def test_tone_runs_become_spans(config):
+    audio = np.concatenate([silence(1.0), tone(1.5), silence(1.0), tone(1.0), silence(0.5)])
+
+    spans = SpeakerModels._vad_speech_spans(audio, config.vad)
+
+    assert_spans(spans, [(1.0, 2.5), (3.5, 4.5)])
+
+
+def test_short_pause_and_short_run(config):
+    """A pause below min_silence keeps one run; a run below min_speech is dropped."""
+    audio = np.concatenate([
+        tone(1.0), silence(config.vad.min_silence / 2), tone(1.0),
+        silence(1.0), tone(config.vad.min_speech / 2), silence(0.5),
+    ])
+
+    spans = SpeakerModels._vad_speech_spans(audio, config.vad)
+
+    assert_spans(spans, [(0.0, 2.0 + config.vad.min_silence / 2)])
+
+
+def test_long_run_split_evenly(config):
+    config.vad.max_segment = 2.0
+
+    spans = SpeakerModels._vad_speech_spans(tone(5.0), config.vad)
+
+    assert len(spans) == 3
+    assert spans[0][1] == spans[1][0] and spans[1][1] == spans[2][0]
+    assert_spans([(spans[0][0], spans[-1][1])], [(0.0, 5.0)])
+
+
+def test_energy_only_without_webrtcvad(config, monkeypatch):
+    monkeypatch.setattr(inference, "webrtcvad", None)
+    audio = np.concatenate([silence(1.0), tone(1.5), silence(1.0)])
+
+    assert_spans(SpeakerModels._vad_speech_spans(audio, config.vad), [(1.0, 2.5)])
+    assert SpeakerModels._vad_speech_spans(silence(2.0), config.vad) == []
+
+
+def test_greedy_cluster_merges_same_voice():
+    alice, bob = voice(1), voice(2)
+    embeddings = np.stack([utterance(alice, 10), utterance(bob, 11), utterance(alice, 12)])
+
+    assignments, centroids = _greedy_cluster(embeddings, threshold=0.75, max_clusters=3)
+
+    assert assignments == [0, 1, 0]
+    assert len(centroids) == 2
+    assert np.allclose(np.linalg.norm(np.stack(centroids), axis=1), 1.0)
+
+
+def test_greedy_cluster_threshold_splits():
+    alice = voice(1)
+    embeddings = np.stack([utterance(alice, 10), utterance(alice, 11)])
+
+    # Above any cosine similarity: every embedding starts its own cluster...
+    assert _greedy_cluster(embeddings, threshold=1.1, max_clusters=3)[0] == [0, 1]
+    # ...until max_clusters forces a join
+    assert _greedy_cluster(embeddings, threshold=1.1, max_clusters=1)[0] == [0, 0]
+
+
+def test_select_backend_branches(identifier):
+    assert identifier.select_backend("vad") == ("vad", "requested")
+    assert identifier.select_backend("pyannote") == ("pyannote", "requested")
+    assert identifier.select_backend() == ("pyannote", "default")
+
+    identifier.inference._pending = identifier.inference.max_pending
+    assert identifier.select_backend() == ("vad", "load")
+    identifier.inference._pending = 0
+
+    identifier.update_system_health({"defcon": identifier.vad_config.defcon_level})
+    assert identifier.select_backend() == ("vad", "defcon")
+    assert identifier.select_backend("pyannote") == ("pyannote", "requested")
+    identifier.update_system_health({"defcon": 1})
+
+    identifier.diarization_config.backend = "vad"
+    assert identifier.select_backend() == ("vad", "config")
+
+
+@pytest.mark.asyncio
+async def test_pyannote_failure_falls_back_to_vad(identifier, monkeypatch):
+    calls = []
+
+    async def submit(method, *args):
+        calls.append(method)
+        return None if method == "diarize" else "vad_output"
+
+    monkeypatch.setattr(identifier.inference, "submit", submit)
+
+    assert await identifier.diarize(silence(1.0)) == "vad_output"
+    assert calls == ["diarize", "diarize_vad"]
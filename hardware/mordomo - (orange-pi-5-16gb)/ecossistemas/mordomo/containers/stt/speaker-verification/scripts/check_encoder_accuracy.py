@@ -0,0 +1,135 @@
+"""
+Script de regressão de acurácia do encoder ONNX
+Compara os scores cosine do modelo ONNX (fp32/int8) com o VoiceEncoder fp32
+nas amostras de enrollment, contra os embeddings cadastrados
+"""
+import argparse
+import sys
+import time
+import numpy as np
+import yaml
+from pathlib import Path
+from resemblyzer import VoiceEncoder, preprocess_wav
+from scipy.io import wavfile
+import logging
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from onnx_encoder import OnnxVoiceEncoder
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def load_samples(samples_dir: Path) -> list:
+    """Carrega e preprocessa todos os .wav (recursivo) do diretório de amostras"""
+    samples = []
+    for audio_path in sorted(samples_dir.rglob("*.wav")):
+        sample_rate, wav_data = wavfile.read(audio_path)
+        if wav_data.dtype == np.int16:
+            wav_data = wav_data.astype(np.float32) / 32768.0
+        samples.append((audio_path, preprocess_wav(wav_data, sample_rate)))
+    return samples
+
+
+def load_enrolled(embeddings_dir: Path) -> tuple:
+    """Matriz (usuários x dim) dos embeddings cadastrados"""
+    paths = sorted(embeddings_dir.glob("*.npy"))
+    if not paths:
+        return [], np.zeros((0, 256), dtype=np.float32)
+    return [p.stem for p in paths], np.stack([np.load(p) for p in paths])
+
+
+def check_accuracy(
+    model_path: str,
+    samples: list,
+    user_ids: list,
+    enrolled: np.ndarray,
+    threshold: float
+) -> dict:
+    """
+    Embeda cada amostra com os dois encoders e compara
+    
+    Returns:
+        Dicionário com cosine entre embeddings, delta de score e decisões alteradas
+    """
+    reference = VoiceEncoder(device="cpu", verbose=False)
+    candidate = OnnxVoiceEncoder(model_path)
+    
+    reference_time = 0.0
+    candidate_time = 0.0
+    agreements = []
+    score_deltas = []
+    flips = []
+    
+    for audio_path, wav in samples:
+        started = time.time()
+        reference_embed = reference.embed_utterance(wav)
+        reference_time += time.time() - started
+        
+        started = time.time()
+        candidate_embed = candidate.embed_utterance(wav)
+        candidate_time += time.time() - started
+        
+        agreements.append(float(np.dot(reference_embed, candidate_embed)))
+        
+        if len(user_ids):
+            reference_scores = enrolled @ reference_embed
+            candidate_scores = enrolled @ candidate_embed
+            score_deltas.append(float(np.max(np.abs(reference_scores - candidate_scores))))
+            
+            reference_accept = reference_scores >= threshold
+            candidate_accept = candidate_scores >= threshold
+            for user_id, before, after in zip(user_ids, reference_accept, candidate_accept):
+                if before != after:
+                    flips.append((audio_path.name, user_id))
+    
+    return {
+        'samples': len(samples),
+        'min_agreement': min(agreements),
+        'mean_agreement': float(np.mean(agreements)),
+        'max_score_delta': max(score_deltas) if score_deltas else 0.0,
+        'decision_flips': flips,
+        'speedup': reference_time / candidate_time if candidate_time else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check ONNX encoder accuracy against fp32 VoiceEncoder')
+    parser.add_argument('--model', default='data/models/voice_encoder.int8.onnx', help='ONNX model to check')
+    parser.add_argument('--samples', default='data/samples', help='Enrollment samples directory (.wav)')
+    parser.add_argument('--embeddings', default='data/embeddings', help='Enrolled embeddings directory (.npy)')
+    parser.add_argument('--config', default='config/config.yaml', help='Config with verification threshold')
+    parser.add_argument('--max-score-delta', type=float, default=0.03, help='Max allowed |score delta|')
+    
+    args = parser.parse_args()
+    
+    with open(args.config, 'r', encoding='utf-8') as f:
+        threshold = yaml.safe_load(f)['verification']['threshold']
+    
+    samples = load_samples(Path(args.samples))
+    if not samples:
+        logger.error(f"No .wav samples found in {args.samples}")
+        sys.exit(2)
+    
+    user_ids, enrolled = load_enrolled(Path(args.embeddings))
+    report = check_accuracy(args.model, samples, user_ids, enrolled, threshold)
+    
+    logger.info(f"📊 {args.model} ({report['samples']} samples, {len(user_ids)} users)")
+    logger.info(f"   Embedding agreement: min {report['min_agreement']:.4f}, mean {report['mean_agreement']:.4f}")
+    logger.info(f"   Max score delta: {report['max_score_delta']:.4f} (limit {args.max_score_delta})")
+    logger.info(f"   Decision flips at threshold {threshold}: {len(report['decision_flips'])}")
+    logger.info(f"   Speedup vs fp32 VoiceEncoder: {report['speedup']:.2f}x")
+    
+    for sample_name, user_id in report['decision_flips']:
+        logger.warning(f"   ⚠️  {sample_name}: decision changed for {user_id}")
+    
+    if report['max_score_delta'] > args.max_score_delta or report['decision_flips']:
+        logger.error("❌ Accuracy regression: keep encoder.runtime=torch or use the fp32 ONNX model")
+        sys.exit(1)
+    
+    logger.info("✅ ONNX encoder within tolerance")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Script para exportar o VoiceEncoder (Resemblyzer) para ONNX
+Gera o modelo fp32 e, opcionalmente, a versão com quantização int8 dinâmica
+"""
+import argparse
+import inspect
+import torch
+from pathlib import Path
+from resemblyzer import VoiceEncoder
+from resemblyzer.hparams import partials_n_frames, mel_n_channels
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+OPSET_VERSION = 17
+
+
+def export_encoder(output_path: str) -> str:
+    """
+    Exporta o VoiceEncoder em fp32, com batch dinâmico
+    
+    Args:
+        output_path: Caminho do arquivo .onnx
+    
+    Returns:
+        Caminho do modelo exportado
+    """
+    encoder = VoiceEncoder(device="cpu")
+    encoder.eval()
+    
+    output_file = Path(output_path)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    
+    # Exportador TorchScript (versões novas do torch usam dynamo por padrão)
+    export_kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        export_kwargs["dynamo"] = False
+    
+    dummy_mels = torch.zeros(1, partials_n_frames, mel_n_channels)
+    torch.onnx.export(
+        encoder,
+        (dummy_mels,),
+        str(output_file),
+        input_names=["mels"],
+        output_names=["embeds"],
+        dynamic_axes={"mels": {0: "batch"}, "embeds": {0: "batch"}},
+        opset_version=OPSET_VERSION,
+        **export_kwargs
+    )
+    
+    logger.info(f"✅ fp32 model exported: {output_file} ({output_file.stat().st_size / 1e6:.1f} MB)")
+    return str(output_file)
+
+
+def quantize_encoder(model_path: str, output_path: str, include_lstm: bool = True) -> str:
+    """
+    Quantização int8 dinâmica dos pesos (ativações quantizadas em runtime)
+    
+    Args:
+        model_path: Modelo fp32 exportado
+        output_path: Caminho do modelo int8
+        include_lstm: Quantiza também as camadas LSTM (maior ganho, maior erro)
+    
+    Returns:
+        Caminho do modelo quantizado
+    """
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    
+    op_types = ["LSTM", "MatMul", "Gemm"] if include_lstm else ["MatMul", "Gemm"]
+    quantize_dynamic(
+        model_path,
+        output_path,
+        op_types_to_quantize=op_types,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        reduce_range=True
+    )
+    
+    output_file = Path(output_path)
+    logger.info(f"✅ int8 model exported: {output_file} ({output_file.stat().st_size / 1e6:.1f} MB)")
+    return str(output_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export VoiceEncoder to ONNX')
+    parser.add_argument('--output-dir', default='data/models', help='Output directory')
+    parser.add_argument('--no-quantize', action='store_true', help='Export only the fp32 model')
+    parser.add_argument('--skip-lstm', action='store_true', help='Keep LSTM layers in fp32 when quantizing')
+    
+    args = parser.parse_args()
+    
+    output_dir = Path(args.output_dir)
+    fp32_path = export_encoder(str(output_dir / "voice_encoder.onnx"))
+    
+    if not args.no_quantize:
+        quantize_encoder(
+            fp32_path,
+            str(output_dir / "voice_encoder.int8.onnx"),
+            include_lstm=not args.skip_lstm
+        )
+    
+    logger.info("Run scripts/check_encoder_accuracy.py before switching encoder.runtime to onnx")
+
+
+if __name__ == "__main__":
+    main()
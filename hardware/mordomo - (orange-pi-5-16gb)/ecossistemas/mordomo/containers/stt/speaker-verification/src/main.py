@@ -11,6 +11,7 @@ import yaml
 from pathlib import Path
 from nats.aio.client import Client as NATS
 from datetime import datetime
+from typing import Optional
 from speaker_verifier import SpeakerVerifier
 
 # Configuração de logging
@@ -93,6 +94,10 @@ class SpeakerVerificationService:
             # Parse payload
             payload = json.loads(msg.data.decode())
             timestamp = payload.get('timestamp', datetime.now().timestamp())
+            # Gerado pelo Wake Word Detector (session_id em versões antigas)
+            conversation_id = payload.get('conversation_id') or payload.get('session_id')
+            if not conversation_id:
+                logger.warning("⚠️ wake_word.detected without conversation_id: Speaker ID will ignore the result")
             logger.info(f"📩 Received wake_word.detected at {timestamp}")
             
             # Decodifica áudio
@@ -112,11 +117,11 @@ class SpeakerVerificationService:
             
             # Publica resultado
             if is_verified:
-                await self._publish_verified(user_id, confidence, timestamp)
+                await self._publish_verified(user_id, confidence, timestamp, conversation_id)
                 self.stats['verified_count'] += 1
                 self.stats['by_user'][user_id] = self.stats['by_user'].get(user_id, 0) + 1
             else:
-                await self._publish_rejected(confidence, timestamp)
+                await self._publish_rejected(confidence, timestamp, conversation_id)
                 self.stats['rejected_count'] += 1
             
             # Log stats periodicamente
@@ -127,7 +132,13 @@ class SpeakerVerificationService:
             logger.error(f"❌ Error handling message: {e}", exc_info=True)
             self.stats['errors_count'] += 1
     
-    async def _publish_verified(self, user_id: str, confidence: float, timestamp: float):
+    async def _publish_verified(
+        self,
+        user_id: str,
+        confidence: float,
+        timestamp: float,
+        conversation_id: Optional[str] = None
+    ):
         """
         Publica evento de verificação bem-sucedida
         
@@ -135,6 +146,7 @@ class SpeakerVerificationService:
             user_id: ID do usuário verificado
             confidence: Score de confiança
             timestamp: Timestamp original
+            conversation_id: Conversa do wake word (abre só o gate dela no Speaker ID)
         """
         subject = self.config['nats']['publish_verified']
         payload = {
@@ -142,17 +154,25 @@ class SpeakerVerificationService:
             'confidence': round(confidence, 3),
             'timestamp': timestamp
         }
+        if conversation_id:
+            payload['conversation_id'] = conversation_id
         
         await self.nc.publish(subject, json.dumps(payload).encode())
         logger.info(f"✅ Published speaker.verified: {user_id} (confidence: {confidence:.3f})")
     
-    async def _publish_rejected(self, similarity: float, timestamp: float):
+    async def _publish_rejected(
+        self,
+        similarity: float,
+        timestamp: float,
+        conversation_id: Optional[str] = None
+    ):
         """
         Publica evento de rejeição
         
         Args:
             similarity: Melhor similaridade encontrada
             timestamp: Timestamp original
+            conversation_id: Conversa do wake word (descarta só o gate dela no Speaker ID)
         """
         subject = self.config['nats']['publish_rejected']
         payload = {
@@ -160,6 +180,8 @@ class SpeakerVerificationService:
             'similarity': round(similarity, 3),
             'timestamp': timestamp
         }
+        if conversation_id:
+            payload['conversation_id'] = conversation_id
         
         await self.nc.publish(subject, json.dumps(payload).encode())
         logger.info(f"❌ Published speaker.rejected: similarity {similarity:.3f}")
@@ -0,0 +1,68 @@
+"""
+Encoder ONNX do Resemblyzer
+Roda o VoiceEncoder exportado (fp32 ou int8) com onnxruntime, com a mesma
+interface e a mesma matemática de VoiceEncoder.embed_utterance
+"""
+import numpy as np
+import onnxruntime as ort
+from resemblyzer import VoiceEncoder
+from resemblyzer import audio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class OnnxVoiceEncoder:
+    """
+    Substituto do VoiceEncoder para inferência em CPU ARM
+    """
+    
+    def __init__(self, model_path: str, num_threads: int = 0):
+        """
+        Carrega o modelo exportado por scripts/export_encoder_onnx.py
+        
+        Args:
+            model_path: Caminho do arquivo .onnx
+            num_threads: Threads intra-op do onnxruntime (0 = padrão)
+        """
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        
+        self.session = ort.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        self.embedding_dim = self.session.get_outputs()[0].shape[-1]
+        
+        logger.info(f"ONNX voice encoder loaded: {model_path}")
+    
+    def embed_partials(self, mels: np.ndarray) -> np.ndarray:
+        """
+        Embeddings L2-normalizados de um lote de mels (batch, frames, n_mels)
+        """
+        return self.session.run(None, {self.input_name: mels.astype(np.float32, copy=False)})[0]
+    
+    def embed_utterance(self, wav: np.ndarray, rate: float = 1.3, min_coverage: float = 0.75) -> np.ndarray:
+        """
+        Embedding de uma fala inteira (partials + média + normalização L2)
+        
+        Args:
+            wav: Áudio preprocessado (preprocess_wav)
+            rate: Partials por segundo
+            min_coverage: Cobertura mínima do último partial
+        
+        Returns:
+            Embedding (256,) L2-normalizado
+        """
+        wav_slices, mel_slices = VoiceEncoder.compute_partial_slices(len(wav), rate, min_coverage)
+        max_wave_length = wav_slices[-1].stop
+        if max_wave_length >= len(wav):
+            wav = np.pad(wav, (0, max_wave_length - len(wav)), "constant")
+        
+        frames = audio.wav_to_mel_spectrogram(wav)
+        mels = np.array([frames[s] for s in mel_slices])
+        partial_embeds = self.embed_partials(mels)
+        
+        raw_embed = np.mean(partial_embeds, axis=0)
+        return raw_embed / np.linalg.norm(raw_embed, 2)
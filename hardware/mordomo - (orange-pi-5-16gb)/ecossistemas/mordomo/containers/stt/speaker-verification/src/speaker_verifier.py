@@ -26,7 +26,7 @@ class SpeakerVerifier:
         """
         self.config = config
         self.threshold = config['verification']['threshold']
-        self.encoder = VoiceEncoder()
+        self.encoder = self._load_encoder()
         self.embeddings = {}
         self.update_counters = {}
         
@@ -35,6 +35,24 @@ class SpeakerVerifier:
         
         logger.info(f"SpeakerVerifier initialized with {len(self.embeddings)} users")
     
+    def _load_encoder(self):
+        """
+        Carrega o encoder conforme encoder.runtime
+        - torch: VoiceEncoder fp32 (padrão)
+        - onnx: modelo exportado por scripts/export_encoder_onnx.py (fp32 ou int8)
+        """
+        encoder_config = self.config.get('encoder', {})
+        runtime = encoder_config.get('runtime', 'torch')
+        
+        if runtime == 'onnx':
+            from onnx_encoder import OnnxVoiceEncoder
+            return OnnxVoiceEncoder(
+                encoder_config['onnx_path'],
+                num_threads=encoder_config.get('num_threads', 0)
+            )
+        
+        return VoiceEncoder()
+    
     def _load_user_embeddings(self):
         """Carrega embeddings de todos os usuários cadastrados"""
         for user in self.config['users']:
@@ -0,0 +1,82 @@
+"""
+Testes para o encoder ONNX (export + runtime)
+"""
+import sys
+import numpy as np
+import pytest
+from pathlib import Path
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnx")
+
+# Adiciona src e scripts ao path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from resemblyzer import VoiceEncoder
+from onnx_encoder import OnnxVoiceEncoder
+from export_encoder_onnx import export_encoder, quantize_encoder
+from speaker_verifier import SpeakerVerifier
+
+
+@pytest.fixture(scope="module")
+def onnx_models(tmp_path_factory):
+    """Exporta os modelos fp32 e int8 uma vez para todos os testes"""
+    output_dir = tmp_path_factory.mktemp("models")
+    fp32_path = export_encoder(str(output_dir / "voice_encoder.onnx"))
+    int8_path = quantize_encoder(fp32_path, str(output_dir / "voice_encoder.int8.onnx"))
+    return fp32_path, int8_path
+
+
+@pytest.fixture
+def sample_wav():
+    """Áudio harmônico de 2 segundos (mais próximo de voz que ruído branco)"""
+    t = np.arange(32000) / 16000
+    phase = 2 * np.pi * np.cumsum(120 + 20 * np.sin(2 * np.pi * t)) / 16000
+    wav = sum(np.sin(k * phase) / k for k in range(1, 10))
+    return (0.3 * wav / np.abs(wav).max()).astype(np.float32)
+
+
+def test_fp32_onnx_matches_voice_encoder(onnx_models, sample_wav):
+    """Modelo fp32 exportado deve reproduzir o VoiceEncoder"""
+    fp32_path, _ = onnx_models
+    reference = VoiceEncoder(device="cpu", verbose=False).embed_utterance(sample_wav)
+    embedding = OnnxVoiceEncoder(fp32_path).embed_utterance(sample_wav)
+
+    assert embedding.shape == reference.shape
+    assert abs(np.linalg.norm(embedding) - 1.0) < 1e-4
+    assert np.dot(embedding, reference) > 0.999
+
+
+def test_int8_model_is_smaller(onnx_models):
+    """Quantização int8 deve reduzir o tamanho do modelo"""
+    fp32_path, int8_path = onnx_models
+    assert Path(int8_path).stat().st_size < Path(fp32_path).stat().st_size / 2
+
+
+def test_embed_partials_batch(onnx_models):
+    """embed_partials processa lotes de tamanho variável"""
+    fp32_path, _ = onnx_models
+    encoder = OnnxVoiceEncoder(fp32_path)
+
+    embeds = encoder.embed_partials(np.random.rand(3, 160, 40).astype(np.float32))
+    assert embeds.shape == (3, encoder.embedding_dim)
+    assert np.allclose(np.linalg.norm(embeds, axis=1), 1.0, atol=1e-4)
+
+
+def test_verifier_onnx_runtime(onnx_models):
+    """encoder.runtime=onnx carrega o OnnxVoiceEncoder"""
+    fp32_path, _ = onnx_models
+    config = {
+        'verification': {'threshold': 0.75, 'min_audio_duration': 1.0, 'max_audio_duration': 3.0},
+        'encoder': {'runtime': 'onnx', 'onnx_path': fp32_path},
+        'users': [],
+        'drift_adaptation': {'enabled': False}
+    }
+
+    verifier = SpeakerVerifier(config)
+    assert isinstance(verifier.encoder, OnnxVoiceEncoder)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-v'])
@@ -109,7 +109,7 @@ class WakeWordDetector:
         """Callback quando conversa termina"""
         try:
             payload = json.loads(msg.data.decode())
-            session_id = payload.get("session_id")
+            session_id = payload.get("session_id") or payload.get("conversation_id")
             
             logger.info(f"📥 Evento recebido: conversation.ended (session: {session_id})")
             conversation_ended_events_total.inc()
@@ -207,6 +207,7 @@ class WakeWordDetector:
                 "confidence": confidence,
                 "keyword": settings.wake_word_keyword,
                 "session_id": session_id,
+                "conversation_id": session_id,  # chave dos gates por conversa (Whisper, Speaker ID)
                 "detected_at": datetime.fromtimestamp(timestamp).isoformat()
             }
             